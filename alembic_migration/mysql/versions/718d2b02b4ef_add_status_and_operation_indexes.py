@@ -0,0 +1,36 @@
+# Copyright 2022 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+"""add status and operation indexes
+
+Revision ID: 718d2b02b4ef
+Revises: c9afabfdbde9
+Create Date: 2025-03-04 15:27:09.402183
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "718d2b02b4ef"
+down_revision: Union[str, None] = "c9afabfdbde9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_deployment_state", "deployment", ["state"], unique=False)
+    op.create_index(
+        "ix_operation_deployment_id_operation",
+        "operation",
+        ["deployment_id", "operation"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_sch_status_log_service_component_host_event_time",
+        "sch_status_log",
+        ["service", "component", "host", "event_time"],
+        unique=False,
+    )
@@ -0,0 +1,44 @@
+# Copyright 2022 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+"""add snapshot status log source
+
+Revision ID: 949f0809c9a5
+Revises: af7c7de3a4d3
+Create Date: 2025-03-10 14:12:37.518204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "949f0809c9a5"
+down_revision: Union[str, None] = "af7c7de3a4d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "sch_status_log",
+        "source",
+        existing_type=sa.Enum(
+            "DEPLOYMENT",
+            "FORCED",
+            "STALE",
+            "MANUAL",
+            name="schstatuslogsourceenum",
+        ),
+        type_=sa.Enum(
+            "DEPLOYMENT",
+            "FORCED",
+            "STALE",
+            "MANUAL",
+            "SNAPSHOT",
+            name="schstatuslogsourceenum",
+        ),
+        existing_nullable=False,
+    )
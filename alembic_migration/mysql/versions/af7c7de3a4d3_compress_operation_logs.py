@@ -0,0 +1,67 @@
+# Copyright 2022 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+"""compress operation logs
+
+Revision ID: af7c7de3a4d3
+Revises: 718d2b02b4ef
+Create Date: 2025-03-06 09:41:52.730418
+
+"""
+
+import zlib
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "af7c7de3a4d3"
+down_revision: Union[str, None] = "718d2b02b4ef"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Prefixes of the compressed logs, raw logs never start with a NUL byte
+ZLIB_MARKER = b"\x00zlib\x00"
+COMPRESSED_MARKERS = (ZLIB_MARKER, b"\x00lzma\x00")
+# Number of logs loaded at once
+BATCH_SIZE = 100
+
+
+def upgrade() -> None:
+    operation = sa.table(
+        "operation",
+        sa.column("deployment_id", sa.Integer()),
+        sa.column("operation_order", sa.Integer()),
+        sa.column("logs", sa.LargeBinary()),
+    )
+    keys = (operation.c.deployment_id, operation.c.operation_order)
+    connection = op.get_bind()
+    key_values = connection.execute(
+        sa.select(*keys).where(operation.c.logs.is_not(None)).order_by(*keys)
+    ).all()
+    for batch_start in range(0, len(key_values), BATCH_SIZE):
+        rows = connection.execute(
+            sa.select(*keys, operation.c.logs).where(
+                sa.tuple_(*keys).in_(key_values[batch_start : batch_start + BATCH_SIZE])
+            )
+        ).all()
+        updates = [
+            {
+                "key_deployment_id": row.deployment_id,
+                "key_operation_order": row.operation_order,
+                "compressed_logs": ZLIB_MARKER + zlib.compress(row.logs),
+            }
+            for row in rows
+            if not row.logs.startswith(COMPRESSED_MARKERS)
+        ]
+        if updates:
+            connection.execute(
+                sa.update(operation)
+                .where(
+                    operation.c.deployment_id == sa.bindparam("key_deployment_id"),
+                    operation.c.operation_order == sa.bindparam("key_operation_order"),
+                )
+                .values(logs=sa.bindparam("compressed_logs")),
+                updates,
+            )
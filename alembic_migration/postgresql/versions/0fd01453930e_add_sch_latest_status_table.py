@@ -0,0 +1,97 @@
+# Copyright 2022 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+"""add sch_latest_status table
+
+Revision ID: 0fd01453930e
+Revises:
+Create Date: 2025-03-03 10:12:45.118306
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0fd01453930e"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATUS_COLUMNS = ["running_version", "configured_version", "to_config", "to_restart"]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sch_latest_status",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("event_time", sa.DateTime(), nullable=False),
+        sa.Column("service", sa.String(length=20), nullable=False),
+        sa.Column("component", sa.String(length=30), nullable=True),
+        sa.Column("host", sa.String(length=255), nullable=True),
+        sa.Column(
+            "component_key",
+            sa.String(length=30),
+            sa.Computed("coalesce(component, '')", persisted=True),
+            nullable=True,
+        ),
+        sa.Column(
+            "host_key",
+            sa.String(length=255),
+            sa.Computed("coalesce(host, '')", persisted=True),
+            nullable=True,
+        ),
+        sa.Column("running_version", sa.String(length=40), nullable=True),
+        sa.Column("configured_version", sa.String(length=40), nullable=True),
+        sa.Column("to_config", sa.Boolean(), nullable=True),
+        sa.Column("to_restart", sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_sch_latest_status_service_component_host",
+        "sch_latest_status",
+        ["service", "component_key", "host_key"],
+        unique=True,
+    )
+    # Backfill from the existing status logs, with the latest event time and the
+    # latest non-null value of each status column of the hosted entities
+    sch_status_log = sa.table(
+        "sch_status_log",
+        *[sa.column(name) for name in ["service", "component", "host", "event_time"]],
+        *[sa.column(name) for name in STATUS_COLUMNS],
+    )
+    partition_by = (
+        sch_status_log.c.service,
+        sch_status_log.c.component,
+        sch_status_log.c.host,
+    )
+    latest_first = sch_status_log.c.event_time.desc()
+    latest_statuses = sa.select(
+        *partition_by,
+        sa.func.first_value(sch_status_log.c.event_time).over(
+            partition_by=partition_by, order_by=latest_first
+        ),
+        *[
+            sa.func.first_value(sch_status_log.c[name]).over(
+                partition_by=partition_by,
+                order_by=(
+                    sa.case((sch_status_log.c[name].is_(None), 0), else_=1).desc(),
+                    latest_first,
+                ),
+            )
+            for name in STATUS_COLUMNS
+        ],
+    ).distinct()
+    sch_latest_status = sa.table(
+        "sch_latest_status",
+        *[sa.column(name) for name in ["service", "component", "host", "event_time"]],
+        *[sa.column(name) for name in STATUS_COLUMNS],
+    )
+    op.execute(
+        sa.insert(sch_latest_status).from_select(
+            ["service", "component", "host", "event_time", *STATUS_COLUMNS],
+            latest_statuses,
+        )
+    )
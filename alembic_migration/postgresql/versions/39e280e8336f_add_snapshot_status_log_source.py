@@ -0,0 +1,30 @@
+# Copyright 2022 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+"""add snapshot status log source
+
+Revision ID: 39e280e8336f
+Revises: 70ffeb6c77d2
+Create Date: 2025-03-10 14:12:37.518204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "39e280e8336f"
+down_revision: Union[str, None] = "70ffeb6c77d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.sync_enum_values(
+        "public",
+        "schstatuslogsourceenum",
+        ["DEPLOYMENT", "FORCED", "STALE", "MANUAL", "SNAPSHOT"],
+        [("sch_status_log", "source")],
+        enum_values_to_rename=[],
+    )
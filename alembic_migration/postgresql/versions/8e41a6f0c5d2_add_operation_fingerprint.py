@@ -0,0 +1,27 @@
+# Copyright 2022 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+"""add operation fingerprint
+
+Revision ID: 8e41a6f0c5d2
+Revises: 158fe76112bf
+Create Date: 2026-10-18 09:41:12.318074
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8e41a6f0c5d2"
+down_revision: Union[str, None] = "158fe76112bf"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "operation", sa.Column("fingerprint", sa.String(length=64), nullable=True)
+    )
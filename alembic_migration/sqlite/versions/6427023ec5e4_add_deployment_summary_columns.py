@@ -0,0 +1,105 @@
+# Copyright 2022 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+"""add deployment summary columns
+
+Revision ID: 6427023ec5e4
+Revises: 6efae39dcad6
+Create Date: 2025-03-12 10:27:44.902615
+
+"""
+
+from itertools import groupby
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6427023ec5e4"
+down_revision: Union[str, None] = "6efae39dcad6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SUMMARY_COLUMNS = (
+    "operation_count",
+    "failed_operation_count",
+    "host_count",
+    "total_duration",
+    "last_operation",
+)
+# Number of operations loaded at once
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.add_column(
+        "deployment", sa.Column("operation_count", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "deployment", sa.Column("failed_operation_count", sa.Integer(), nullable=True)
+    )
+    op.add_column("deployment", sa.Column("host_count", sa.Integer(), nullable=True))
+    op.add_column("deployment", sa.Column("total_duration", sa.Float(), nullable=True))
+    op.add_column(
+        "deployment", sa.Column("last_operation", sa.String(length=72), nullable=True)
+    )
+    deployment = sa.table(
+        "deployment",
+        sa.column("id", sa.Integer()),
+        sa.column("operation_count", sa.Integer()),
+        sa.column("failed_operation_count", sa.Integer()),
+        sa.column("host_count", sa.Integer()),
+        sa.column("total_duration", sa.Float()),
+        sa.column("last_operation", sa.String()),
+    )
+    operation = sa.table(
+        "operation",
+        sa.column("deployment_id", sa.Integer()),
+        sa.column("operation_order", sa.Integer()),
+        sa.column("operation", sa.String()),
+        sa.column("host", sa.String()),
+        sa.column("state", sa.String()),
+        sa.column("start_time", sa.DateTime()),
+        sa.column("end_time", sa.DateTime()),
+    )
+    connection = op.get_bind()
+    operations = connection.execute(
+        sa.select(operation)
+        .order_by(operation.c.deployment_id, operation.c.operation_order)
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+    summaries = []
+    for deployment_id, rows in groupby(operations, key=lambda row: row.deployment_id):
+        rows = list(rows)
+        ended_rows = [row for row in rows if row.end_time is not None]
+        summaries.append(
+            {
+                "summary_id": deployment_id,
+                "summary_operation_count": len(rows),
+                "summary_failed_operation_count": sum(
+                    1 for row in rows if row.state == "FAILURE"
+                ),
+                "summary_host_count": len({row.host for row in rows if row.host}),
+                "summary_total_duration": sum(
+                    (row.end_time - row.start_time).total_seconds()
+                    for row in ended_rows
+                    if row.start_time is not None
+                ),
+                "summary_last_operation": ended_rows[-1].operation
+                if ended_rows
+                else None,
+            }
+        )
+    if summaries:
+        connection.execute(
+            sa.update(deployment)
+            .where(deployment.c.id == sa.bindparam("summary_id"))
+            .values(
+                {
+                    column: sa.bindparam(f"summary_{column}")
+                    for column in SUMMARY_COLUMNS
+                }
+            ),
+            summaries,
+        )
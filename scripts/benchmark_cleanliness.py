@@ -0,0 +1,77 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Benchmark the cleanliness check of the `tdp_vars` service repositories.
+
+It generates a `tdp_vars` directory with the given number of service repositories and
+compares the time taken by:
+
+- the concurrent check of `ClusterVariables.get_unclean_services`, first run (index
+  stat data not refreshed yet) and second run,
+- a sequential `git status` of each repository (previous implementation).
+
+The command `python scripts/benchmark_cleanliness.py` runs the benchmark with 50
+services.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import click
+
+
+def _generate_tdp_vars(path: Path, services: int, files: int) -> None:
+    from tdp.core.repository.git_repository import GitRepository
+
+    for service_index in range(services):
+        service = f"service{service_index}"
+        repository = GitRepository.init(path / service)
+        with repository.validate("initial commit") as repo:
+            file_names = [f"{service}_component{i}.yml" for i in range(files)]
+            for file_name in file_names:
+                (repo.path / file_name).write_text(
+                    "\n".join(f"key{i}: value{i}" for i in range(100))
+                )
+            repo.add_for_validation(file_names)
+        repository.close()
+
+
+@click.command()
+@click.option("--services", type=int, default=50, help="Number of services.")
+@click.option("--files", type=int, default=10, help="Number of files per service.")
+def benchmark_cleanliness(services: int, files: int):
+    """Benchmark the cleanliness check of the tdp_vars repositories."""
+    from git import Repo
+
+    from tdp.core.variables.cluster_variables import ClusterVariables
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tdp_vars = Path(tmp_dir)
+        _generate_tdp_vars(tdp_vars, services, files)
+
+        for run in ["first", "second"]:
+            cluster_variables = ClusterVariables.get_cluster_variables(
+                SimpleNamespace(schemas={}), tdp_vars
+            )
+            start = time.perf_counter()
+            unclean_services = cluster_variables.get_unclean_services()
+            click.echo(
+                f"Concurrent check ({run} run): {time.perf_counter() - start:.3f}s"
+            )
+            cluster_variables.close()
+            assert unclean_services == []
+
+        start = time.perf_counter()
+        for path in tdp_vars.iterdir():
+            with Repo(path) as repo:
+                repo.is_dirty(untracked_files=True)
+        click.echo(f"Sequential git status: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    benchmark_cleanliness()
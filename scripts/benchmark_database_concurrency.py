@@ -0,0 +1,191 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Benchmark the status reads of a SQLite database during a deployment.
+
+A writer thread simulates a running deployment, committing the progress of each
+operation (operation update and status logs) while reader threads run the queries
+of `tdp status show` and `tdp browse`. The benchmark is run with each engine profile
+of `tdp.core.db.get_engine` and reports the reader latencies, the number of failed
+reads and the writer throughput.
+
+The command `python scripts/benchmark_database_concurrency.py` runs the benchmark
+with 4 readers during a deployment of 500 operations.
+"""
+
+from __future__ import annotations
+
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import click
+
+
+def _generate_database(engine, operations: int, logs: int) -> None:
+    from tdp.core.models import (
+        BaseModel,
+        DeploymentModel,
+        OperationModel,
+        SCHStatusLogModel,
+        rebuild_sch_latest_status,
+    )
+    from tdp.core.models.enums import (
+        DeploymentStateEnum,
+        OperationStateEnum,
+        SCHStatusLogSourceEnum,
+    )
+
+    BaseModel.metadata.create_all(engine)
+    start_time = datetime(2023, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(
+            DeploymentModel.__table__.insert(),
+            [{"id": 1, "state": DeploymentStateEnum.RUNNING}],
+        )
+        connection.execute(
+            OperationModel.__table__.insert(),
+            [
+                {
+                    "deployment_id": 1,
+                    "operation_order": operation_order,
+                    "operation": f"service{operation_order % 20}_component_config",
+                    "host": f"host{operation_order % 50}",
+                    "state": OperationStateEnum.PLANNED,
+                }
+                for operation_order in range(1, operations + 1)
+            ],
+        )
+        connection.execute(
+            SCHStatusLogModel.__table__.insert(),
+            [
+                {
+                    "event_time": start_time + timedelta(seconds=index),
+                    "service": f"service{index % 20}",
+                    "component": "component",
+                    "host": f"host{index % 50}",
+                    "running_version": f"{index:040x}",
+                    "source": SCHStatusLogSourceEnum.DEPLOYMENT,
+                }
+                for index in range(logs)
+            ],
+        )
+        rebuild_sch_latest_status(connection)
+
+
+def _write_deployment(engine, operations: int, results: dict) -> None:
+    from tdp.core.models.enums import OperationStateEnum, SCHStatusLogSourceEnum
+    from tdp.dao import Dao
+
+    start = time.perf_counter()
+    with Dao(engine) as dao:
+        for operation_order in range(1, operations + 1):
+            now = datetime.utcnow()
+            dao.update_deployment_progress(
+                1,
+                operations_values=[
+                    {
+                        "operation_order": operation_order,
+                        "state": OperationStateEnum.SUCCESS,
+                        "start_time": now,
+                        "end_time": now,
+                        "logs": b"ok: [host]\n" * 100,
+                    }
+                ],
+                status_logs_values=[
+                    {
+                        "event_time": now,
+                        "service": f"service{operation_order % 20}",
+                        "component": "component",
+                        "host": f"host{operation_order % 50}",
+                        "configured_version": f"{operation_order:040x}",
+                        "to_config": False,
+                        "source": SCHStatusLogSourceEnum.DEPLOYMENT,
+                    }
+                ],
+            )
+            dao.session.commit()
+    results["writer"] = time.perf_counter() - start
+    results["done"] = True
+
+
+def _read_statuses(engine, stop: threading.Event, latencies: list, errors: list):
+    from sqlalchemy.exc import OperationalError
+
+    from tdp.dao import Dao
+
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            with Dao(engine) as dao:
+                dao.get_hosted_entity_statuses()
+                dao.get_deployment(1)
+                dao.get_hosted_entity_statuses_history(limit=50)
+        except OperationalError as e:
+            errors.append(e)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+def _run(engine, operations: int, readers: int) -> dict:
+    stop = threading.Event()
+    latencies: list[float] = []
+    errors: list[Exception] = []
+    results: dict = {}
+    reader_threads = [
+        threading.Thread(target=_read_statuses, args=(engine, stop, latencies, errors))
+        for _ in range(readers)
+    ]
+    for thread in reader_threads:
+        thread.start()
+    try:
+        _write_deployment(engine, operations, results)
+    finally:
+        stop.set()
+        for thread in reader_threads:
+            thread.join()
+    latencies.sort()
+    return {
+        "reads": len(latencies),
+        "failed reads": len(errors),
+        "read p50 (ms)": statistics.median(latencies) * 1000 if latencies else 0,
+        "read p99 (ms)": (
+            latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0
+        ),
+        "read max (ms)": latencies[-1] * 1000 if latencies else 0,
+        "writer (s)": results.get("writer", 0),
+    }
+
+
+@click.command()
+@click.option("--operations", type=int, default=500, help="Number of operations.")
+@click.option("--logs", type=int, default=50_000, help="Number of status logs.")
+@click.option("--readers", type=int, default=4, help="Number of reader threads.")
+def benchmark_database_concurrency(operations: int, logs: int, readers: int):
+    """Benchmark the status reads during a deployment for each engine profile."""
+    from tdp.core.db import EngineProfileEnum, get_engine
+
+    results = {}
+    for profile in EngineProfileEnum:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            engine = get_engine(
+                f"sqlite:///{Path(tmp_dir) / 'benchmark.db'}", profile=profile
+            )
+            _generate_database(engine, operations, logs)
+            results[profile.value] = _run(engine, operations, readers)
+            engine.dispose()
+
+    profiles = list(results)
+    click.echo(f"{'metric':<16}" + "".join(f"{p:>14}" for p in profiles))
+    for metric in results[profiles[0]]:
+        click.echo(
+            f"{metric:<16}" + "".join(f"{results[p][metric]:>14.2f}" for p in profiles)
+        )
+
+
+if __name__ == "__main__":
+    benchmark_database_concurrency()
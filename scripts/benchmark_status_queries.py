@@ -0,0 +1,171 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Benchmark the status and operation queries on a synthetic SQLite database.
+
+It generates a database with the given number of status logs, deployments and
+operations, then times the queries without and with the secondary indexes
+declared by the models:
+
+- the latest status log of a hosted entity (`sch_status_log` indexed on service,
+  component, host and event time),
+- the rebuild of the latest status table,
+- `Dao.get_operations_by_name` (`operation` indexed on deployment id and operation),
+- `Dao.get_planned_deployment` (`deployment` indexed on state).
+
+The command `python scripts/benchmark_status_queries.py` runs the benchmark with 2
+millions status logs.
+"""
+
+from __future__ import annotations
+
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import click
+
+
+def _generate_database(engine, logs: int, deployments: int) -> None:
+    from tdp.core.models import (
+        BaseModel,
+        DeploymentModel,
+        OperationModel,
+        SCHStatusLogModel,
+    )
+    from tdp.core.models.enums import (
+        DeploymentStateEnum,
+        OperationStateEnum,
+        SCHStatusLogSourceEnum,
+    )
+
+    BaseModel.metadata.create_all(engine)
+    start_time = datetime(2023, 1, 1)
+    random.seed(0)
+    with engine.begin() as connection:
+        connection.execute(
+            DeploymentModel.__table__.insert(),
+            [
+                {
+                    "id": deployment_id,
+                    "state": (
+                        DeploymentStateEnum.PLANNED
+                        if deployment_id == deployments
+                        else DeploymentStateEnum.SUCCESS
+                    ),
+                }
+                for deployment_id in range(1, deployments + 1)
+            ],
+        )
+        connection.execute(
+            OperationModel.__table__.insert(),
+            [
+                {
+                    "deployment_id": deployment_id,
+                    "operation_order": operation_order,
+                    "operation": f"service{operation_order % 20}_component_config",
+                    "state": OperationStateEnum.SUCCESS,
+                }
+                for deployment_id in range(1, deployments + 1)
+                for operation_order in range(1, 101)
+            ],
+        )
+        batch_size = 100_000
+        for batch_start in range(0, logs, batch_size):
+            connection.execute(
+                SCHStatusLogModel.__table__.insert(),
+                [
+                    {
+                        "event_time": start_time + timedelta(seconds=index),
+                        "service": f"service{index % 20}",
+                        "component": f"component{index % 7}",
+                        "host": f"host{random.randrange(100)}",
+                        "running_version": f"{index:040x}",
+                        "to_config": random.choice([True, False, None]),
+                        "source": SCHStatusLogSourceEnum.DEPLOYMENT,
+                    }
+                    for index in range(batch_start, min(batch_start + batch_size, logs))
+                ],
+            )
+
+
+def _time_queries(engine, deployments: int, repeat: int) -> dict[str, float]:
+    from sqlalchemy import select
+
+    from tdp.core.models import SCHStatusLogModel
+    from tdp.core.models.sch_latest_status_model import rebuild_sch_latest_status
+    from tdp.dao import Dao
+
+    latest_log = (
+        select(SCHStatusLogModel)
+        .filter_by(service="service3", component="component3", host="host42")
+        .order_by(SCHStatusLogModel.event_time.desc())
+        .limit(1)
+    )
+    timings = {}
+    with Dao(engine) as dao:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            dao.session.execute(latest_log).all()
+        timings["latest status log of a hosted entity"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            dao.get_operations_by_name(
+                deployment_id=deployments // 2,
+                operation_name="service3_component_config",
+            )
+        timings["get_operations_by_name"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            dao.get_planned_deployment()
+        timings["get_planned_deployment"] = time.perf_counter() - start
+
+    with engine.begin() as connection:
+        start = time.perf_counter()
+        rebuild_sch_latest_status(connection)
+        timings["rebuild_sch_latest_status (once)"] = time.perf_counter() - start
+    return timings
+
+
+@click.command()
+@click.option("--logs", type=int, default=2_000_000, help="Number of status logs.")
+@click.option("--deployments", type=int, default=10_000, help="Number of deployments.")
+@click.option("--repeat", type=int, default=100, help="Number of runs per query.")
+def benchmark_status_queries(logs: int, deployments: int, repeat: int):
+    """Benchmark the status and operation queries with and without indexes."""
+    from sqlalchemy import create_engine
+
+    from tdp.core.models import BaseModel
+
+    indexes = [
+        index for table in BaseModel.metadata.sorted_tables for index in table.indexes
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{Path(tmp_dir) / 'benchmark.db'}")
+        click.echo(f"Generating {logs} status logs and {deployments} deployments...")
+        _generate_database(engine, logs, deployments)
+
+        with engine.begin() as connection:
+            for index in indexes:
+                index.drop(connection)
+        without_indexes = _time_queries(engine, deployments, repeat)
+
+        with engine.begin() as connection:
+            for index in indexes:
+                index.create(connection)
+        with_indexes = _time_queries(engine, deployments, repeat)
+        engine.dispose()
+
+    click.echo(f"{'query':<40} {'without':>10} {'with':>10}")
+    for query, duration in without_indexes.items():
+        click.echo(f"{query:<40} {duration:>9.3f}s {with_indexes[query]:>9.3f}s")
+
+
+if __name__ == "__main__":
+    benchmark_status_queries()
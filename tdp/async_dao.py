@@ -0,0 +1,267 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+"""Asyncio counterpart of `tdp.dao.Dao`, for services running an event loop.
+
+Requires the asyncio extension of SQLAlchemy (`greenlet`) and an asyncio driver
+(e.g. `aiosqlite` or `asyncpg`), see `tdp.core.db.get_async_engine`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Iterable
+from typing import TYPE_CHECKING, Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import selectinload, undefer
+
+from tdp.core.cluster_status import ClusterStatus
+from tdp.core.models.deployment_model import DeploymentModel
+from tdp.core.models.operation_model import OperationModel
+from tdp.dao import (
+    DEPLOYMENT_SUMMARY_COLUMNS,
+    SCHStatusLogRow,
+    _create_get_last_deployment_statement,
+    _create_get_last_deployments_statement,
+    _create_get_operation_statement,
+    _create_get_operations_by_name_statement,
+    _create_get_planned_deployment_statement,
+    _create_get_sch_latest_status_statement,
+    _create_get_sch_status_log_history_statement,
+    _create_hosted_entity_status,
+)
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+    from tdp.core.entities.hosted_entity_status import HostedEntityStatus
+
+# Relationships can't be lazy loaded with asyncio, operations of the deployments are
+# loaded along with them. Their logs are deferred, see `AsyncDao.get_operation_logs`.
+_DEPLOYMENT_OPTIONS = (selectinload(DeploymentModel.operations),)
+
+
+class AsyncDao:
+    """Same query surface as `tdp.dao.Dao`, with awaitable methods.
+
+    Example:
+        >>> async with AsyncDao(engine) as dao:
+        ...     statuses = await dao.get_hosted_entity_statuses(service="hdfs")
+    """
+
+    def __init__(self, engine: AsyncEngine, commit_on_exit: bool = False):
+        # Loaded objects stay usable after a commit, as attributes can't be
+        # refreshed implicitly with asyncio
+        self.session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
+        self.commit_on_exit = commit_on_exit
+        self._session: Optional[AsyncSession] = None
+
+    async def __aenter__(self):
+        self._session = self.session_maker()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if exc_type:
+            await self._session.rollback()
+        elif self.commit_on_exit:
+            await self._session.commit()
+        await self._session.close()
+
+    def _check_session(self):
+        if self._session is None:
+            raise Exception("Session not initialized")
+
+    @property
+    def session(self) -> AsyncSession:
+        self._check_session()
+        return self._session
+
+    async def get_cluster_status(self) -> ClusterStatus:
+        return ClusterStatus(await self.get_hosted_entity_statuses())
+
+    async def get_hosted_entity_statuses(
+        self,
+        service: Optional[str] = None,
+        component: Optional[str] = None,
+        hosts: Optional[Iterable[str]] = None,
+        filter_stale: Optional[bool] = None,
+    ) -> list[HostedEntityStatus]:
+        """Get the status of the hosted entities.
+
+        Args:
+            service: Service to filter.
+            component: Component to filter.
+            hosts: Hosts to filter.
+            filter_stale: Whether to filter stale statuses.
+        """
+        stmt = _create_get_sch_latest_status_statement(
+            service_to_filter=service,
+            component_to_filter=component,
+            hosts_to_filter=hosts,
+            filter_stale=filter_stale,
+        )
+        result = await self.session.execute(stmt)
+        return [_create_hosted_entity_status(status) for status in result.all()]
+
+    async def get_hosted_entity_statuses_history(
+        self,
+        limit: Optional[int] = None,
+        service: Optional[str] = None,
+        component: Optional[str] = None,
+        hosts: Optional[Iterable[str]] = None,
+        filter_stale: Optional[bool] = None,
+        *,
+        cursor: Optional[str] = None,
+    ) -> list[SCHStatusLogRow]:
+        """Get the status logs of the hosted entities, from the most recent.
+
+        See `tdp.dao.Dao.get_hosted_entity_statuses_history`.
+
+        Raises:
+            ValueError: If the cursor is not valid.
+        """
+        result = await self.session.execute(
+            _create_get_sch_status_log_history_statement(
+                limit=limit,
+                service_to_filter=service,
+                component_to_filter=component,
+                hosts_to_filter=hosts,
+                filter_stale=filter_stale,
+                cursor=cursor,
+            )
+        )
+        return [SCHStatusLogRow(*row) for row in result]
+
+    async def iter_hosted_entity_statuses_history(
+        self,
+        limit: Optional[int] = None,
+        service: Optional[str] = None,
+        component: Optional[str] = None,
+        hosts: Optional[Iterable[str]] = None,
+        filter_stale: Optional[bool] = None,
+        *,
+        cursor: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[SCHStatusLogRow]:
+        """Stream the status logs of the hosted entities, from the most recent.
+
+        See `tdp.dao.Dao.iter_hosted_entity_statuses_history`.
+
+        Raises:
+            ValueError: If the cursor is not valid.
+        """
+        stmt = _create_get_sch_status_log_history_statement(
+            limit=limit,
+            service_to_filter=service,
+            component_to_filter=component,
+            hosts_to_filter=hosts,
+            filter_stale=filter_stale,
+            cursor=cursor,
+        ).execution_options(yield_per=batch_size)
+        result = await self.session.stream(stmt)
+        return (SCHStatusLogRow(*row) async for row in result)
+
+    async def get_deployment(self, id: int) -> Optional[DeploymentModel]:
+        """Get a deployment by ID.
+
+        Args:
+            id: Deployment ID.
+        """
+        return await self.session.get(DeploymentModel, id, options=_DEPLOYMENT_OPTIONS)
+
+    async def get_operations_by_name(
+        self, deployment_id: int, operation_name: str
+    ) -> list[OperationModel]:
+        """Get all operations for a deployment from their name.
+
+        Args:
+            deployment_id: The deployment ID.
+            operation_name: The operation name.
+        """
+        result = await self.session.scalars(
+            _create_get_operations_by_name_statement(deployment_id, operation_name)
+        )
+        return list(result)
+
+    async def get_operation(
+        self, deployment_id: int, operation_order: int
+    ) -> Optional[OperationModel]:
+        """Get an operation by deployment ID and operation order.
+
+        Args:
+            deployment_id: The deployment ID.
+            operation_order: The operation order.
+        """
+        result = await self.session.scalars(
+            _create_get_operation_statement(deployment_id, operation_order)
+        )
+        return result.one_or_none()
+
+    async def get_operation_logs(
+        self, deployment_id: int, operation_order: int
+    ) -> Optional[bytes]:
+        """Get the logs of an operation.
+
+        Logs are deferred and can't be lazy loaded with asyncio, they are loaded by
+        this method, on the operation too if it is already in the session.
+
+        Args:
+            deployment_id: The deployment ID.
+            operation_order: The operation order.
+        """
+        result = await self.session.scalars(
+            _create_get_operation_statement(deployment_id, operation_order).options(
+                undefer(OperationModel.logs)
+            )
+        )
+        operation = result.one_or_none()
+        return operation.logs if operation is not None else None
+
+    async def get_planned_deployment(self) -> Optional[DeploymentModel]:
+        result = await self.session.scalars(
+            _create_get_planned_deployment_statement().options(*_DEPLOYMENT_OPTIONS)
+        )
+        return result.one_or_none()
+
+    async def get_last_deployment(self) -> Optional[DeploymentModel]:
+        """Get the last deployment."""
+        result = await self.session.scalars(
+            _create_get_last_deployment_statement().options(*_DEPLOYMENT_OPTIONS)
+        )
+        return result.first()
+
+    async def get_last_deployments(
+        self, limit: Optional[int] = None, offset: Optional[int] = None
+    ) -> list[DeploymentModel]:
+        """Get last deployments in ascending order.
+
+        Use limit and offset to paginate the results.
+
+        Args:
+            limit: The maximum number of deployments to return.
+            offset: The number of deployments to skip.
+        """
+        result = await self.session.scalars(
+            _create_get_last_deployments_statement(limit, offset).options(
+                *_DEPLOYMENT_OPTIONS
+            )
+        )
+        return list(result)
+
+    async def get_last_deployment_summaries(
+        self, limit: Optional[int] = None, offset: Optional[int] = None
+    ) -> list[DeploymentModel]:
+        """Get the summary of the last deployments in ascending order.
+
+        Only the `DEPLOYMENT_SUMMARY_COLUMNS` are loaded.
+
+        Args:
+            limit: The maximum number of deployments to return.
+            offset: The number of deployments to skip.
+        """
+        result = await self.session.scalars(
+            _create_get_last_deployments_statement(
+                limit, offset, columns=DEPLOYMENT_SUMMARY_COLUMNS
+            )
+        )
+        return list(result)
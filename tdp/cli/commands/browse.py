@@ -161,7 +161,7 @@ def browse_operation(dao: Dao, deployment_id: int, operation: str) -> None:
 
 
 def browse_deployments(dao: Dao, limit: int, offset: int) -> None:
-    deployments = dao.get_last_deployments(limit=limit, offset=offset)
+    deployments = dao.get_last_deployment_summaries(limit=limit, offset=offset)
     if len(deployments) > 0:
         _print_deployments(deployments)
     else:
@@ -4,21 +4,44 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 import click
 
 from tdp.cli.params import (
     collections_option,
     database_dsn_option,
+    journal_dir_option,
     validate_option,
     vars_option,
 )
+from tdp.core.constants import PROGRESS_FLUSH_INTERVAL
 
 if TYPE_CHECKING:
     from sqlalchemy import Engine
 
     from tdp.core.collections import Collections
+    from tdp.core.models import OperationModel
+
+
+def _parse_operation_fan_out_callback(
+    _ctx: click.Context, param: click.Parameter, value: tuple[str, ...]
+) -> dict[str, int]:
+    """Click callback that parses OPERATION=N values into a dict."""
+    operation_fan_out = {}
+    for item in value:
+        operation, _, fan_out = item.partition("=")
+        try:
+            operation_fan_out[operation] = int(fan_out)
+        except ValueError:
+            raise click.BadParameter(
+                f"'{item}' is not a valid OPERATION=N value.", param=param
+            )
+        if not operation or operation_fan_out[operation] < 1:
+            raise click.BadParameter(
+                f"'{item}' is not a valid OPERATION=N value.", param=param
+            )
+    return operation_fan_out
 
 
 @click.group(invoke_without_command=True)
@@ -41,6 +64,118 @@ if TYPE_CHECKING:
 )
 @validate_option
 @vars_option
+@click.option(
+    "--flush-interval",
+    envvar="TDP_PROGRESS_FLUSH_INTERVAL",
+    type=float,
+    default=PROGRESS_FLUSH_INTERVAL,
+    show_default=True,
+    help="Maximum time (in seconds) between two writes of the deployment progress.",
+)
+@journal_dir_option
+@click.option(
+    "--parallel",
+    envvar="TDP_DEPLOY_PARALLEL",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help=(
+        "Maximum number of operations running at once. Operations start as soon as "
+        "their DAG predecessors in the plan succeeded."
+    ),
+)
+@click.option(
+    "--fan-out",
+    envvar="TDP_DEPLOY_FAN_OUT",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help=(
+        "Maximum number of hosts an operation runs on at once, for consecutive "
+        "occurrences of an operation limited to different hosts."
+    ),
+)
+@click.option(
+    "--operation-fan-out",
+    "operation_fan_out",
+    metavar="OPERATION=N",
+    multiple=True,
+    callback=_parse_operation_fan_out_callback,
+    help="Fan-out of a specific operation. Can be used multiple times.",
+)
+@click.option(
+    "--failure-policy",
+    envvar="TDP_DEPLOY_FAILURE_POLICY",
+    type=click.Choice(["fail-fast", "continue"]),
+    default="fail-fast",
+    show_default=True,
+    help=(
+        "Behavior after a failed operation: start no other operation (fail-fast) or "
+        "keep running the operations which don't depend on it (continue)."
+    ),
+)
+@click.option(
+    "--coalesce-hosts",
+    envvar="TDP_DEPLOY_COALESCE_HOSTS",
+    is_flag=True,
+    help=(
+        "Run consecutive occurrences of an operation limited to different hosts "
+        "with a single ansible-playbook execution."
+    ),
+)
+@click.option(
+    "--skip-unchanged",
+    envvar="TDP_DEPLOY_SKIP_UNCHANGED",
+    is_flag=True,
+    help=(
+        "Mark install and config operations as successful without running them if "
+        "their playbook, collection, service variables version, hosts and extra "
+        "vars are the same as at their last successful run, and none of their DAG "
+        "ancestors was run by the deployment."
+    ),
+)
+@click.option(
+    "--ansible-executor",
+    envvar="TDP_ANSIBLE_EXECUTOR",
+    type=click.Choice(["subprocess", "api", "async"]),
+    default="subprocess",
+    show_default=True,
+    help=(
+        "How playbooks are run: an ansible-playbook process per operation "
+        "(subprocess), long-lived workers using the Ansible API, which load the "
+        "plugins and the inventory once (api), or ansible-playbook processes "
+        "managed by asyncio, which can be stopped on timeout (async)."
+    ),
+)
+@click.option(
+    "--operation-timeout",
+    envvar="TDP_DEPLOY_OPERATION_TIMEOUT",
+    type=click.FloatRange(min=0, min_open=True),
+    help=(
+        "Maximum duration (in seconds) of an operation, requires "
+        "--ansible-executor async."
+    ),
+)
+@click.option(
+    "--deployment-timeout",
+    envvar="TDP_DEPLOY_DEPLOYMENT_TIMEOUT",
+    type=click.FloatRange(min=0, min_open=True),
+    help=(
+        "Maximum duration (in seconds) of the deployment, operations still running "
+        "are stopped and the next ones fail. Requires --ansible-executor async."
+    ),
+)
+@click.option(
+    "--reuse-ssh-connections/--no-reuse-ssh-connections",
+    envvar="TDP_DEPLOY_REUSE_SSH_CONNECTIONS",
+    default=True,
+    show_default=True,
+    help=(
+        "Keep the SSH connections to the hosts open between the operations "
+        "(ControlPersist) and run the modules with pipelining. The SSH arguments "
+        "and pipelining set in the Ansible configuration take precedence."
+    ),
+)
 def deploy(ctx, *args, **kwargs):
     """Execute a planned deployment."""
     if ctx.invoked_subcommand is None:
@@ -55,10 +190,35 @@ def _handle_deploy(
     mock_deploy: bool,
     validate: bool,
     vars: Path,
+    flush_interval: float,
+    journal_dir: Optional[Path],
+    parallel: int,
+    fan_out: int,
+    operation_fan_out: dict[str, int],
+    failure_policy: str,
+    coalesce_hosts: bool,
+    skip_unchanged: bool,
+    ansible_executor: str,
+    operation_timeout: Optional[float],
+    deployment_timeout: Optional[float],
+    reuse_ssh_connections: bool,
 ):
     from tdp.cli.utils import check_services_cleanliness
-    from tdp.core.deployment import DeploymentRunner, Executor
-    from tdp.core.models.enums import DeploymentStateEnum
+    from tdp.core.deployment import (
+        AnsibleApiExecutor,
+        AsyncExecutor,
+        DeploymentRunner,
+        Executor,
+    )
+    from tdp.core.deployment.progress_writer import (
+        ProgressWriter,
+        get_default_journal_dir,
+    )
+    from tdp.core.models.enums import (
+        DeploymentStateEnum,
+        FailurePolicyEnum,
+        OperationStateEnum,
+    )
     from tdp.core.variables import ClusterVariables
     from tdp.dao import Dao
 
@@ -67,41 +227,103 @@ def _handle_deploy(
     )
     check_services_cleanliness(cluster_variables)
 
-    with Dao(db_engine, commit_on_exit=True) as dao:
+    if ansible_executor == "async":
+        executor = AsyncExecutor(
+            dry=dry or mock_deploy,
+            operation_timeout=operation_timeout,
+            deployment_timeout=deployment_timeout,
+        )
+    elif operation_timeout is not None or deployment_timeout is not None:
+        raise click.UsageError(
+            "--operation-timeout and --deployment-timeout require "
+            "--ansible-executor async."
+        )
+    elif ansible_executor == "api":
+        executor = AnsibleApiExecutor(dry=dry or mock_deploy)
+    else:
+        executor = Executor(dry=dry or mock_deploy)
+
+    with Dao(db_engine, commit_on_exit=True) as dao, executor:
         planned_deployment = dao.get_planned_deployment()
         if planned_deployment is None:
             raise click.ClickException(
                 "No planned deployment found, please run `tdp plan` first."
             )
 
+        def record_operation_logs(operation_rec: OperationModel) -> None:
+            # Logs of the running operations, once the progress writer is started
+            progress_writer.record_logs([operation_rec])
+
         deployment_iterator = DeploymentRunner(
             collections=collections,
-            executor=Executor(dry=dry or mock_deploy),
+            executor=executor,
             cluster_variables=cluster_variables,
             cluster_status=dao.get_cluster_status(),
-        ).run(planned_deployment, force_stale_update=force_stale_update)
+            on_operation_logs=None if dry else record_operation_logs,
+        ).run(
+            planned_deployment,
+            force_stale_update=force_stale_update,
+            parallel=parallel,
+            fan_out=fan_out,
+            operation_fan_out=operation_fan_out,
+            failure_policy=FailurePolicyEnum(failure_policy),
+            coalesce_hosts=coalesce_hosts,
+            last_fingerprints=(
+                dao.get_last_operation_fingerprints(
+                    {operation.operation for operation in planned_deployment.operations}
+                )
+                if skip_unchanged
+                else None
+            ),
+        )
 
         if dry:
-            for operation_rec, process_operation_fn in deployment_iterator:
-                if process_operation_fn:
-                    process_operation_fn()
-                click.echo(
-                    f"[DRY MODE]: Operation {operation_rec.operation} is {operation_rec.state}"
-                )
+            try:
+                for operation_rec, process_operation_fn in deployment_iterator:
+                    if process_operation_fn:
+                        process_operation_fn()
+                    click.echo(
+                        f"[DRY MODE]: Operation {operation_rec.operation} is {operation_rec.state}"
+                    )
+            finally:
+                deployment_iterator.close()
             return
 
-        # deployment and operations records are mutated by the iterator so we need to
-        # commit them before iterating and at each iteration
-        dao.session.commit()  # Update operation status to RUNNING
-        for operation_rec, process_operation_fn in deployment_iterator:
-            dao.session.commit()  # Update deployment and current operation status to RUNNING and next operations to PENDING
-            if process_operation_fn:
-                click.echo(
-                    f"Operation {operation_rec.operation} is {operation_rec.state} {'for hosts: ' + operation_rec.host if operation_rec.host is not None else ''}"
-                )
-                if cluster_status_logs := process_operation_fn():
-                    dao.session.add_all(cluster_status_logs)
-            dao.session.commit()  # Update operation status to SUCCESS, FAILURE or HELD
+        # deployment and operations records are mutated by the iterator, their
+        # progress is written by the progress writer instead of the session
+        dao.session.expunge_all()
+        deployment = deployment_iterator.deployment
+        with (
+            executor.deployment_scope(deployment.id, reuse_ssh_connections),
+            ProgressWriter(
+                db_engine,
+                deployment.id,
+                flush_interval=flush_interval,
+                journal_dir=journal_dir or get_default_journal_dir(db_engine.url),
+            ) as progress_writer,
+        ):
+            # Deployment status to RUNNING and operations status to PENDING
+            progress_writer.record(deployment, deployment.operations)
+            try:
+                for operation_rec, process_operation_fn in deployment_iterator:
+                    # Operation status to RUNNING, or HELD after a failure
+                    progress_writer.record(deployment, [operation_rec])
+                    if process_operation_fn:
+                        click.echo(
+                            f"Operation {operation_rec.operation} is {operation_rec.state} {'for hosts: ' + operation_rec.host if operation_rec.host is not None else ''}"
+                        )
+                        cluster_status_logs = process_operation_fn()
+                        # Operation status to SUCCESS or FAILURE
+                        progress_writer.record(
+                            deployment,
+                            [operation_rec],
+                            cluster_status_logs or [],
+                            flush=operation_rec.state != OperationStateEnum.SUCCESS,
+                        )
+            finally:
+                deployment_iterator.close()
+                # Deployment status to SUCCESS or FAILURE
+                progress_writer.record(deployment)
 
         if deployment_iterator.deployment.state != DeploymentStateEnum.SUCCESS:
             raise click.ClickException("Deployment failed.")
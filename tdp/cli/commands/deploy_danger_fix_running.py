@@ -7,16 +7,21 @@ from typing import TYPE_CHECKING
 
 import click
 
-from tdp.cli.params import database_dsn_option
+from tdp.cli.params import database_dsn_option, journal_dir_option
 
 if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Optional
+
     from sqlalchemy import Engine
 
 
 @click.command("danger-fix-running")
 @database_dsn_option
+@journal_dir_option
 def danger_fix_running(
     db_engine: Engine,
+    journal_dir: Optional[Path],
 ):
     """Fix the last deployment state if left as RUNNING.
 
@@ -24,13 +29,23 @@ def danger_fix_running(
     where the last deployment state is 'RUNNING' while it is not the case. Ensure
     that no Ansible deployment is indeed running.
 
-    This command will only override the last deployment state to set it as 'FAILURE'.
-    No Ansible command will be executed.
+    The progress left in the local journal by an interrupted deployment is first
+    written to the database. Then, this command will only override the last deployment
+    state to set it as 'FAILURE'. No Ansible command will be executed.
     """
 
+    from tdp.core.deployment.progress_writer import (
+        get_default_journal_dir,
+        reconcile_journals,
+    )
     from tdp.core.models.deployment_model import NothingToFixError
     from tdp.dao import Dao
 
+    for deployment_id in reconcile_journals(
+        db_engine, journal_dir or get_default_journal_dir(db_engine.url)
+    ):
+        click.echo(f"Deployment {deployment_id} progress recovered from the journal.")
+
     with Dao(db_engine) as dao:
         last_deployment = dao.get_last_deployment()
         if last_deployment is None:
@@ -4,7 +4,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 import click
 
@@ -28,23 +28,49 @@ if TYPE_CHECKING:
 @database_dsn_option
 @validate_option
 @vars_option(exists=False)
+@click.option(
+    "--vars-repository",
+    envvar="TDP_VARS_REPOSITORY",
+    type=click.Choice(["per-service", "single"]),
+    help=(
+        "Versioning of the TDP variables: one repository per service or a single "
+        "repository for all services. Defaults to the existing one, or per-service."
+    ),
+)
 def init(
     conf: tuple[Path],
     collections: Collections,
     db_engine: Engine,
     validate: bool,
     vars: Path,
+    vars_repository: Optional[str] = None,
 ):
     """Initialize the database and the TDP variables."""
 
     from tdp.core.models import init_database
+    from tdp.core.repository.git_mono_repository import GitMonoRepository
+    from tdp.core.repository.git_repository import GitRepository
     from tdp.core.variables import ClusterVariables
 
     if not vars.exists():
         vars.mkdir(parents=True)
         click.echo(f"Created TDP variables directory: {vars}")
 
+    repository_classes = {
+        "per-service": GitRepository,
+        "single": GitMonoRepository,
+    }
+
     init_database(db_engine)
-    ClusterVariables.initialize_cluster_variables(
-        collections, vars, conf, validate=validate
-    )
+    try:
+        ClusterVariables.initialize_cluster_variables(
+            collections,
+            vars,
+            conf,
+            validate=validate,
+            repository_class=(
+                repository_classes[vars_repository] if vars_repository else None
+            ),
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
@@ -13,6 +13,7 @@ from tdp.cli.params import (
     force_option,
     hosts_option,
     preview_option,
+    rolling_batch_option,
     rolling_interval_option,
 )
 
@@ -62,6 +63,7 @@ if TYPE_CHECKING:
 )
 @hosts_option(help="Hosts where operations are launched. Can be used multiple times.")
 @rolling_interval_option
+@rolling_batch_option
 @preview_option
 @force_option
 @collections_option
@@ -79,6 +81,7 @@ def dag(
     filter: Optional[str] = None,
     is_regex: bool = False,
     rolling_interval: Optional[int] = None,
+    rolling_batch: Optional[str] = None,
     hosts: Optional[tuple[str]] = None,
 ):
     """Deploy from the DAG."""
@@ -129,6 +132,7 @@ def dag(
         stop=stop,
         rolling_interval=rolling_interval,
         host_names=hosts,
+        rolling_batch=rolling_batch,
     )
     if preview:
         print_deployment(deployment)
@@ -138,5 +142,5 @@ def dag(
             validate_plan_creation(last_deployment.state, force)
             if last_deployment.state is DeploymentStateEnum.PLANNED:
                 deployment.id = last_deployment.id
-        dao.session.merge(deployment)
+        dao.add_deployment(deployment)
     click.echo("Deployment plan successfully created.")
@@ -139,7 +139,7 @@ def edit(
                         )
 
                         deployment.id = planned_deployment.id
-                        dao.session.merge(deployment)
+                        dao.add_deployment(deployment)
                         dao.session.commit()
                         click.echo("Deployment plan successfully modified.")
                         break
@@ -50,5 +50,5 @@ def import_file(
                 validate_plan_creation(last_deployment.state, force)
                 if last_deployment.state is DeploymentStateEnum.PLANNED:
                     deployment.id = last_deployment.id
-            dao.session.merge(deployment)
+            dao.add_deployment(deployment)
         click.echo("Deployment plan successfully imported.")
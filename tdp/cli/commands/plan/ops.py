@@ -13,6 +13,7 @@ from tdp.cli.params import (
     force_option,
     hosts_option,
     preview_option,
+    rolling_batch_option,
     rolling_interval_option,
 )
 
@@ -38,6 +39,7 @@ if TYPE_CHECKING:
 @preview_option
 @force_option
 @rolling_interval_option
+@rolling_batch_option
 def ops(
     operation_names: tuple[str],
     extra_vars: tuple[str],
@@ -47,6 +49,7 @@ def ops(
     preview: bool,
     force: bool,
     rolling_interval: Optional[int] = None,
+    rolling_batch: Optional[str] = None,
 ):
     """Run a list of operations."""
 
@@ -59,7 +62,12 @@ def ops(
         f"Creating a deployment plan to run {len(operation_names)} operation(s)."
     )
     deployment = DeploymentModel.from_operations(
-        collections, operation_names, hosts, extra_vars, rolling_interval
+        collections,
+        operation_names,
+        hosts,
+        extra_vars,
+        rolling_interval,
+        rolling_batch=rolling_batch,
     )
     if preview:
         print_deployment(deployment)
@@ -69,5 +77,5 @@ def ops(
             validate_plan_creation(last_deployment.state, force)
             if last_deployment.state is DeploymentStateEnum.PLANNED:
                 deployment.id = last_deployment.id
-        dao.session.merge(deployment)
+        dao.add_deployment(deployment)
     click.echo("Deployment plan successfully created.")
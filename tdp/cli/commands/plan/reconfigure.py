@@ -12,6 +12,7 @@ from tdp.cli.params import (
     database_dsn_option,
     force_option,
     preview_option,
+    rolling_batch_option,
     rolling_interval_option,
 )
 
@@ -27,12 +28,14 @@ if TYPE_CHECKING:
 @preview_option
 @force_option
 @rolling_interval_option
+@rolling_batch_option
 def reconfigure(
     collections: Collections,
     db_engine: Engine,
     preview: bool,
     force: bool,
     rolling_interval: Optional[int] = None,
+    rolling_batch: Optional[str] = None,
 ):
     """Reconfigure required TDP services."""
 
@@ -49,6 +52,7 @@ def reconfigure(
                 filter_stale=True
             ),
             rolling_interval=rolling_interval,
+            rolling_batch=rolling_batch,
         )
         if preview:
             print_deployment(deployment)
@@ -57,5 +61,5 @@ def reconfigure(
             validate_plan_creation(last_deployment.state, force)
             if last_deployment.state is DeploymentStateEnum.PLANNED:
                 deployment.id = last_deployment.id
-        dao.session.merge(deployment)
+        dao.add_deployment(deployment)
     click.echo("Deployment plan successfully created.")
@@ -54,5 +54,5 @@ def resume(
             validate_plan_creation(last_deployment.state)
             if last_deployment.state is DeploymentStateEnum.PLANNED:
                 deployment.id = last_deployment.id
-        dao.session.merge(deployment)
+        dao.add_deployment(deployment)
     click.echo("Deployment plan successfully created.")
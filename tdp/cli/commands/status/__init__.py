@@ -3,8 +3,10 @@
 
 import click
 
+from tdp.cli.commands.status.compact import compact
 from tdp.cli.commands.status.edit import edit
 from tdp.cli.commands.status.generate_stales import generate_stales
+from tdp.cli.commands.status.rebuild import rebuild
 from tdp.cli.commands.status.show import show
 
 
@@ -14,6 +16,8 @@ def status() -> None:
     pass
 
 
+status.add_command(compact)
 status.add_command(edit)
 status.add_command(generate_stales)
+status.add_command(rebuild)
 status.add_command(show)
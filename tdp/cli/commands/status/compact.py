@@ -0,0 +1,58 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import click
+
+from tdp.cli.params import database_dsn_option
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+
+
+@click.command()
+@click.option(
+    "--before",
+    type=click.DateTime(),
+    help="Fold the status logs up to this date (UTC).",
+)
+@click.option(
+    "--deployment-id",
+    type=int,
+    help="Fold the status logs up to the end of this deployment.",
+)
+@click.option(
+    "--archive",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help="Write the folded status logs to this gzip compressed JSON lines file.",
+)
+@database_dsn_option
+def compact(
+    db_engine: Engine,
+    before: Optional[datetime],
+    deployment_id: Optional[int],
+    archive: Optional[Path],
+) -> None:
+    """Compact the status history.
+
+    Fold the old status logs into one snapshot log per hosted entity, which keeps
+    their latest values. The current status of the cluster is unchanged.
+    """
+    from tdp.dao import Dao
+
+    if (before is None) == (deployment_id is None):
+        raise click.UsageError("Either --before or --deployment-id must be given.")
+
+    with Dao(db_engine, commit_on_exit=True) as dao:
+        try:
+            count = dao.compact_status_logs(
+                before=before, deployment_id=deployment_id, archive=archive
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e)) from e
+    click.echo(f"{count} status logs compacted.")
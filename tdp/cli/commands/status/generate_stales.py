@@ -71,7 +71,7 @@ def generate_stales(
             click.echo(str(e))
             click.echo("Their status will not be updated.")
 
-        dao.session.add_all(stale_status_logs)
+        dao.add_status_logs(stale_status_logs)
         dao.session.commit()
 
         print_hosted_entity_status_log(
@@ -0,0 +1,29 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import click
+
+from tdp.cli.params import database_dsn_option
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+
+
+@click.command()
+@database_dsn_option
+def rebuild(db_engine: Engine) -> None:
+    """Rebuild the latest status of the hosted entities.
+
+    The latest status of each hosted entity is maintained when its status logs are
+    written. Rebuilding it from the status logs is only needed if they were written
+    outside of TDP.
+    """
+    from tdp.dao import Dao
+
+    with Dao(db_engine, commit_on_exit=True) as dao:
+        dao.rebuild_hosted_entity_statuses()
+    click.echo("Latest status of the hosted entities rebuilt.")
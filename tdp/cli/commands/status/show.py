@@ -24,7 +24,7 @@ if TYPE_CHECKING:
     from sqlalchemy import Engine
 
     from tdp.core.collections import Collections
-    from tdp.core.models.sch_status_log_model import SCHStatusLogModel
+    from tdp.dao import SCHStatusLogRow
 
 
 def _filter_stale(stale: Optional[bool], no_stale: Optional[bool]) -> Optional[bool]:
@@ -63,6 +63,10 @@ def _filter_stale(stale: Optional[bool], no_stale: Optional[bool]) -> Optional[b
     default=50,
     help="Limit number of lines returned with option --history.",
 )
+@click.option(
+    "--cursor",
+    help="Print the history following the given cursor, with option --history.",
+)
 def show(
     collections: Collections,
     db_engine: Engine,
@@ -75,6 +79,7 @@ def show(
     vars: Path,
     service: Optional[str] = None,
     component: Optional[str] = None,
+    cursor: Optional[str] = None,
 ) -> None:
     """Print the status of the cluster.
 
@@ -82,6 +87,9 @@ def show(
 
     --stale/--no-stale is used to select only stale or non-stale components. By default,
     both are printed (same as using both flags).
+
+    --history prints the status logs from the most recent, by pages of --limit lines.
+    The cursor of the next page is printed after each full page.
     """
 
     from tdp.cli.utils import (
@@ -106,15 +114,20 @@ def show(
 
     with Dao(db_engine) as dao:
         if history:
-            _print_sch_status_logs(
-                dao.get_hosted_entity_statuses_history(
+            try:
+                status_logs = dao.get_hosted_entity_statuses_history(
                     limit,
                     service,
                     component,
                     hosts,
                     filter_stale=_filter_stale(stale, no_stale),
+                    cursor=cursor,
                 )
-            )
+            except ValueError as e:
+                raise click.BadParameter(str(e), param_hint="--cursor") from e
+            _print_sch_status_logs(status_logs)
+            if status_logs and len(status_logs) == limit:
+                click.echo(f"\nNext page: --cursor {status_logs[-1].cursor}")
             return
 
         print_hosted_entity_status_log(
@@ -127,12 +140,21 @@ def show(
         )
 
 
-def _print_sch_status_logs(sch_status: Iterable[SCHStatusLogModel]) -> None:
+def _print_sch_status_logs(sch_status: Iterable[SCHStatusLogRow]) -> None:
     from tabulate import tabulate
 
+    from tdp.core.models.sch_status_log_model import format_status_value
+
     click.echo(
         tabulate(
-            [status.to_dict(filter_out=["id", "timestamp"]) for status in sch_status],
+            [
+                {
+                    key: format_status_value(key, value)
+                    for key, value in status._asdict().items()
+                    if key != "id"
+                }
+                for status in sch_status
+            ],
             headers="keys",
         )
     )
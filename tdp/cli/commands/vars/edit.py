@@ -139,7 +139,7 @@ def edit(
             except ServiceVariablesNotInitializedErrorList as e:
                 click.echo(str(e))
                 click.echo("Their status will not be updated.")
-            dao.session.add_all(stale_status_logs)
+            dao.add_status_logs(stale_status_logs)
             dao.session.commit()
 
         break
@@ -91,5 +91,5 @@ def update(
             cluster_variables=cluster_variables,
             collections=collections,
         )
-        dao.session.add_all(stale_status_logs)
+        dao.add_status_logs(stale_status_logs)
         dao.session.commit()
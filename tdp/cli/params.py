@@ -50,7 +50,51 @@ def rolling_interval_option(func: FC) -> FC:
         "--rolling-interval",
         envvar="TDP_ROLLING_INTERVAL",
         type=int,
-        help="Enable rolling restart with specific waiting time (in seconds) between component restart.",
+        help="Enable rolling restart with specific waiting time (in seconds) between component restart, or between batches with `--rolling-batch`.",
+    )(func)
+
+
+def _validate_rolling_batch_callback(
+    _ctx: click.Context, param: click.Parameter, value: Optional[str]
+) -> Optional[str]:
+    """Click callback that checks a rolling batch is a number or a percentage."""
+    from tdp.core.models.deployment_model import get_rolling_batch_size
+
+    if value is None:
+        return None
+    try:
+        get_rolling_batch_size(value, 100)
+    except ValueError:
+        raise click.BadParameter(
+            f"'{value}' is not a number of hosts or a percentage.", param=param
+        )
+    return value
+
+
+def rolling_batch_option(func: FC) -> FC:
+    """Add the `--rolling-batch` option to a Click command."""
+    return click.option(
+        "--rolling-batch",
+        envvar="TDP_ROLLING_BATCH",
+        type=str,
+        callback=_validate_rolling_batch_callback,
+        metavar="N|N%",
+        help="Enable rolling restart by batches of hosts: a number of hosts or a percentage of the hosts of the component. The hosts of a batch are restarted at once.",
+    )(func)
+
+
+def journal_dir_option(func: FC) -> FC:
+    """Add the `--journal-dir` option to a Click command."""
+    return click.option(
+        "--journal-dir",
+        envvar="TDP_JOURNAL_DIR",
+        type=click.Path(file_okay=False, path_type=pathlib.Path),
+        help=(
+            "Directory of the local journal of the running deployments. Defaults to "
+            "`<database file>.tdp_journal` for SQLite, to a directory per database "
+            "under `$XDG_STATE_HOME/tdp/journal` (`~/.local/state/tdp/journal`) "
+            "otherwise."
+        ),
     )(func)
 
 
@@ -103,18 +147,22 @@ def collections_option(func: FC) -> FC:
 
 
 def database_dsn_option(func: FC) -> FC:
-    """Add the `--database-dsn` option to a Click command.
+    """Add the `--database-dsn` and `--database-profile` options to a Click command.
 
     Return a SQLAlchemy Engine instance, available as "db_engine" in the command context.
     """
 
-    def _get_engine_callback(_ctx: click.Context, _param: click.Parameter, value):
+    def _store_profile_callback(ctx: click.Context, _param: click.Parameter, value):
+        """Click callback that stores the engine profile for the DSN callback."""
+        ctx.meta["database_profile"] = value
+
+    def _get_engine_callback(ctx: click.Context, _param: click.Parameter, value):
         """Click callback that returns a SQLAlchemy Engine instance."""
         from tdp.core.db import get_engine
 
-        return get_engine(value)
+        return get_engine(value, profile=ctx.meta.get("database_profile"))
 
-    return click.option(
+    func = click.option(
         "db_engine",
         "--database-dsn",
         envvar="TDP_DATABASE_DSN",
@@ -128,6 +176,21 @@ def database_dsn_option(func: FC) -> FC:
             "as psycopg2 for postgresql)."
         ),
     )(func)
+    return click.option(
+        "--database-profile",
+        envvar="TDP_DATABASE_PROFILE",
+        type=click.Choice(["default", "performance"]),
+        default="default",
+        # Processed before the DSN option
+        is_eager=True,
+        expose_value=False,
+        callback=_store_profile_callback,
+        help=(
+            "Database engine profile. 'performance' enables the WAL mode for SQLite, "
+            "so that status reads are not blocked by a running deployment, and a sized "
+            "connection pool with pre-ping for the other databases."
+        ),
+    )(func)
 
 
 def hosts_option(func: Optional[FC] = None, *, help: str) -> Callable[[FC], FC]:
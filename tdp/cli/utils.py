@@ -45,11 +45,7 @@ def check_services_cleanliness(cluster_variables: ClusterVariables) -> None:
     Raises:
         click.ClickException: If some services are in a dirty state.
     """
-    unclean_services = [
-        service_variables.name
-        for service_variables in cluster_variables.values()
-        if not service_variables.clean
-    ]
+    unclean_services = cluster_variables.get_unclean_services()
     if unclean_services:
         for name in unclean_services:
             click.echo(
@@ -14,6 +14,14 @@ YML_EXTENSION = ".yml"
 # Special operations
 OPERATION_SLEEP_NAME = "wait_sleep"
 OPERATION_SLEEP_VARIABLE = "wait_sleep_seconds"
+# Operations skipped by `tdp deploy --skip-unchanged` if their inputs are unchanged
+IDEMPOTENT_ACTIONS = ("install", "config")
+# Deployment progress
+PROGRESS_FLUSH_INTERVAL = 1.0  # seconds
+PROGRESS_QUEUE_SIZE = 1000
+# Operation logs capture
+LOGS_CHUNK_SIZE = 64 * 1024  # bytes
+LOGS_FLUSH_INTERVAL = 5.0  # seconds
 # Max lengths
 MESSAGE_MAX_LENGTH = 512
 HOST_NAME_MAX_LENGTH = 255
@@ -22,6 +30,7 @@ SERVICE_NAME_MAX_LENGTH = 20
 COMPONENT_NAME_MAX_LENGTH = 30
 ACTION_NAME_MAX_LENGTH = 20
 LOGS_MAX_LENGTH = 10000000
+FINGERPRINT_LENGTH = 64  # sha256 hex digest
 OPERATION_NAME_MAX_LENGTH = (
     SERVICE_NAME_MAX_LENGTH + COMPONENT_NAME_MAX_LENGTH + ACTION_NAME_MAX_LENGTH + 2
 )  # <service>_<component>_<action>
@@ -40,6 +49,8 @@ SERVICE_PRIORITY = {
     "knox": 11,
 }
 DEFAULT_SERVICE_PRIORITY = 99
+# Maximum number of service repositories kept open at once
+MAX_OPEN_REPOSITORIES = 8
 # Validation message logic (used in variables update)
 VALIDATION_MESSAGE_FILE = "COMMIT_EDITMSG"
 DEFAULT_VALIDATION_MESSAGE = "Updated from one or more directories"
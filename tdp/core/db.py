@@ -3,27 +3,132 @@
 from __future__ import annotations
 
 import os
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Callable, Optional, Union
 
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 
+from tdp.core.utils import BaseEnum
+
 if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
     from sqlalchemy.orm import Session
 
+# SQLite settings of the performance profile
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024  # bytes
+SQLITE_BUSY_TIMEOUT = 30  # seconds
+# Pool settings of the performance profile for the other dialects
+POOL_SIZE = 10
+POOL_MAX_OVERFLOW = 20
+POOL_RECYCLE = 3600  # seconds
 
-def get_engine(
-    dsn: Optional[str] = None, *, env_var: str = "TDP_DATABASE_DSN"
-) -> Engine:
-    """Create a SQLAlchemy engine from a DSN."""
+
+class EngineProfileEnum(BaseEnum):
+    """Engine profile.
+
+    - DEFAULT: SQLAlchemy defaults.
+    - PERFORMANCE: SQLite in WAL mode, so that readers are not blocked by a writer,
+      with synchronous=NORMAL, memory-mapped I/O and a busy timeout. Sized pool with
+      pre-ping for the other dialects.
+    """
+
+    DEFAULT = "default"
+    PERFORMANCE = "performance"
+
+
+def _set_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+    """Set the performance pragmas on a new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT * 1000}")
+    finally:
+        cursor.close()
+
+
+def _create_performance_engine(dsn: str, create: Callable = create_engine):
+    url = make_url(dsn)
+    if url.get_backend_name() != "sqlite":
+        return create(
+            dsn,
+            pool_size=POOL_SIZE,
+            max_overflow=POOL_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            pool_recycle=POOL_RECYCLE,
+        )
+    engine = create(dsn, connect_args={"timeout": SQLITE_BUSY_TIMEOUT})
+    # WAL is not available for in-memory databases
+    if url.database and url.database != ":memory:":
+        # Connection events of an async engine are listened on its sync engine
+        event.listen(
+            getattr(engine, "sync_engine", engine), "connect", _set_sqlite_pragmas
+        )
+    return engine
+
+
+def _get_engine_arguments(
+    dsn: Optional[str],
+    env_var: str,
+    profile: Optional[Union[EngineProfileEnum, str]],
+    profile_env_var: str,
+) -> tuple[str, EngineProfileEnum]:
+    """Read the DSN and the engine profile from the environment if not given."""
     dsn = dsn or os.getenv(env_var)
     if not dsn:
         raise ValueError(
             f"Database DSN must be provided via {env_var} environment variable."
         )
+    profile = EngineProfileEnum(
+        profile or os.getenv(profile_env_var) or EngineProfileEnum.DEFAULT
+    )
+    return dsn, profile
+
+
+def get_engine(
+    dsn: Optional[str] = None,
+    *,
+    env_var: str = "TDP_DATABASE_DSN",
+    profile: Optional[Union[EngineProfileEnum, str]] = None,
+    profile_env_var: str = "TDP_DATABASE_PROFILE",
+) -> Engine:
+    """Create a SQLAlchemy engine from a DSN.
+
+    Args:
+        dsn: Database DSN, read from `env_var` if None.
+        env_var: Environment variable of the DSN.
+        profile: Engine profile, read from `profile_env_var` if None, default profile
+          if not set.
+        profile_env_var: Environment variable of the engine profile.
+    """
+    dsn, profile = _get_engine_arguments(dsn, env_var, profile, profile_env_var)
+    if profile == EngineProfileEnum.PERFORMANCE:
+        return _create_performance_engine(dsn)
     return create_engine(dsn)
 
 
+def get_async_engine(
+    dsn: Optional[str] = None,
+    *,
+    env_var: str = "TDP_DATABASE_DSN",
+    profile: Optional[Union[EngineProfileEnum, str]] = None,
+    profile_env_var: str = "TDP_DATABASE_PROFILE",
+) -> AsyncEngine:
+    """Create a SQLAlchemy asyncio engine from a DSN.
+
+    The DSN must use an asyncio driver (e.g. sqlite+aiosqlite:////data/tdp.db or
+    postgresql+asyncpg://...), see `get_engine` for the arguments.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    dsn, profile = _get_engine_arguments(dsn, env_var, profile, profile_env_var)
+    if profile == EngineProfileEnum.PERFORMANCE:
+        return _create_performance_engine(dsn, create_async_engine)
+    return create_async_engine(dsn)
+
+
 def get_session(engine: Optional[Engine] = None) -> Session:
     """Create a SQLAlchemy session from an engine."""
     engine = engine or get_engine()
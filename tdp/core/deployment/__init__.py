@@ -1,6 +1,11 @@
 # Copyright 2022 TOSIT.IO
 # SPDX-License-Identifier: Apache-2.0
 
+from tdp.core.deployment.ansible_api_executor import AnsibleApiExecutor
+from tdp.core.deployment.async_executor import AsyncExecutor
 from tdp.core.deployment.deployment_iterator import DeploymentIterator
 from tdp.core.deployment.deployment_runner import DeploymentRunner
 from tdp.core.deployment.executor import Executor
+from tdp.core.deployment.parallel_deployment_iterator import (
+    ParallelDeploymentIterator,
+)
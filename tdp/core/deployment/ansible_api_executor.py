@@ -0,0 +1,320 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import copy
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import threading
+import traceback
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Optional
+
+from tdp.core.constants import LOGS_CHUNK_SIZE
+from tdp.core.deployment.executor import (
+    HOST_RESULTS_FILE_ENV_VAR,
+    Executor,
+    get_console,
+)
+from tdp.core.deployment.log_buffer import LogBuffer, LogsCallback
+from tdp.core.models.enums import OperationStateEnum
+
+logger = logging.getLogger(__name__)
+
+# Interval (in seconds) between two reads of the output of a running playbook
+OUTPUT_POLL_INTERVAL = 0.1
+# Environment variables read at each run, the other ones are read by Ansible when
+# the worker imports it and are set when the worker starts
+RUN_ENV_VARS = (HOST_RESULTS_FILE_ENV_VAR,)
+
+# Environment of a worker, see `AnsibleApiExecutor._get_worker`
+WorkerEnv = tuple[tuple[str, str], ...]
+
+
+@contextmanager
+def _redirect_output(path: str):
+    """Redirect the stdout and stderr file descriptors of the process to a file."""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_fds = os.dup(1), os.dup(2)
+    with open(path, "wb", buffering=0) as fd:
+        os.dup2(fd.fileno(), 1)
+        os.dup2(fd.fileno(), 2)
+        try:
+            yield
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved_fds[0], 1)
+            os.dup2(saved_fds[1], 2)
+            os.close(saved_fds[0])
+            os.close(saved_fds[1])
+
+
+def _get_inventory_state(inventory) -> tuple[dict, dict]:
+    """Get the hosts and groups of an Ansible inventory, with their variables."""
+    return (
+        {name: copy.deepcopy(host.vars) for name, host in inventory.hosts.items()},
+        {
+            name: (
+                sorted(host.name for host in group.hosts),
+                sorted(child.name for child in group.child_groups),
+                copy.deepcopy(group.vars),
+            )
+            for name, group in inventory.groups.items()
+        },
+    )
+
+
+def _worker_main(
+    connection: Connection, run_directory: Optional[str], env: WorkerEnv
+) -> None:
+    """Run the playbooks received from the connection until None is received.
+
+    The data loader, the plugins and the inventory are loaded by the first run and
+    reused by the next ones. Each run gets a fresh variable manager, so that the
+    facts and variables set by a run are not seen by the next ones, and the
+    inventory is parsed again if a run modified it (e.g. with add_host).
+
+    The settings of Ansible are read once, from the environment of the worker.
+    """
+    if run_directory is not None:
+        os.chdir(run_directory)
+    os.environ.update(env)
+
+    # Playbooks don't read the standard input
+    stdin = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(stdin, 0)
+    os.close(stdin)
+
+    loader = inventory = inventory_state = None
+
+    def run(command: list[str]) -> int:
+        nonlocal loader, inventory, inventory_state
+        # Ansible reads its configuration from the run directory and checks the
+        # standard streams when imported, hence imported by the first run
+        from ansible import context
+        from ansible.cli import CLI
+        from ansible.cli.playbook import PlaybookCLI
+        from ansible.executor.playbook_executor import PlaybookExecutor
+        from ansible.plugins.loader import add_all_plugin_dirs, init_plugin_loader
+        from ansible.utils.context_objects import CLIArgs
+        from ansible.utils.vars import load_extra_vars
+        from ansible.vars.manager import VariableManager
+
+        # PlaybookCLI.parse would keep the arguments of the first run, the global
+        # arguments being a singleton
+        cli = PlaybookCLI(command)
+        cli.init_parser()
+        options = cli.post_process_args(cli.parser.parse_args(command[1:]))
+        context.CLIARGS = CLIArgs.from_options(options)
+        if inventory is None:
+            init_plugin_loader(context.CLIARGS.get("collections_path") or [])
+            loader, inventory, _ = CLI._play_prereqs()
+            inventory_state = _get_inventory_state(inventory)
+        elif _get_inventory_state(inventory) != inventory_state:
+            # The previous run added hosts or groups, parse the inventory again
+            # without the hosts it added, which are kept by a refresh otherwise
+            inventory._cached_dynamic_hosts = []
+            inventory.refresh_inventory()
+            inventory_state = _get_inventory_state(inventory)
+        inventory.remove_restriction()
+        for playbook in context.CLIARGS["args"]:
+            add_all_plugin_dirs(os.path.dirname(os.path.abspath(playbook)))
+        # The extra vars of the first run are memoized too
+        load_extra_vars.extra_vars = None
+        variable_manager = VariableManager(
+            loader=loader,
+            inventory=inventory,
+            version_info=CLI.version_info(gitinfo=False),
+        )
+        CLI.get_host_list(inventory, context.CLIARGS["subset"])
+        return PlaybookExecutor(
+            playbooks=context.CLIARGS["args"],
+            inventory=inventory,
+            variable_manager=variable_manager,
+            loader=loader,
+            passwords={},
+        ).run()
+
+    while (request := connection.recv()) is not None:
+        command, env, output_path = request
+        saved_env = {key: os.environ.get(key) for key in env}
+        os.environ.update(env)
+        with _redirect_output(output_path):
+            try:
+                return_code = run(command)
+            except BaseException:
+                # Ansible exits on some errors
+                traceback.print_exc()
+                return_code = 1
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        connection.send(return_code)
+
+
+class _Worker:
+    """Long-lived process running playbooks with the Ansible API."""
+
+    def __init__(self, run_directory: Optional[str], env: WorkerEnv):
+        # Ansible must be imported in a fresh interpreter, after changing directory
+        context = multiprocessing.get_context("spawn")
+        self.connection, child_connection = context.Pipe()
+        # Not a daemon, Ansible starts its own worker processes
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_connection, run_directory, env),
+            name="tdp-ansible-worker",
+        )
+        self.process.start()
+        child_connection.close()
+
+    def stop(self) -> None:
+        if self.process.is_alive():
+            try:
+                self.connection.send(None)
+            except OSError:
+                pass
+            self.process.join(timeout=10)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+
+class AnsibleApiExecutor(Executor):
+    """Executor running the playbooks with the Ansible `PlaybookExecutor` API.
+
+    Playbooks run in long-lived worker processes, which load Ansible, its plugins
+    and the inventory once instead of at each operation. A worker runs one playbook
+    at a time, workers are started on demand for concurrent operations.
+
+    As Ansible reads its settings once, a worker only runs the playbooks with the
+    environment it was started with: the settings of a deployment scope get their
+    own workers, which are stopped when leaving the scope. The other workers are
+    stopped by `close`.
+    """
+
+    def __init__(self, run_directory=None, dry: bool = False):
+        """Initialize the executor.
+
+        Args:
+            run_directory: Directory where to run the playbooks.
+            dry: Whether or not to run the playbooks in dry mode.
+        """
+        super().__init__(run_directory, dry)
+        # Idle workers, by environment
+        self._workers: dict[WorkerEnv, queue.SimpleQueue[_Worker]] = {}
+        self._workers_lock = threading.Lock()
+
+    def _resolve_ansible_path(self) -> str:
+        # Only used to log the commands
+        return "ansible-playbook"
+
+    def close(self) -> None:
+        """Stop the idle workers."""
+        with self._workers_lock:
+            workers, self._workers = self._workers, {}
+        for idle_workers in workers.values():
+            while True:
+                try:
+                    idle_workers.get_nowait().stop()
+                except queue.Empty:
+                    break
+
+    @contextmanager
+    def deployment_scope(
+        self, deployment_id: Optional[int], reuse_ssh_connections: bool = True
+    ) -> Iterator[None]:
+        """See `Executor.deployment_scope`, the workers are stopped when leaving
+        the context, their settings refer to its temporary directory."""
+        with super().deployment_scope(deployment_id, reuse_ssh_connections):
+            try:
+                yield
+            finally:
+                self.close()
+
+    def _get_idle_workers(self, env: WorkerEnv) -> queue.SimpleQueue[_Worker]:
+        with self._workers_lock:
+            return self._workers.setdefault(env, queue.SimpleQueue())
+
+    def _get_worker(self, env: WorkerEnv) -> _Worker:
+        try:
+            return self._get_idle_workers(env).get_nowait()
+        except queue.Empty:
+            return _Worker(str(self._rundir) if self._rundir is not None else None, env)
+
+    def _execute_ansible_command(
+        self,
+        command: list[str],
+        env: Optional[Mapping[str, str]] = None,
+        on_logs: Optional[LogsCallback] = None,
+    ) -> tuple[OperationStateEnum, bytes]:
+        """Run an ansible-playbook command line in a worker.
+
+        Args:
+            command: Command to execute with args.
+            env: Environment of the command, only the variables which differ from
+              the current environment are passed to the worker.
+            on_logs: Called periodically with the logs while the command runs.
+
+        Returns:
+            A tuple with the state of the command and the output of the command.
+        """
+        env = {
+            key: value
+            for key, value in (env or {}).items()
+            if os.environ.get(key) != value
+        }
+        run_env = {key: env.pop(key) for key in RUN_ENV_VARS if key in env}
+        # Loaded by the first run, the callback writing the recap of each host is
+        # used by `execute_hosts`
+        env["ANSIBLE_CALLBACK_PLUGINS"] = self._get_callback_plugins()
+        worker_env = tuple(sorted(env.items()))
+        worker = self._get_worker(worker_env)
+        with tempfile.TemporaryDirectory(prefix="tdp_") as tmp_dir:
+            output_path = Path(tmp_dir, "output")
+            output_path.touch()
+            logs = LogBuffer(passthrough=get_console(), on_logs=on_logs)
+            with output_path.open("rb") as output:
+
+                def read_output() -> None:
+                    while chunk := output.read(LOGS_CHUNK_SIZE):
+                        logs.write(chunk)
+
+                try:
+                    worker.connection.send((command, run_env, str(output_path)))
+                    while not worker.connection.poll(OUTPUT_POLL_INTERVAL):
+                        read_output()
+                    return_code = worker.connection.recv()
+                except KeyboardInterrupt:
+                    logger.debug("KeyboardInterrupt caught")
+                    worker.stop()
+                    read_output()
+                    logs.write(b"\nKeyboardInterrupt")
+                    return OperationStateEnum.FAILURE, logs.getvalue()
+                except (EOFError, OSError) as e:
+                    # The worker died, it is not reused
+                    logger.error(f"Ansible worker failed: {e}")
+                    worker.stop()
+                    read_output()
+                    return OperationStateEnum.FAILURE, logs.getvalue()
+                read_output()
+                self._get_idle_workers(worker_env).put(worker)
+                state = (
+                    OperationStateEnum.SUCCESS
+                    if return_code == 0
+                    else OperationStateEnum.FAILURE
+                )
+                return state, logs.getvalue()
@@ -0,0 +1,206 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import signal
+import threading
+import time
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from tdp.core.constants import LOGS_CHUNK_SIZE
+from tdp.core.deployment.executor import Executor, get_console
+from tdp.core.deployment.log_buffer import LogBuffer, LogsCallback
+from tdp.core.models.enums import OperationStateEnum
+
+logger = logging.getLogger(__name__)
+
+# Time (in seconds) given to a process to stop after SIGTERM, before SIGKILL
+KILL_TIMEOUT = 10.0
+
+
+async def _drain(stream: asyncio.StreamReader, logs: LogBuffer) -> None:
+    while chunk := await stream.read(LOGS_CHUNK_SIZE):
+        logs.write(chunk)
+
+
+def _signal_process_group(process: asyncio.subprocess.Process, signum: int) -> None:
+    """Send a signal to a process started in its own session and to its children
+    (e.g. the ssh connections of ansible-playbook)."""
+    try:
+        os.killpg(process.pid, signum)
+    except ProcessLookupError:
+        # Already exited
+        pass
+
+
+class AsyncExecutor(Executor):
+    """Executor running ansible-playbook with asyncio subprocesses.
+
+    The stdout and stderr of a playbook are drained concurrently. A playbook is
+    stopped when it exceeds the operation timeout or the deployment timeout,
+    counted from the start of the deployment scope (see `deployment_scope`), or
+    from the first execution outside of a deployment scope. It is sent SIGTERM,
+    then SIGKILL if it is still running after `kill_timeout` seconds, and fails.
+
+    `execute` runs a playbook in its own event loop, this is what the deployment
+    iterators use from their threads. `execute_async` is the groundwork to run
+    many playbooks from a single event loop, it is not used by the deployment
+    runner yet.
+    """
+
+    def __init__(
+        self,
+        run_directory=None,
+        dry: bool = False,
+        *,
+        operation_timeout: Optional[float] = None,
+        deployment_timeout: Optional[float] = None,
+        kill_timeout: float = KILL_TIMEOUT,
+    ):
+        """Initialize the executor.
+
+        Args:
+            run_directory: Directory where to run the ansible command.
+            dry: Whether or not to run the command in dry mode.
+            operation_timeout: Maximum duration (in seconds) of a playbook.
+            deployment_timeout: Maximum duration (in seconds) of the deployment,
+              from the start of the deployment scope or of the first playbook.
+            kill_timeout: Time (in seconds) given to a playbook to stop after
+              SIGTERM, before SIGKILL.
+
+        Raises:
+            ExecutableNotFoundError: If the ansible-playbook command is not found in PATH.
+        """
+        super().__init__(run_directory, dry)
+        self._operation_timeout = operation_timeout
+        self._deployment_timeout = deployment_timeout
+        self._kill_timeout = kill_timeout
+        self._deadline: Optional[float] = None
+        self._deadline_lock = threading.Lock()
+
+    @contextmanager
+    def deployment_scope(
+        self, deployment_id: Optional[int], reuse_ssh_connections: bool = True
+    ) -> Iterator[None]:
+        """Share resources between the playbooks run during a deployment, see
+        `Executor.deployment_scope`.
+
+        The deployment timeout is counted from the start of the scope.
+        """
+        with super().deployment_scope(deployment_id, reuse_ssh_connections):
+            if self._deployment_timeout is not None:
+                with self._deadline_lock:
+                    self._deadline = time.monotonic() + self._deployment_timeout
+            try:
+                yield
+            finally:
+                with self._deadline_lock:
+                    self._deadline = None
+
+    def _get_timeout(self) -> Optional[float]:
+        """Get the time left to a new playbook, None if unlimited."""
+        now = time.monotonic()
+        timeouts = []
+        if self._operation_timeout is not None:
+            timeouts.append(self._operation_timeout)
+        if self._deployment_timeout is not None:
+            with self._deadline_lock:
+                if self._deadline is None:
+                    self._deadline = now + self._deployment_timeout
+            timeouts.append(max(self._deadline - now, 0))
+        return min(timeouts) if timeouts else None
+
+    async def execute_async(
+        self,
+        playbook: Path,
+        host: Optional[str] = None,
+        extra_vars: Optional[Iterable[str]] = None,
+        on_logs: Optional[LogsCallback] = None,
+    ) -> tuple[OperationStateEnum, bytes]:
+        """Executes a playbook, see `execute`."""
+        command = self._build_command(playbook, host, extra_vars)
+        if self._dry:
+            # Operation always succeed in dry mode
+            logger.debug("[DRY MODE] Ansible command: " + " ".join(command))
+            return OperationStateEnum.SUCCESS, b""
+        logger.debug("Ansible command: " + " ".join(command))
+        logs = LogBuffer(passthrough=get_console(), on_logs=on_logs)
+        state = await self._run_command(command, self._get_env(), logs)
+        return state, logs.getvalue()
+
+    def _execute_ansible_command(
+        self,
+        command: list[str],
+        env: Optional[Mapping[str, str]] = None,
+        on_logs: Optional[LogsCallback] = None,
+    ) -> tuple[OperationStateEnum, bytes]:
+        logs = LogBuffer(passthrough=get_console(), on_logs=on_logs)
+        try:
+            state = asyncio.run(self._run_command(command, env, logs))
+        except KeyboardInterrupt:
+            # The process was stopped when the event loop cancelled the command
+            logger.debug("KeyboardInterrupt caught")
+            logs.write(b"\nKeyboardInterrupt")
+            return OperationStateEnum.FAILURE, logs.getvalue()
+        return state, logs.getvalue()
+
+    async def _run_command(
+        self,
+        command: list[str],
+        env: Optional[Mapping[str, str]],
+        logs: LogBuffer,
+    ) -> OperationStateEnum:
+        timeout = self._get_timeout()
+        if timeout is not None and timeout <= 0:
+            logs.write(b"Deployment timeout reached, the command was not run.\n")
+            return OperationStateEnum.FAILURE
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self._rundir,
+            env=env,
+            # Own process group, so that the children are stopped too
+            start_new_session=True,
+        )
+
+        async def wait() -> int:
+            await asyncio.gather(
+                _drain(process.stdout, logs), _drain(process.stderr, logs)
+            )
+            return await process.wait()
+
+        try:
+            return_code = await asyncio.wait_for(wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Command timed out after {timeout:.0f}s: {' '.join(command)}")
+            logs.write(b"\nTimed out after %.0fs, stopping the command.\n" % timeout)
+            await self._stop(process)
+            return OperationStateEnum.FAILURE
+        except asyncio.CancelledError:
+            await self._stop(process)
+            raise
+        return (
+            OperationStateEnum.SUCCESS
+            if return_code == 0
+            else OperationStateEnum.FAILURE
+        )
+
+    async def _stop(self, process: asyncio.subprocess.Process) -> None:
+        """Stop a process with SIGTERM, then SIGKILL if it doesn't exit in time."""
+        if process.returncode is not None:
+            return
+        _signal_process_group(process, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(process.wait(), self._kill_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Process {process.pid} did not stop, sending SIGKILL.")
+            _signal_process_group(process, signal.SIGKILL)
+            await process.wait()
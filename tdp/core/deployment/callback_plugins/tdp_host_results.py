@@ -0,0 +1,32 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+"""Ansible callback writing the recap of each host to a JSON file.
+
+The path of the file is read from the TDP_HOST_RESULTS_FILE environment variable,
+the callback does nothing if it is not set.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+
+from ansible.plugins.callback import CallbackBase
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "aggregate"
+    CALLBACK_NAME = "tdp_host_results"
+    # Loaded as soon as it is in the callback plugins path
+    CALLBACK_NEEDS_ENABLED = False
+
+    def v2_playbook_on_stats(self, stats):
+        path = os.environ.get("TDP_HOST_RESULTS_FILE")
+        if not path:
+            return
+        with open(path, "w") as fd:
+            json.dump(
+                {host: stats.summarize(host) for host in sorted(stats.processed)}, fd
+            )
@@ -4,8 +4,8 @@
 from __future__ import annotations
 
 import logging
-from collections import OrderedDict
-from collections.abc import Callable, Iterator
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterator, Sequence
 from datetime import datetime
 from functools import partial
 from typing import TYPE_CHECKING, Optional
@@ -21,6 +21,7 @@ from tdp.core.models import (
     SCHStatusLogModel,
     SCHStatusLogSourceEnum,
 )
+from tdp.core.models.deployment_model import get_rolling_batches
 from tdp.core.models.enums import DeploymentStateEnum, OperationStateEnum
 
 if TYPE_CHECKING:
@@ -59,6 +60,46 @@ def _group_hosts_by_operation(
     return operation_to_hosts_set
 
 
+def _get_service_versions(
+    deployment: DeploymentModel,
+    *,
+    collections: Collections,
+    cluster_variables: ClusterVariables,
+) -> dict[str, str]:
+    """Get the current version of each service involved in a deployment.
+
+    Services without variables are skipped.
+
+    Raises:
+        NoVersionYet: If a service repository has no version yet.
+    """
+    service_versions: dict[str, str] = {}
+    for operation_rec in deployment.operations:
+        if operation_rec.operation == OPERATION_SLEEP_NAME:
+            continue
+        if (operation := collections.operations.get(operation_rec.operation)) is None:
+            continue
+        service = operation.name.service
+        if service not in service_versions and service in cluster_variables:
+            service_versions[service] = cluster_variables[service].version
+    return service_versions
+
+
+def can_coalesce(
+    operation_recs: Sequence[OperationModel], operation_rec: OperationModel
+) -> bool:
+    """Whether an operation can run with the given occurrences of the same
+    operation, with a single playbook execution on all their hosts."""
+    first = operation_recs[0]
+    return (
+        operation_rec.operation == first.operation
+        and operation_rec.host is not None
+        and first.host is not None
+        and operation_rec.extra_vars == first.extra_vars
+        and operation_rec.host not in {other.host for other in operation_recs}
+    )
+
+
 class DeploymentIterator(Iterator[tuple[OperationModel, Optional[ProcessOperationFn]]]):
     """Iterator that runs an operation at each iteration.
 
@@ -75,6 +116,8 @@ class DeploymentIterator(Iterator[tuple[OperationModel, Optional[ProcessOperatio
         cluster_variables: ClusterVariables,
         cluster_status: ClusterStatus,
         force_stale_update: bool,
+        run_hosts_method: Optional[Callable[[list[OperationModel]], None]] = None,
+        coalesce_hosts: bool = True,
     ):
         """Initialize the iterator.
 
@@ -84,17 +127,36 @@ class DeploymentIterator(Iterator[tuple[OperationModel, Optional[ProcessOperatio
             run_method: Method to run the operation.
             cluster_variables: ClusterVariables instance.
             cluster_status: ClusterStatus instance.
+            run_hosts_method: Method to run consecutive occurrences of an operation
+              on their hosts at once. Occurrences are run one by one if None.
+            coalesce_hosts: Whether to run at once the occurrences which are not
+              part of a rolling batch of the deployment (see
+              `get_rolling_batches`), the ones of a batch are always run at once.
         """
-        # Initialize the deployment state
-        self.deployment = deployment
-        self.deployment.start_running()
         # Initialize the iterator
         self._cluster_status = cluster_status
         self._collections = collections
         self._run_operation = run_method
+        self._run_operation_hosts = run_hosts_method
+        self._coalesce_hosts = coalesce_hosts
+        self._rolling_batches = get_rolling_batches(deployment)
         self._cluster_variables = cluster_variables
         self.force_stale_update = force_stale_update
-        self._iter = iter(deployment.operations)
+        # Snapshot the service versions used to update the cluster status, they are
+        # recorded in the deployment options
+        self._service_versions = _get_service_versions(
+            deployment, collections=collections, cluster_variables=cluster_variables
+        )
+        # Initialize the deployment state
+        self.deployment = deployment
+        self.deployment.options = {
+            **(self.deployment.options or {}),
+            "service_versions": self._service_versions,
+        }
+        self.deployment.start_running()
+        self._operations_left = deque(deployment.operations)
+        # Operations run along with a previous occurrence, left to be reported
+        self._executed: deque[OperationModel] = deque()
         # Initialize the reconfigure_operations dict
         # This dict is used to keep track of the reconfigure operations that are left
         # to run
@@ -114,17 +176,7 @@ class DeploymentIterator(Iterator[tuple[OperationModel, Optional[ProcessOperatio
         self,
     ) -> tuple[OperationModel, Optional[ProcessOperationFn]]:
         try:
-            while True:
-                operation_rec = next(self._iter)
-
-                # Return early if deployment failed
-                if self.deployment.state == DeploymentStateEnum.FAILURE:
-                    operation_rec.state = OperationStateEnum.HELD
-                    return operation_rec, None
-
-                operation_rec.state = OperationStateEnum.RUNNING
-
-                return operation_rec, partial(self._process_operation_fn, operation_rec)
+            return self._next_operation()
         # StopIteration is a "normal" exception raised when the iteration has stopped
         except StopIteration as e:
             self.deployment.end_time = datetime.utcnow()
@@ -137,18 +189,104 @@ class DeploymentIterator(Iterator[tuple[OperationModel, Optional[ProcessOperatio
             self.deployment.state = DeploymentStateEnum.FAILURE
             raise e
 
+    def close(self) -> None:
+        """Release the resources of the iterator, when the deployment stops before
+        the end of the iteration. Operations already running are not interrupted."""
+
+    def _next_operation(
+        self,
+    ) -> tuple[OperationModel, Optional[ProcessOperationFn]]:
+        """Get the next operation, in the order of the deployment.
+
+        Raises:
+            StopIteration: If there is no operation left.
+        """
+        # Operations already executed are reported even if the deployment failed
+        if self._executed:
+            operation_rec = self._executed.popleft()
+            return operation_rec, partial(self._end_operation, operation_rec)
+
+        if not self._operations_left:
+            raise StopIteration
+        operation_rec = self._operations_left.popleft()
+
+        # Return early if deployment failed
+        if self.deployment.state == DeploymentStateEnum.FAILURE:
+            operation_rec.state = OperationStateEnum.HELD
+            return operation_rec, None
+
+        operation_rec.state = OperationStateEnum.RUNNING
+
+        operation_recs = [operation_rec]
+        if self._run_operation_hosts is not None:
+            while self._operations_left and self._can_coalesce(
+                operation_recs, self._operations_left[0]
+            ):
+                operation_recs.append(self._operations_left.popleft())
+        if len(operation_recs) > 1:
+            return operation_rec, partial(
+                self._process_operation_hosts_fn, operation_recs
+            )
+
+        return operation_rec, partial(self._process_operation_fn, operation_rec)
+
+    def _can_coalesce(
+        self, operation_recs: Sequence[OperationModel], operation_rec: OperationModel
+    ) -> bool:
+        """Whether an operation can run with the given occurrences of the same
+        operation (see `can_coalesce`), within the same rolling batch."""
+        batch = self._rolling_batches.get(operation_recs[0].operation_order)
+        if batch != self._rolling_batches.get(operation_rec.operation_order) or (
+            batch is None and not self._coalesce_hosts
+        ):
+            return False
+        return can_coalesce(operation_recs, operation_rec)
+
     def _process_operation_fn(
         self, operation_rec: OperationModel
     ) -> Optional[list[SCHStatusLogModel]]:
-        operation = self._collections.operations[operation_rec.operation]
+        self._execute_operation(operation_rec)
+        return self._end_operation(operation_rec)
+
+    def _process_operation_hosts_fn(
+        self, operation_recs: list[OperationModel]
+    ) -> Optional[list[SCHStatusLogModel]]:
+        self._execute_operations(operation_recs)
+        # The other occurrences are reported by the next iterations
+        self._executed.extend(operation_recs[1:])
+        return self._end_operation(operation_recs[0])
+
+    def _execute_operations(self, operation_recs: list[OperationModel]) -> None:
+        """Run occurrences of an operation on their hosts at once, only mutating the
+        operation records."""
+        if len(operation_recs) == 1 or self._run_operation_hosts is None:
+            for operation_rec in operation_recs:
+                self._execute_operation(operation_rec)
+            return
+        for operation_rec in operation_recs:
+            operation_rec.state = OperationStateEnum.RUNNING
+        self._run_operation_hosts(operation_recs)
 
-        # Run the operation
+    def _execute_operation(self, operation_rec: OperationModel) -> None:
+        """Run an operation, only mutating the operation record."""
+        operation = self._collections.operations[operation_rec.operation]
         if isinstance(operation, OperationNoop):
             # A noop operation is always successful
             operation_rec.state = OperationStateEnum.SUCCESS
         else:
             self._run_operation(operation_rec)
 
+    def _end_operation(
+        self, operation_rec: OperationModel
+    ) -> Optional[list[SCHStatusLogModel]]:
+        """Report an executed operation to the deployment and to the cluster status.
+
+        Returns:
+            Status logs of the updated hosted entities.
+        """
+        operation = self._collections.operations[operation_rec.operation]
+        self.deployment.end_operation(operation_rec)
+
         # Set deployment status to failure if the operation failed
         if operation_rec.state != OperationStateEnum.SUCCESS:
             self.deployment.end_time = datetime.utcnow()
@@ -211,7 +349,7 @@ class DeploymentIterator(Iterator[tuple[OperationModel, Optional[ProcessOperatio
             sch_status_log = self._cluster_status.update_hosted_entity(
                 create_hosted_entity(entity_name, host),
                 action_name=operation.name.action,
-                version=self._cluster_variables[operation.name.service].version,
+                version=self._service_versions[operation.name.service],
                 can_update_stale=can_update_stale,
             )
             if sch_status_log:
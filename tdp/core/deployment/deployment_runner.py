@@ -3,12 +3,26 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import threading
+from collections.abc import Callable, Iterable, Mapping
 from datetime import datetime
-from typing import TYPE_CHECKING
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
+import networkx as nx
+
+from tdp.core.constants import IDEMPOTENT_ACTIONS
+from tdp.core.dag import Dag
 from tdp.core.deployment.deployment_iterator import DeploymentIterator
-from tdp.core.models.enums import OperationStateEnum
+from tdp.core.deployment.parallel_deployment_iterator import (
+    ParallelDeploymentIterator,
+    _get_dag_node,
+)
+from tdp.core.models.enums import FailurePolicyEnum, OperationStateEnum
 from tdp.core.variables import ClusterVariables
 
 if TYPE_CHECKING:
@@ -20,6 +34,51 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Fingerprint of the last run of each operation and host, see `DeploymentRunner.run`
+LastFingerprints = Mapping[tuple[str, Optional[str]], Optional[str]]
+
+
+def get_collection_hash(path: Path) -> str:
+    """Hash the files of a collection (playbooks, roles, plugins...).
+
+    Hidden files and directories, such as the `.git` directory, are ignored.
+    """
+    collection_hash = hashlib.sha256()
+    for file in sorted(path.rglob("*")):
+        relative_path = file.relative_to(path)
+        if file.is_dir() or any(part.startswith(".") for part in relative_path.parts):
+            continue
+        collection_hash.update(relative_path.as_posix().encode("utf-8"))
+        collection_hash.update(hashlib.sha256(file.read_bytes()).digest())
+    return collection_hash.hexdigest()
+
+
+def get_operation_fingerprint(
+    playbook_hash: str,
+    collection_hash: str,
+    version: Optional[str],
+    hosts: Iterable[str],
+    extra_vars: Optional[Iterable[str]],
+) -> str:
+    """Hash the inputs of an operation.
+
+    Args:
+        playbook_hash: Hash of the playbook content.
+        collection_hash: Hash of the collection of the playbook, which contains the
+          roles it uses.
+        version: Version of the service variables, None if the service has none.
+        hosts: Hosts targeted by the operation.
+        extra_vars: Extra vars of the operation.
+    """
+    inputs = [
+        playbook_hash,
+        collection_hash,
+        version,
+        sorted(hosts),
+        list(extra_vars or []),
+    ]
+    return hashlib.sha256(json.dumps(inputs).encode("utf-8")).hexdigest()
+
 
 class DeploymentRunner:
     """Allows to get an iterator from a deployment plan."""
@@ -30,6 +89,7 @@ class DeploymentRunner:
         collections: Collections,
         cluster_variables: ClusterVariables,
         cluster_status: ClusterStatus,
+        on_operation_logs: Optional[Callable[[OperationModel], None]] = None,
     ):
         """Deployment runner.
 
@@ -38,17 +98,128 @@ class DeploymentRunner:
             executor: Executor object.
             cluster_variables: ClusterVariables object.
             stale_hosted_entoty_statuses: List of stale hosted entity statuses.
+            on_operation_logs: Called with a running operation, from the thread
+              running it, each time its logs are updated.
         """
         self._collections = collections
         self._executor = executor
         self._cluster_variables = cluster_variables
         self._cluster_status = cluster_status
+        self._on_operation_logs = on_operation_logs
+        # Inputs of the operation fingerprints, read once per deployment
+        self._fingerprint_inputs: dict[object, Optional[str]] = {}
+        self._fingerprint_inputs_lock = threading.Lock()
+        # Service versions of the running deployment, see `DeploymentIterator`
+        self._service_versions: Mapping[str, str] = {}
+        # DAG nodes of the operations run (not skipped) by the running deployment,
+        # the descendants of which are never skipped
+        self._dag: Optional[Dag] = None
+        self._ran_nodes: set[str] = set()
+        self._ran_nodes_lock = threading.Lock()
+
+    def _get_fingerprint_input(
+        self, key: object, fn: Callable[[], Optional[str]]
+    ) -> Optional[str]:
+        with self._fingerprint_inputs_lock:
+            if key not in self._fingerprint_inputs:
+                self._fingerprint_inputs[key] = fn()
+            return self._fingerprint_inputs[key]
+
+    def _get_fingerprint(
+        self, operation: Operation, operation_rec: OperationModel, playbook_file: Path
+    ) -> str:
+        """Get the fingerprint of an operation, see `get_operation_fingerprint`."""
+        service = operation.name.service
+        return get_operation_fingerprint(
+            playbook_hash=self._get_fingerprint_input(
+                playbook_file,
+                lambda: hashlib.sha256(playbook_file.read_bytes()).hexdigest(),
+            ),
+            # Playbooks are in the "playbooks" directory of their collection
+            collection_hash=self._get_fingerprint_input(
+                playbook_file.parent.parent,
+                lambda: get_collection_hash(playbook_file.parent.parent),
+            ),
+            version=self._service_versions.get(service),
+            hosts=(
+                [operation_rec.host]
+                if operation_rec.host
+                else self._collections.playbooks[operation.name.name].hosts
+            ),
+            extra_vars=operation_rec.extra_vars,
+        )
+
+    def _skip_unchanged(
+        self,
+        operation: Operation,
+        operation_rec: OperationModel,
+        last_fingerprints: Optional[LastFingerprints],
+    ) -> bool:
+        """Mark an operation as successful without running it if it is idempotent,
+        its fingerprint is the one of its last run and none of its DAG ancestors
+        was run by the deployment.
+
+        Returns:
+            Whether the operation was skipped.
+        """
+        if (
+            last_fingerprints is None
+            or operation.name.action not in IDEMPOTENT_ACTIONS
+            or last_fingerprints.get((operation_rec.operation, operation_rec.host))
+            != operation_rec.fingerprint
+            or self._has_ran_ancestor(operation_rec.operation)
+        ):
+            return False
+        logger.info(f"Skipping {operation_rec.operation}, its inputs are unchanged")
+        operation_rec.state = OperationStateEnum.SUCCESS
+        operation_rec.logs = b"Skipped, the inputs are unchanged since the last run.\n"
+        operation_rec.end_time = datetime.utcnow()
+        return True
+
+    def _has_ran_ancestor(self, operation_name: str) -> bool:
+        """Whether a DAG ancestor of an operation was run by the deployment."""
+        if self._dag is None or operation_name not in self._dag.graph:
+            return False
+        ancestors = nx.ancestors(self._dag.graph, operation_name)
+        with self._ran_nodes_lock:
+            return not ancestors.isdisjoint(self._ran_nodes)
+
+    def _set_ran(self, operation_name: str) -> None:
+        """Record that an operation is run by the deployment."""
+        if self._dag is None:
+            return
+        if (node := _get_dag_node(self._dag, operation_name)) is not None:
+            with self._ran_nodes_lock:
+                self._ran_nodes.add(node)
 
-    def _run_operation(self, operation_rec: OperationModel) -> None:
+    def _get_logs_kwargs(self, operation_recs: list[OperationModel]) -> dict:
+        """Get the executor arguments reporting the logs of running operations.
+
+        Empty if no callback is set, so that executors which don't support it can
+        still be used.
+        """
+        if self._on_operation_logs is None:
+            return {}
+        on_operation_logs = self._on_operation_logs
+
+        def on_logs(logs: bytes) -> None:
+            for operation_rec in operation_recs:
+                operation_rec.logs = logs
+                on_operation_logs(operation_rec)
+
+        return {"on_logs": on_logs}
+
+    def _run_operation(
+        self,
+        operation_rec: OperationModel,
+        last_fingerprints: Optional[LastFingerprints] = None,
+    ) -> None:
         """Run operation.
 
         Args:
             operation_rec: Operation record to run, modified in place with the result.
+            last_fingerprints: Fingerprint of the last run of each operation and
+              host, unchanged idempotent operations are skipped if set.
         """
         operation_rec.start_time = datetime.utcnow()
 
@@ -65,12 +236,19 @@ class DeploymentRunner:
                 operation_rec.end_time = datetime.utcnow()
                 return
 
-        # Execute the operation
         playbook_file = self._collections.playbooks[operation.name.name].path
+        fingerprint = self._get_fingerprint(operation, operation_rec, playbook_file)
+        operation_rec.fingerprint = fingerprint
+        if self._skip_unchanged(operation, operation_rec, last_fingerprints):
+            return
+        self._set_ran(operation_rec.operation)
+
+        # Execute the operation
         state, logs = self._executor.execute(
             playbook=playbook_file,
             host=operation_rec.host,
             extra_vars=operation_rec.extra_vars,
+            **self._get_logs_kwargs([operation_rec]),
         )
         operation_rec.end_time = datetime.utcnow()
 
@@ -84,27 +262,147 @@ class DeploymentRunner:
             state = OperationStateEnum(state)
         operation_rec.state = state
         operation_rec.logs = logs
+        # Only successful runs can be skipped by the next deployments
+        operation_rec.fingerprint = (
+            fingerprint if state == OperationStateEnum.SUCCESS else None
+        )
+
+    def _run_operation_hosts(
+        self,
+        operation_recs: list[OperationModel],
+        last_fingerprints: Optional[LastFingerprints] = None,
+    ) -> None:
+        """Run consecutive occurrences of an operation on their hosts at once.
+
+        Args:
+            operation_recs: Operation records to run, with the same operation and
+              extra vars and different hosts, modified in place with the result.
+            last_fingerprints: Fingerprint of the last run of each operation and
+              host, unchanged idempotent operations are skipped if set.
+        """
+        if len(operation_recs) == 1:
+            self._run_operation(operation_recs[0], last_fingerprints)
+            return
+
+        start_time = datetime.utcnow()
+        operation: Operation = self._collections.operations[operation_recs[0].operation]
+        playbook_file = self._collections.playbooks[operation.name.name].path
+        to_run: list[OperationModel] = []
+        for operation_rec in operation_recs:
+            operation_rec.start_time = start_time
+            try:
+                operation.check_limit(operation_rec.host)
+            except Exception as e:
+                logs = str(e)
+                logger.error(logs)
+                operation_rec.state = OperationStateEnum.FAILURE
+                operation_rec.logs = logs.encode("utf-8")
+                operation_rec.end_time = datetime.utcnow()
+                continue
+            operation_rec.fingerprint = self._get_fingerprint(
+                operation, operation_rec, playbook_file
+            )
+            if not self._skip_unchanged(operation, operation_rec, last_fingerprints):
+                to_run.append(operation_rec)
+        if not to_run:
+            return
+        self._set_ran(operation_recs[0].operation)
+
+        # Execute the operation, its output is shared by the hosts
+        host_states, logs = self._executor.execute_hosts(
+            playbook=playbook_file,
+            hosts=[operation_rec.host for operation_rec in to_run],
+            extra_vars=to_run[0].extra_vars,
+            **self._get_logs_kwargs(to_run),
+        )
+        end_time = datetime.utcnow()
+        for operation_rec in to_run:
+            operation_rec.end_time = end_time
+            operation_rec.state = OperationStateEnum(
+                host_states.get(operation_rec.host, OperationStateEnum.FAILURE)
+            )
+            operation_rec.logs = logs
+            if operation_rec.state != OperationStateEnum.SUCCESS:
+                operation_rec.fingerprint = None
 
     def run(
         self,
         deployment: DeploymentModel,
         *,
         force_stale_update: bool = False,
+        parallel: int = 1,
+        fan_out: int = 1,
+        operation_fan_out: Optional[Mapping[str, int]] = None,
+        failure_policy: FailurePolicyEnum = FailurePolicyEnum.FAIL_FAST,
+        coalesce_hosts: bool = False,
+        last_fingerprints: Optional[LastFingerprints] = None,
     ) -> DeploymentIterator:
         """Provides an iterator to run a deployment plan.
 
         Args:
             deployment: Deployment to run.
             force_sch_update: Force SCH status update.
+            parallel: Maximum number of operations running at once. Operations run
+              in the order of the deployment if 1, as soon as their DAG
+              predecessors succeeded otherwise.
+            fan_out: Maximum number of hosts an operation runs on at once, when the
+              deployment has consecutive occurrences of the operation limited to
+              different hosts.
+            operation_fan_out: Fan-out of specific operations, by operation name.
+            failure_policy: Behavior after a failed operation, the deployment stops
+              starting operations by default.
+            coalesce_hosts: Run consecutive occurrences of an operation limited to
+              different hosts with a single playbook execution. The occurrences of a
+              rolling batch of the deployment are always run at once, so that the
+              hosts of a batch are restarted together.
+            last_fingerprints: Fingerprint of the last run of each operation and
+              host (see `Dao.get_last_operation_fingerprints`). If set, install and
+              config operations whose inputs are unchanged are marked as successful
+              without being run, unless one of their DAG ancestors was run.
 
         Returns:
             DeploymentIterator object, to iterate over operations logs.
         """
-        return DeploymentIterator(
-            deployment=deployment,
-            collections=self._collections,
-            run_method=self._run_operation,
-            cluster_variables=self._cluster_variables,
-            cluster_status=self._cluster_status,
-            force_stale_update=force_stale_update,
+        self._fingerprint_inputs = {}
+        self._dag = Dag(self._collections) if last_fingerprints is not None else None
+        self._ran_nodes = set()
+        run_method = partial(self._run_operation, last_fingerprints=last_fingerprints)
+        run_hosts_method = (
+            partial(self._run_operation_hosts, last_fingerprints=last_fingerprints)
+            if coalesce_hosts or (deployment.options or {}).get("rolling_batches")
+            else None
         )
+        if (
+            parallel > 1
+            or fan_out > 1
+            or any(value > 1 for value in (operation_fan_out or {}).values())
+            or failure_policy != FailurePolicyEnum.FAIL_FAST
+        ):
+            iterator: DeploymentIterator = ParallelDeploymentIterator(
+                deployment=deployment,
+                collections=self._collections,
+                run_method=run_method,
+                cluster_variables=self._cluster_variables,
+                cluster_status=self._cluster_status,
+                force_stale_update=force_stale_update,
+                parallel=parallel,
+                fan_out=fan_out,
+                operation_fan_out=operation_fan_out,
+                failure_policy=failure_policy,
+                run_hosts_method=run_hosts_method,
+                coalesce_hosts=coalesce_hosts,
+            )
+        else:
+            iterator = DeploymentIterator(
+                deployment=deployment,
+                collections=self._collections,
+                run_method=run_method,
+                cluster_variables=self._cluster_variables,
+                cluster_status=self._cluster_status,
+                force_stale_update=force_stale_update,
+                run_hosts_method=run_hosts_method,
+                coalesce_hosts=coalesce_hosts,
+            )
+        # Fingerprints use the versions recorded in the deployment options
+        self._service_versions = iterator.deployment.options["service_versions"]
+        return iterator
@@ -1,18 +1,135 @@
 # Copyright 2022 TOSIT.IO
 # SPDX-License-Identifier: Apache-2.0
 
-import io
+from __future__ import annotations
+
+import json
 import logging
+import os
 import subprocess
-from collections.abc import Iterable
+import sys
+import tempfile
+import threading
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Any, BinaryIO, Optional
 
+from tdp.core.constants import LOGS_CHUNK_SIZE
+from tdp.core.deployment.log_buffer import LogBuffer, LogsCallback
 from tdp.core.models.enums import OperationStateEnum
+from tdp.core.types import PathLike
 from tdp.utils import resolve_executable
 
 logger = logging.getLogger(__name__)
 
+# Directory of the callback writing the recap of each host, see `execute_hosts`
+CALLBACK_PLUGINS_DIR = Path(__file__).parent / "callback_plugins"
+HOST_RESULTS_FILE_ENV_VAR = "TDP_HOST_RESULTS_FILE"
+# Ansible default callback plugins path, used when the configuration doesn't set it
+ANSIBLE_DEFAULT_CALLBACK_PLUGINS = (
+    "~/.ansible/plugins/callback:/usr/share/ansible/plugins/callback"
+)
+# How long an idle SSH connection is kept open during a deployment, connections are
+# closed at the end of the deployment, see `Executor.deployment_scope`
+SSH_CONTROL_PERSIST = "30m"
+
+
+def get_console() -> Optional[BinaryIO]:
+    """Get the binary stream of the console, after flushing its text stream."""
+    sys.stdout.flush()
+    return getattr(sys.stdout, "buffer", None)
+
+
+def _get_host_states(
+    host_results: Mapping[str, Mapping[str, int]],
+    hosts: Sequence[str],
+    state: OperationStateEnum,
+) -> dict[str, OperationStateEnum]:
+    """Get the state of each host from the recap of the playbook.
+
+    A host failed if a task failed or if it was unreachable. Hosts missing from the
+    recap (e.g. not matched by the playbook) get the state of the command.
+    """
+    host_states = {}
+    for host in hosts:
+        if (result := host_results.get(host)) is None:
+            host_states[host] = state
+        elif result.get("failures") or result.get("unreachable"):
+            host_states[host] = OperationStateEnum.FAILURE
+        else:
+            host_states[host] = OperationStateEnum.SUCCESS
+    return host_states
+
+
+def read_ansible_config(run_directory: Optional[PathLike] = None) -> dict[str, Any]:
+    """Read the settings of the Ansible configuration which differ from the defaults.
+
+    The configuration is read with `ansible-config dump` from the run directory, as
+    ansible-playbook reads it: from the ansible.cfg file and the environment.
+
+    Args:
+        run_directory: Directory where the ansible commands run.
+
+    Returns:
+        Changed settings, by name for the base settings (e.g.
+        `DEFAULT_CALLBACK_PLUGIN_PATH`) and by `<plugin type>.<plugin>.<name>` for
+        the plugin settings (e.g. `connection.ssh.ssh_args`). Empty if the
+        configuration can't be read.
+    """
+    try:
+        dump = json.loads(
+            subprocess.run(
+                [
+                    "ansible-config",
+                    "dump",
+                    "--format",
+                    "json",
+                    "--only-changed",
+                    "-t",
+                    "all",
+                ],
+                cwd=run_directory,
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                check=True,
+                timeout=60,
+            ).stdout
+        )
+    except (OSError, subprocess.SubprocessError, ValueError) as e:
+        logger.warning(f"Failed to read the Ansible configuration: {e}")
+        return {}
+    settings = {}
+    for entry in dump:
+        if "name" in entry:
+            settings[entry["name"]] = entry["value"]
+            continue
+        # e.g. {"CONNECTION_PLUGINS": [{"ssh": [{"name": "ssh_args", ...}]}]}
+        for plugins_type, plugins in entry.items():
+            plugin_type = plugins_type.removesuffix("_PLUGINS").lower()
+            for plugin in plugins:
+                for plugin_name, plugin_settings in plugin.items():
+                    for setting in plugin_settings:
+                        settings[f"{plugin_type}.{plugin_name}.{setting['name']}"] = (
+                            setting["value"]
+                        )
+    return settings
+
+
+def _close_ssh_connections(control_path_dir: Path) -> None:
+    """Stop the SSH master connections whose sockets are in a directory."""
+    ssh = os.environ.get("ANSIBLE_SSH_EXECUTABLE", "ssh")
+    for control_path in control_path_dir.iterdir():
+        try:
+            subprocess.run(
+                [ssh, "-O", "exit", "-o", f"ControlPath={control_path}", "tdp"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=10,
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning(f"Failed to close the SSH connection {control_path}: {e}")
+
 
 class Executor:
     """Allow to execute commands using Ansible."""
@@ -30,78 +147,259 @@ class Executor:
         # TODO configurable via config file
         self._rundir = run_directory
         self._dry = dry
+        # Ansible settings of the current deployment, see `deployment_scope`
+        self._env: dict[str, str] = {}
+        # Changed settings of the Ansible configuration, read once
+        self._ansible_config: Optional[dict[str, Any]] = None
+        self._ansible_config_lock = threading.Lock()
+        self.ansible_path = self._resolve_ansible_path()
+
+    def _resolve_ansible_path(self) -> str:
+        """Resolve the ansible-playbook command.
 
-        # Resolve ansible-playbook command
+        Raises:
+            ExecutableNotFoundError: If the ansible-playbook command is not found in PATH.
+        """
         ansible_playbook_command = "ansible-playbook"
         if self._dry:
             # In dry mode, we don't want to execute the ansible-playbook command
-            self.ansible_path = ansible_playbook_command
-        else:
-            # Check if the ansible-playbook command is available in PATH
-            self.ansible_path = resolve_executable(ansible_playbook_command)
+            return ansible_playbook_command
+        # Check if the ansible-playbook command is available in PATH
+        return resolve_executable(ansible_playbook_command)
+
+    def __enter__(self) -> Executor:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the resources of the executor."""
+        pass
+
+    def _get_ansible_config(self) -> dict[str, Any]:
+        """Get the changed settings of the Ansible configuration, see
+        `read_ansible_config`."""
+        if self._dry:
+            return {}
+        with self._ansible_config_lock:
+            if self._ansible_config is None:
+                self._ansible_config = read_ansible_config(self._rundir)
+            return self._ansible_config
+
+    def _get_callback_plugins(self) -> str:
+        """Get the callback plugins path of the Ansible configuration, with the
+        callbacks of tdp first."""
+        callback_plugins = self._get_ansible_config().get(
+            "DEFAULT_CALLBACK_PLUGIN_PATH", ANSIBLE_DEFAULT_CALLBACK_PLUGINS.split(":")
+        )
+        return ":".join([str(CALLBACK_PLUGINS_DIR), *callback_plugins])
+
+    def _get_ssh_env(self, control_path_dir: Path) -> dict[str, str]:
+        """Get the settings keeping the SSH connections open during a deployment.
+
+        The SSH arguments of the Ansible configuration (e.g. a ProxyJump) are kept,
+        the ControlMaster/ControlPersist options are appended to them: as ssh uses
+        the first value of an option, configured ones take precedence. Pipelining
+        is only enabled if the configuration doesn't set it.
+        """
+        config = self._get_ansible_config()
+        env = {
+            "ANSIBLE_SSH_ARGS": " ".join(
+                [
+                    config.get("connection.ssh.ssh_args", "-C"),
+                    f"-o ControlMaster=auto -o ControlPersist={SSH_CONTROL_PERSIST}",
+                ]
+            ),
+            "ANSIBLE_SSH_CONTROL_PATH_DIR": str(control_path_dir),
+        }
+        if "connection.ssh.pipelining" not in config:
+            env["ANSIBLE_PIPELINING"] = "True"
+        return env
+
+    @contextmanager
+    def deployment_scope(
+        self, deployment_id: Optional[int], reuse_ssh_connections: bool = True
+    ) -> Iterator[None]:
+        """Share resources between the playbooks run during a deployment.
+
+        The facts gathered by a playbook are cached in a temporary directory with
+        the jsonfile cache plugin and, with `gathering = smart`, the next playbooks
+        only gather the facts of the hosts missing from the cache.
+
+        Unless disabled, the SSH connections to the hosts are kept open between the
+        playbooks with ControlMaster/ControlPersist, their sockets are in the same
+        temporary directory, and modules are run with pipelining (see
+        `_get_ssh_env`).
+
+        The connections are closed and the directory is removed when leaving the
+        context. The settings are passed as environment variables, which don't
+        override the current environment.
+
+        Args:
+            deployment_id: Id of the deployment, used to name the directory.
+            reuse_ssh_connections: Whether to keep the SSH connections open.
+        """
+        with tempfile.TemporaryDirectory(
+            prefix=f"tdp_deployment_{deployment_id}_"
+        ) as tmp_dir:
+            fact_cache_dir = Path(tmp_dir, "facts")
+            fact_cache_dir.mkdir()
+            control_path_dir = Path(tmp_dir, "cp")
+            control_path_dir.mkdir()
+            self._env = {
+                "ANSIBLE_GATHERING": "smart",
+                "ANSIBLE_CACHE_PLUGIN": "jsonfile",
+                "ANSIBLE_CACHE_PLUGIN_CONNECTION": str(fact_cache_dir),
+            }
+            if reuse_ssh_connections:
+                self._env.update(self._get_ssh_env(control_path_dir))
+            try:
+                yield
+            finally:
+                self._env = {}
+                _close_ssh_connections(control_path_dir)
+
+    def _get_env(
+        self, variables: Optional[Mapping[str, str]] = None
+    ) -> Optional[dict[str, str]]:
+        """Get the environment of a command, None to inherit the current one."""
+        if not self._env and not variables:
+            return None
+        return {**self._env, **os.environ, **(variables or {})}
 
     def _execute_ansible_command(
-        self, command: list[str]
+        self,
+        command: list[str],
+        env: Optional[Mapping[str, str]] = None,
+        on_logs: Optional[LogsCallback] = None,
     ) -> tuple[OperationStateEnum, bytes]:
         """Execute an ansible command.
 
+        The output is read by chunks, passed through to the console and kept within
+        LOGS_MAX_LENGTH (see `LogBuffer`).
+
         Args:
             command: Command to execute with args.
+            env: Environment of the command, inherited if None.
+            on_logs: Called periodically with the logs while the command runs.
 
         Returns:
             A tuple with the state of the command and the output of the command.
         """
-        with io.BytesIO() as byte_stream:
-            try:
-                res = subprocess.Popen(
-                    command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    cwd=self._rundir,
-                    universal_newlines=True,
-                )
-                if res.stdout is None:
-                    raise Exception("Process has not stdout")
-                for stdout_line in iter(res.stdout.readline, ""):
-                    print(stdout_line, end="")
-                    byte_stream.write(bytes(stdout_line, "utf-8"))
-                state = (
-                    OperationStateEnum.SUCCESS
-                    if res.wait() == 0
-                    else OperationStateEnum.FAILURE
-                )
-            except KeyboardInterrupt:
-                logger.debug("KeyboardInterrupt caught")
-                byte_stream.write(b"\nKeyboardInterrupt")
-                return OperationStateEnum.FAILURE, byte_stream.getvalue()
-            return state, byte_stream.getvalue()
+        logs = LogBuffer(passthrough=get_console(), on_logs=on_logs)
+        try:
+            res = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                cwd=self._rundir,
+                env=env,
+                # Unbuffered, a read returns the available output
+                bufsize=0,
+            )
+            if res.stdout is None:
+                raise Exception("Process has not stdout")
+            while chunk := res.stdout.read(LOGS_CHUNK_SIZE):
+                logs.write(chunk)
+            state = (
+                OperationStateEnum.SUCCESS
+                if res.wait() == 0
+                else OperationStateEnum.FAILURE
+            )
+        except KeyboardInterrupt:
+            logger.debug("KeyboardInterrupt caught")
+            logs.write(b"\nKeyboardInterrupt")
+            return OperationStateEnum.FAILURE, logs.getvalue()
+        return state, logs.getvalue()
+
+    def _build_command(
+        self,
+        playbook: Path,
+        limit: Optional[str],
+        extra_vars: Optional[Iterable[str]],
+    ) -> list[str]:
+        command = [self.ansible_path]
+        command += [str(playbook)]
+        if limit is not None:
+            command += ["--limit", limit]
+        for extra_var in extra_vars or []:
+            command += ["--extra-vars", extra_var]
+        return command
 
     def execute(
         self,
         playbook: Path,
         host: Optional[str] = None,
         extra_vars: Optional[Iterable[str]] = None,
+        on_logs: Optional[LogsCallback] = None,
     ) -> tuple[OperationStateEnum, bytes]:
         """Executes a playbook.
 
         Args:
             playbook: Name of the playbook to execute.
             host: Host where the playbook must be ran.
+            on_logs: Called periodically with the logs while the playbook runs.
 
         Returns:
             A tuple with the state of the command and the output of the command in UTF-8.
         """
         # Build command
-        command = [self.ansible_path]
-        command += [str(playbook)]
-        if host is not None:
-            command += ["--limit", host]
-        for extra_var in extra_vars or []:
-            command += ["--extra-vars", extra_var]
+        command = self._build_command(playbook, host, extra_vars)
         # Execute command
         if self._dry:
             # Operation always succeed in dry mode
             logger.debug("[DRY MODE] Ansible command: " + " ".join(command))
             return OperationStateEnum.SUCCESS, b""
         logger.debug("Ansible command: " + " ".join(command))
-        return self._execute_ansible_command(command)
+        return self._execute_ansible_command(
+            command, env=self._get_env(), on_logs=on_logs
+        )
+
+    def execute_hosts(
+        self,
+        playbook: Path,
+        hosts: Sequence[str],
+        extra_vars: Optional[Iterable[str]] = None,
+        on_logs: Optional[LogsCallback] = None,
+    ) -> tuple[dict[str, OperationStateEnum], bytes]:
+        """Executes a playbook once on several hosts.
+
+        The state of each host is read from the recap written by the
+        `tdp_host_results` callback.
+
+        Args:
+            playbook: Name of the playbook to execute.
+            hosts: Hosts where the playbook must be ran.
+            on_logs: Called periodically with the logs while the playbook runs.
+
+        Returns:
+            A tuple with the state of each host and the output of the command in
+            UTF-8.
+        """
+        command = self._build_command(playbook, ",".join(hosts), extra_vars)
+        if self._dry:
+            # Operation always succeed in dry mode
+            logger.debug("[DRY MODE] Ansible command: " + " ".join(command))
+            return {host: OperationStateEnum.SUCCESS for host in hosts}, b""
+        logger.debug("Ansible command: " + " ".join(command))
+        with tempfile.TemporaryDirectory(prefix="tdp_") as tmp_dir:
+            host_results_file = Path(tmp_dir, "host_results.json")
+            env = self._get_env(
+                {
+                    "ANSIBLE_CALLBACK_PLUGINS": self._get_callback_plugins(),
+                    HOST_RESULTS_FILE_ENV_VAR: str(host_results_file),
+                }
+            )
+            state, logs = self._execute_ansible_command(
+                command, env=env, on_logs=on_logs
+            )
+            try:
+                host_results = json.loads(host_results_file.read_text())
+            except (OSError, ValueError):
+                logger.warning(
+                    f"No host results written by {command[1]}, the state of the "
+                    "command is used for all the hosts."
+                )
+                host_results = {}
+        return _get_host_states(host_results, hosts, state), logs
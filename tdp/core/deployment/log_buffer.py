@@ -0,0 +1,90 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from typing import BinaryIO, Optional
+
+from tdp.core.constants import LOGS_FLUSH_INTERVAL, LOGS_MAX_LENGTH
+
+LogsCallback = Callable[[bytes], None]
+
+_TRUNCATED_MARKER = b"\n[... %d bytes truncated ...]\n"
+
+
+class LogBuffer:
+    """Bounded buffer of the output of an operation.
+
+    The first half of the output is kept as is, the end of the output is kept in a
+    ring buffer, so that the logs never exceed `max_length` while keeping the start
+    and the end of a verbose run. The output can be passed through to a stream and
+    reported periodically to a callback while it is written.
+    """
+
+    def __init__(
+        self,
+        max_length: Optional[int] = None,
+        *,
+        passthrough: Optional[BinaryIO] = None,
+        on_logs: Optional[LogsCallback] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        """Initialize the buffer.
+
+        Args:
+            max_length: Maximum length of the logs, in bytes, LOGS_MAX_LENGTH if
+              None.
+            passthrough: Stream the output is written to, usually the console.
+            on_logs: Called with the current logs at most every `flush_interval`
+              seconds while the output is written.
+            flush_interval: Minimum time (in seconds) between two `on_logs` calls,
+              LOGS_FLUSH_INTERVAL if None.
+        """
+        if max_length is None:
+            max_length = LOGS_MAX_LENGTH
+        if flush_interval is None:
+            flush_interval = LOGS_FLUSH_INTERVAL
+        # Reserve room for the truncation marker, up to 20 digits
+        marker_length = len(_TRUNCATED_MARKER % 0) + 19
+        self._head_length = max(max_length - marker_length, 0) // 2
+        self._tail_length = max(max_length - marker_length - self._head_length, 0)
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._truncated = 0
+        self._passthrough = passthrough
+        self._on_logs = on_logs
+        self._flush_interval = flush_interval
+        self._next_flush = time.monotonic() + flush_interval
+        self._dirty = False
+
+    def write(self, chunk: bytes) -> None:
+        """Add a chunk of output."""
+        if self._passthrough is not None:
+            self._passthrough.write(chunk)
+            self._passthrough.flush()
+        if (room := self._head_length - len(self._head)) > 0:
+            self._head += chunk[:room]
+            chunk = chunk[room:]
+        if chunk:
+            self._tail += chunk
+            if (overflow := len(self._tail) - self._tail_length) > 0:
+                del self._tail[:overflow]
+                self._truncated += overflow
+        self._dirty = True
+        if self._on_logs is not None and time.monotonic() >= self._next_flush:
+            self.flush()
+
+    def flush(self) -> None:
+        """Report the current logs to the callback, if they changed."""
+        self._next_flush = time.monotonic() + self._flush_interval
+        if self._on_logs is not None and self._dirty:
+            self._dirty = False
+            self._on_logs(self.getvalue())
+
+    def getvalue(self) -> bytes:
+        """Get the logs, with a truncation marker if the output was too long."""
+        if not self._truncated:
+            return bytes(self._head + self._tail)
+        return bytes(self._head + _TRUNCATED_MARKER % self._truncated + self._tail)
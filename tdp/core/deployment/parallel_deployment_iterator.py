@@ -0,0 +1,322 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import logging
+import queue
+from collections import Counter, deque
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Optional
+
+import networkx as nx
+
+from tdp.core.dag import Dag
+from tdp.core.deployment.deployment_iterator import (
+    DeploymentIterator,
+    ProcessOperationFn,
+)
+from tdp.core.models.enums import (
+    DeploymentStateEnum,
+    FailurePolicyEnum,
+    OperationStateEnum,
+)
+
+if TYPE_CHECKING:
+    from tdp.core.cluster_status import ClusterStatus
+    from tdp.core.collections import Collections
+    from tdp.core.models import DeploymentModel, OperationModel
+    from tdp.core.variables import ClusterVariables
+
+logger = logging.getLogger(__name__)
+
+
+def _get_dag_node(dag: Dag, operation_name: str) -> Optional[str]:
+    """Get the DAG node of an operation, restart and stop operations are forged from
+    the start operation node."""
+    if operation_name in dag.graph:
+        return operation_name
+    for action in ("_restart", "_stop"):
+        if operation_name.endswith(action):
+            node = operation_name[: -len(action)] + "_start"
+            if node in dag.graph:
+                return node
+    return None
+
+
+def get_operation_dependencies(
+    dag: Dag, operations: Sequence[OperationModel]
+) -> list[set[int]]:
+    """Get the operations each operation of a deployment must wait for.
+
+    An operation waits for the previous operations of the deployment it is related to
+    in the DAG (ancestors or descendants, so that the order of a stop plan is kept)
+    and for the previous occurrences of the same operation. Consecutive occurrences
+    of the same operation limited to different hosts don't wait for each other, so
+    that they can be fanned out. Operations outside of the DAG (e.g. sleep
+    operations) wait for all the previous operations and are waited for by all the
+    following ones.
+
+    Args:
+        dag: DAG of the collections.
+        operations: Operations of the deployment, in order.
+
+    Returns:
+        Indexes of the operations each operation must wait for.
+    """
+    nodes = [_get_dag_node(dag, operation.operation) for operation in operations]
+    ancestors = {
+        node: nx.ancestors(dag.graph, node) for node in set(nodes) if node is not None
+    }
+    dependencies: list[set[int]] = []
+    last_barrier: Optional[int] = None
+    # Start of the run of consecutive occurrences of the current operation
+    run_start = 0
+    for index, node in enumerate(nodes):
+        operation = operations[index]
+        if index > 0 and operations[index - 1].operation != operation.operation:
+            run_start = index
+        if node is None:
+            dependencies.append(set(range(index)))
+            last_barrier = index
+            continue
+        start = 0 if last_barrier is None else last_barrier + 1
+        dependencies.append(
+            {
+                previous_index
+                for previous_index in range(start, index)
+                if (
+                    (previous_node := nodes[previous_index]) == node
+                    or previous_node in ancestors[node]
+                    or node in ancestors[previous_node]
+                )
+                and not _is_host_fan_out(
+                    operations[previous_index], operation, previous_index >= run_start
+                )
+            }
+            | ({last_barrier} if last_barrier is not None else set())
+        )
+    return dependencies
+
+
+def _is_host_fan_out(
+    previous: OperationModel, operation: OperationModel, same_run: bool
+) -> bool:
+    """Whether two occurrences of an operation can run on their hosts concurrently."""
+    return (
+        same_run
+        and previous.operation == operation.operation
+        and previous.host is not None
+        and operation.host is not None
+        and previous.host != operation.host
+    )
+
+
+class ParallelDeploymentIterator(DeploymentIterator):
+    """Iterator that runs the operations on a pool of workers.
+
+    An operation starts as soon as the operations it depends on (see
+    `get_operation_dependencies`) succeeded. At most `parallel` distinct operations
+    run at once, each of them on up to `fan_out` hosts when the deployment has
+    consecutive occurrences of the operation limited to different hosts. With a
+    `run_hosts_method`, the ready occurrences of an operation are coalesced into a
+    single execution instead.
+
+    Operations are yielded once executed, in their completion order, and the
+    cluster status is updated by their process function from the iterating thread
+    only.
+
+    If an operation fails, the remaining operations are started or HELD according to
+    the failure policy, the running ones are yielded once executed.
+    """
+
+    def __init__(
+        self,
+        deployment: DeploymentModel,
+        *,
+        collections: Collections,
+        run_method: Callable[[OperationModel], None],
+        cluster_variables: ClusterVariables,
+        cluster_status: ClusterStatus,
+        force_stale_update: bool,
+        parallel: int = 1,
+        fan_out: int = 1,
+        operation_fan_out: Optional[Mapping[str, int]] = None,
+        failure_policy: FailurePolicyEnum = FailurePolicyEnum.FAIL_FAST,
+        run_hosts_method: Optional[Callable[[list[OperationModel]], None]] = None,
+        coalesce_hosts: bool = True,
+    ):
+        """Initialize the iterator.
+
+        Args:
+            deployment: DeploymentModel object to mutate.
+            collections: Collections instance.
+            run_method: Method to run the operation, called from the workers.
+            cluster_variables: ClusterVariables instance.
+            cluster_status: ClusterStatus instance.
+            parallel: Maximum number of distinct operations running at once.
+            fan_out: Maximum number of hosts an operation runs on at once.
+            operation_fan_out: Fan-out of specific operations, by operation name.
+            failure_policy: Behavior after a failed operation.
+            run_hosts_method: Method to run consecutive occurrences of an operation
+              on their hosts at once, called from the workers.
+            coalesce_hosts: Whether to run at once the occurrences which are not
+              part of a rolling batch of the deployment.
+        """
+        super().__init__(
+            deployment,
+            collections=collections,
+            run_method=run_method,
+            cluster_variables=cluster_variables,
+            cluster_status=cluster_status,
+            force_stale_update=force_stale_update,
+            run_hosts_method=run_hosts_method,
+            coalesce_hosts=coalesce_hosts,
+        )
+        self._operations = list(deployment.operations)
+        self._dependencies = get_operation_dependencies(
+            Dag(collections), self._operations
+        )
+        # Indexes of the operations not started yet, in order (dict as an ordered set)
+        self._pending = dict.fromkeys(range(len(self._operations)))
+        # Indexes of the operations whose process function was called
+        self._processed: set[int] = set()
+        self._yielded: Optional[int] = None
+        # Indexes of the operations run by each worker
+        self._running: dict[Future, list[int]] = {}
+        # Indexes of the operations run along with a previous occurrence
+        self._executed_indexes: deque[int] = deque()
+        # Executed operations, in their completion order
+        self._completed: queue.SimpleQueue[Future] = queue.SimpleQueue()
+        self._parallel = parallel
+        self._fan_out = fan_out
+        self._operation_fan_out = dict(operation_fan_out or {})
+        self._failure_policy = FailurePolicyEnum(failure_policy)
+        self._pool = ThreadPoolExecutor(
+            max_workers=parallel * max([fan_out, *self._operation_fan_out.values()]),
+            thread_name_prefix=f"deployment-{deployment.id}",
+        )
+
+    def close(self) -> None:
+        """Cancel the operations not started by the workers yet."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _is_ready(self, index: int) -> bool:
+        return all(
+            dependency in self._processed
+            and self._operations[dependency].state == OperationStateEnum.SUCCESS
+            for dependency in self._dependencies[index]
+        )
+
+    def _is_blocked(self, index: int) -> bool:
+        return any(
+            self._operations[dependency].state
+            in (OperationStateEnum.FAILURE, OperationStateEnum.HELD)
+            for dependency in self._dependencies[index]
+        )
+
+    def _has_slot(self, operation_name: str) -> bool:
+        running = Counter(
+            self._operations[indexes[0]].operation for indexes in self._running.values()
+        )
+        if operation_name in running:
+            return running[operation_name] < self._operation_fan_out.get(
+                operation_name, self._fan_out
+            )
+        return len(running) < self._parallel
+
+    def _start_ready_operations(self) -> None:
+        for index in list(self._pending):
+            operation_rec = self._operations[index]
+            # Skip the operations coalesced with a previous one
+            if index not in self._pending:
+                continue
+            if not self._is_ready(index) or not self._has_slot(operation_rec.operation):
+                continue
+            indexes = [index]
+            if self._run_operation_hosts is not None:
+                # Coalesce the following occurrences which are ready too
+                operation_recs = [operation_rec]
+                next_index = index + 1
+                while (
+                    next_index in self._pending
+                    and self._is_ready(next_index)
+                    and self._can_coalesce(operation_recs, self._operations[next_index])
+                ):
+                    indexes.append(next_index)
+                    operation_recs.append(self._operations[next_index])
+                    next_index += 1
+            for started_index in indexes:
+                del self._pending[started_index]
+                self._operations[started_index].state = OperationStateEnum.RUNNING
+            future = self._pool.submit(
+                self._execute_operations,
+                [self._operations[started_index] for started_index in indexes],
+            )
+            self._running[future] = indexes
+            future.add_done_callback(self._completed.put)
+
+    def _hold_operation(self) -> Optional[OperationModel]:
+        """Hold the first pending operation that can't run anymore, if any."""
+        if self.deployment.state != DeploymentStateEnum.FAILURE:
+            return None
+        for index in self._pending:
+            if self._failure_policy == FailurePolicyEnum.FAIL_FAST or self._is_blocked(
+                index
+            ):
+                del self._pending[index]
+                operation_rec = self._operations[index]
+                operation_rec.state = OperationStateEnum.HELD
+                return operation_rec
+        return None
+
+    def _next_operation(
+        self,
+    ) -> tuple[OperationModel, Optional[ProcessOperationFn]]:
+        # The operation yielded at the previous iteration has been processed
+        if self._yielded is not None:
+            self._processed.add(self._yielded)
+            self._yielded = None
+        # Yield the executed operations first
+        if self._executed_indexes:
+            return self._yield_executed(self._executed_indexes.popleft())
+        try:
+            return self._complete_operation(self._completed.get_nowait())
+        except queue.Empty:
+            pass
+
+        if (operation_rec := self._hold_operation()) is not None:
+            return operation_rec, None
+        if (
+            self.deployment.state != DeploymentStateEnum.FAILURE
+            or self._failure_policy == FailurePolicyEnum.CONTINUE
+        ):
+            self._start_ready_operations()
+
+        if self._running:
+            return self._complete_operation(self._completed.get())
+        if self._pending:
+            # Dependencies are previous operations, one is always ready or blocked
+            raise RuntimeError("No operation can be started.")
+        self._pool.shutdown()
+        raise StopIteration
+
+    def _complete_operation(
+        self, future: Future
+    ) -> tuple[OperationModel, ProcessOperationFn]:
+        indexes = self._running.pop(future)
+        try:
+            future.result()
+        except Exception:
+            # Raise the error of the worker, the deployment stops
+            self.close()
+            raise
+        self._executed_indexes.extend(indexes[1:])
+        return self._yield_executed(indexes[0])
+
+    def _yield_executed(self, index: int) -> tuple[OperationModel, ProcessOperationFn]:
+        self._yielded = index
+        operation_rec = self._operations[index]
+        return operation_rec, partial(self._end_operation, operation_rec)
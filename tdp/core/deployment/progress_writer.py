@@ -0,0 +1,451 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from sqlalchemy import inspect
+
+from tdp.core.constants import PROGRESS_FLUSH_INTERVAL, PROGRESS_QUEUE_SIZE
+from tdp.core.models.enums import (
+    DeploymentStateEnum,
+    OperationStateEnum,
+    SCHStatusLogSourceEnum,
+)
+from tdp.core.types import PathLike
+from tdp.dao import Dao, get_status_log_values
+
+if TYPE_CHECKING:
+    from sqlalchemy import URL, Engine
+
+    from tdp.core.models import DeploymentModel, OperationModel, SCHStatusLogModel
+
+logger = logging.getLogger(__name__)
+
+_DEPLOYMENT_COLUMNS = (
+    "state",
+    "start_time",
+    "end_time",
+    "options",
+    "operation_count",
+    "failed_operation_count",
+    "host_count",
+    "total_duration",
+    "last_operation",
+)
+_OPERATION_COLUMNS = (
+    "operation_order",
+    "state",
+    "start_time",
+    "end_time",
+    "fingerprint",
+    "logs",
+)
+_DATETIME_COLUMNS = {"start_time", "end_time", "event_time"}
+_ENUM_COLUMNS = {
+    "state": {
+        "deployment": DeploymentStateEnum,
+        "operation": OperationStateEnum,
+    },
+    "source": {"status_log": SCHStatusLogSourceEnum},
+}
+
+
+def _encode_values(values: dict[str, Any]) -> dict[str, Any]:
+    """Encode column values to JSON compatible values."""
+    encoded = {}
+    for column, value in values.items():
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, bytes):
+            value = base64.b64encode(value).decode()
+        elif column in _ENUM_COLUMNS and value is not None:
+            value = value.value
+        encoded[column] = value
+    return encoded
+
+
+def _decode_values(kind: str, values: dict[str, Any]) -> dict[str, Any]:
+    """Decode column values encoded by `_encode_values`."""
+    decoded = {}
+    for column, value in values.items():
+        if value is not None:
+            if column in _DATETIME_COLUMNS:
+                value = datetime.fromisoformat(value)
+            elif column == "logs":
+                value = base64.b64decode(value)
+            elif column in _ENUM_COLUMNS:
+                value = _ENUM_COLUMNS[column][kind](value)
+        decoded[column] = value
+    return decoded
+
+
+def _get_operation_values(operation: OperationModel) -> dict[str, Any]:
+    return {
+        column: getattr(operation, column)
+        for column in _OPERATION_COLUMNS
+        # Deferred logs are not loaded until set
+        if column not in inspect(operation).unloaded
+    }
+
+
+class _PendingProgress:
+    """Progress not written to the database yet, coalesced by row."""
+
+    def __init__(self):
+        self.deployment: Optional[dict[str, Any]] = None
+        self.operations: dict[int, dict[str, Any]] = {}
+        self.status_logs: list[dict[str, Any]] = []
+        self.sequence = 0
+
+    def add(self, record: dict[str, Any]) -> None:
+        if deployment := record.get("deployment"):
+            self.deployment = deployment
+        for operation in record.get("operations", []):
+            self.operations[operation["operation_order"]] = operation
+        self.status_logs.extend(record.get("status_logs", []))
+        self.sequence = record["sequence"]
+
+    def __bool__(self) -> bool:
+        return bool(self.deployment or self.operations or self.status_logs)
+
+    def write(self, engine: Engine, deployment_id: int) -> None:
+        with Dao(engine, commit_on_exit=True) as dao:
+            dao.update_deployment_progress(
+                deployment_id,
+                self.deployment,
+                self.operations.values(),
+                self.status_logs,
+            )
+
+
+class _Journal:
+    """Append-only local file of the progress records of a deployment.
+
+    Each record is written and synced before being queued, a `flushed` line marks the
+    records written to the database.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("a", encoding="utf-8")
+        # Appended from both the recording and the writing threads
+        self._lock = threading.Lock()
+
+    def append(self, line: dict[str, Any]) -> None:
+        with self._lock:
+            self._file.write(json.dumps(line) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self, remove: bool) -> None:
+        self._file.close()
+        if remove:
+            self.path.unlink()
+            try:
+                self.path.parent.rmdir()
+            except OSError:
+                # Journals of other deployments
+                pass
+
+    @staticmethod
+    def read_unflushed(path: Path) -> list[dict[str, Any]]:
+        """Read the records of a journal which were not written to the database."""
+        records = []
+        with path.open(encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Last line partially written before a crash
+                    break
+                if "flushed" in entry:
+                    records = [
+                        record
+                        for record in records
+                        if record["sequence"] > entry["flushed"]
+                    ]
+                else:
+                    records.append(entry)
+        return records
+
+
+def get_default_journal_dir(database_url: URL) -> Path:
+    """Get the default journal directory of a database.
+
+    The journal of a SQLite database file is next to it. Other journals are in a
+    directory per database under the TDP state directory (`$XDG_STATE_HOME/tdp`,
+    `~/.local/state/tdp` by default), so that the journals of different databases
+    are never mixed up.
+
+    Args:
+        database_url: URL of the database.
+    """
+    database = database_url.database
+    is_sqlite_file = database_url.get_backend_name() == "sqlite" and database not in (
+        None,
+        "",
+        ":memory:",
+    )
+    if is_sqlite_file:
+        return Path(f"{database}.tdp_journal").absolute()
+    state_dir = Path(
+        os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state", "tdp"
+    )
+    # Without the password, which may change
+    database_name = database_url.render_as_string(hide_password=True)
+    return state_dir.joinpath(
+        "journal", hashlib.sha256(database_name.encode()).hexdigest()[:16]
+    )
+
+
+def _journal_path(journal_dir: PathLike, deployment_id: int) -> Path:
+    return Path(journal_dir, f"deployment_{deployment_id}.jsonl")
+
+
+class ProgressWriter:
+    """Write the progress of a running deployment from a background thread.
+
+    Records are queued in a bounded queue (blocking when full) and written to the
+    database by a background thread. Successive records of the same deployment or
+    operation are coalesced, only their last state is written. Records are written
+    every `flush_interval` seconds, or as soon as `flush` is called (e.g. on failure).
+
+    If a journal directory is given, records are also appended to a local journal
+    before being queued. The journal is removed once every record is written, so it
+    can be replayed with `reconcile_journals` after a crash.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        deployment_id: int,
+        *,
+        flush_interval: float = PROGRESS_FLUSH_INTERVAL,
+        max_queue_size: int = PROGRESS_QUEUE_SIZE,
+        journal_dir: Optional[PathLike] = None,
+    ):
+        """Initialize the writer.
+
+        Args:
+            engine: Engine of the database.
+            deployment_id: Id of the running deployment.
+            flush_interval: Maximum time (in seconds) between two database writes.
+            max_queue_size: Maximum number of records waiting to be written.
+            journal_dir: Directory of the local journal, no journal if None.
+        """
+        self._engine = engine
+        self._deployment_id = deployment_id
+        self._flush_interval = flush_interval
+        self._queue: queue.Queue[Optional[dict[str, Any]]] = queue.Queue(max_queue_size)
+        self._journal = (
+            _Journal(_journal_path(journal_dir, deployment_id))
+            if journal_dir is not None
+            else None
+        )
+        self._sequence = 0
+        # Logs of running operations are recorded from the threads running them
+        self._record_lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._run, name=f"progress-writer-{deployment_id}", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> ProgressWriter:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def record(
+        self,
+        deployment: Optional[DeploymentModel] = None,
+        operations: Iterable[OperationModel] = (),
+        status_logs: Iterable[SCHStatusLogModel] = (),
+        *,
+        flush: bool = False,
+    ) -> None:
+        """Record the current state of a deployment and of its operations.
+
+        Args:
+            deployment: Deployment whose state to record.
+            operations: Operations whose state to record.
+            status_logs: Status logs to insert.
+            flush: Whether to write the pending records without waiting.
+
+        Raises:
+            Exception: The error which stopped the background thread, if any.
+        """
+        self._raise_error()
+        operations = list(operations)
+        status_logs = list(status_logs)
+        record: dict[str, Any] = {"flush": flush}
+        if deployment is not None:
+            record["deployment"] = {
+                column: getattr(deployment, column) for column in _DEPLOYMENT_COLUMNS
+            }
+        if operations:
+            record["operations"] = [
+                _get_operation_values(operation) for operation in operations
+            ]
+        if status_logs:
+            record["status_logs"] = [
+                get_status_log_values(status_log) for status_log in status_logs
+            ]
+        self._write_record(record)
+
+    def record_logs(self, operations: Iterable[OperationModel]) -> None:
+        """Record the logs of running operations.
+
+        Unlike `record`, the logs are not appended to the journal: they are only
+        written to the database with the next pending records. The final logs of an
+        operation are recorded with its end state.
+
+        Args:
+            operations: Running operations whose logs to record.
+
+        Raises:
+            Exception: The error which stopped the background thread, if any.
+        """
+        self._raise_error()
+        self._write_record(
+            {
+                "flush": False,
+                "operations": [
+                    _get_operation_values(operation) for operation in operations
+                ],
+            },
+            journal=False,
+        )
+
+    def _write_record(self, record: dict[str, Any], journal: bool = True) -> None:
+        with self._record_lock:
+            self._sequence += 1
+            record["sequence"] = self._sequence
+            if journal and self._journal is not None:
+                self._journal.append(
+                    {
+                        "sequence": record["sequence"],
+                        "deployment": _encode_values(record.get("deployment", {})),
+                        "operations": [
+                            _encode_values(values)
+                            for values in record.get("operations", [])
+                        ],
+                        "status_logs": [
+                            _encode_values(values)
+                            for values in record.get("status_logs", [])
+                        ],
+                    }
+                )
+            self._queue.put(record)
+
+    def flush(self) -> None:
+        """Write the pending records without waiting for the flush interval."""
+        self._raise_error()
+        with self._record_lock:
+            self._queue.put({"sequence": self._sequence, "flush": True})
+
+    def close(self) -> None:
+        """Write the pending records and stop the background thread.
+
+        Raises:
+            Exception: The error which stopped the background thread, if any.
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._journal is not None:
+            # Keep the journal for reconciliation if some records were not written
+            self._journal.close(remove=self._error is None)
+            self._journal = None
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _run(self) -> None:
+        pending = _PendingProgress()
+        next_flush = time.monotonic() + self._flush_interval
+        closed = False
+        while not closed:
+            try:
+                record = self._queue.get(timeout=max(next_flush - time.monotonic(), 0))
+            except queue.Empty:
+                record = {}
+            if record is None:
+                closed = True
+            elif record:
+                pending.add(record)
+            if not (
+                closed or (record and record["flush"]) or time.monotonic() >= next_flush
+            ):
+                continue
+            next_flush = time.monotonic() + self._flush_interval
+            if not pending:
+                continue
+            try:
+                pending.write(self._engine, self._deployment_id)
+            except Exception as e:
+                logger.exception("Failed to write the deployment progress")
+                self._error = e
+                return
+            if self._journal is not None:
+                self._journal.append({"flushed": pending.sequence})
+            pending = _PendingProgress()
+
+
+def reconcile_journals(engine: Engine, journal_dir: PathLike) -> list[int]:
+    """Write the records of the local journals which were not written to the database.
+
+    Journals are removed once written.
+
+    Args:
+        engine: Engine of the database.
+        journal_dir: Directory of the local journals.
+
+    Returns:
+        Ids of the reconciled deployments.
+    """
+    journal_dir = Path(journal_dir)
+    if not journal_dir.exists():
+        return []
+    deployment_ids = []
+    for path in sorted(journal_dir.glob("deployment_*.jsonl")):
+        deployment_id = int(path.stem.split("_", 1)[1])
+        pending = _PendingProgress()
+        for record in _Journal.read_unflushed(path):
+            pending.add(
+                {
+                    "sequence": record["sequence"],
+                    "deployment": _decode_values("deployment", record["deployment"]),
+                    "operations": [
+                        _decode_values("operation", values)
+                        for values in record["operations"]
+                    ],
+                    "status_logs": [
+                        _decode_values("status_log", values)
+                        for values in record["status_logs"]
+                    ],
+                }
+            )
+        if pending:
+            pending.write(engine, deployment_id)
+            logger.info(f"Deployment {deployment_id} reconciled from {path}")
+            deployment_ids.append(deployment_id)
+        path.unlink()
+    return deployment_ids
@@ -3,7 +3,7 @@
 
 from typing import Optional
 
-from sqlalchemy import Engine
+from sqlalchemy import Engine, inspect
 from sqlalchemy.engine.row import Row
 
 from tdp.core.models.base_model import BaseModel
@@ -14,6 +14,11 @@ from tdp.core.models.deployment_model import (
     NothingToResumeError,
 )
 from tdp.core.models.operation_model import OperationModel
+from tdp.core.models.sch_latest_status_model import (
+    SCHLatestStatusModel,
+    rebuild_sch_latest_status,
+)
+from tdp.core.models.sch_status_log_compaction import compact_sch_status_logs
 from tdp.core.models.sch_status_log_model import (
     SCHStatusLogModel,
     SCHStatusLogSourceEnum,
@@ -21,4 +26,13 @@ from tdp.core.models.sch_status_log_model import (
 
 
 def init_database(engine: Engine) -> None:
-    BaseModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        # The latest status table must be filled from the existing status logs
+        tables = inspect(connection).get_table_names()
+        backfill = (
+            SCHStatusLogModel.__tablename__ in tables
+            and SCHLatestStatusModel.__tablename__ not in tables
+        )
+        BaseModel.metadata.create_all(connection)
+        if backfill:
+            rebuild_sch_latest_status(connection)
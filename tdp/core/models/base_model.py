@@ -11,6 +11,27 @@ from tdp.core.utils import BaseEnum
 LOCAL_TIMEZONE = datetime.now(timezone.utc).astimezone().tzinfo
 
 
+def format_value(key: str, value: Optional[Any]) -> str:
+    """Format a value for printing."""
+    if isinstance(value, dict):
+        return str({key: format_value(key, value) for key, value in value.items()})
+    elif isinstance(value, list):
+        if len(value) > 2:
+            return f"[{value[0]}, ..., {value[-1]}]"
+        return str(value)
+    elif isinstance(value, BaseEnum):
+        return value.name
+    elif isinstance(value, datetime):
+        return (
+            value.replace(tzinfo=timezone.utc)
+            .astimezone(LOCAL_TIMEZONE)
+            .strftime("%Y-%m-%d %H:%M:%S")
+        )
+    elif value is None:
+        return ""
+    return str(value)
+
+
 class BaseModel(DeclarativeBase):
     """Custom base class for SQLAlchemy models."""
 
@@ -47,22 +68,4 @@ class BaseModel(DeclarativeBase):
 
     def _formater(self, key: str, value: Optional[Any]) -> str:
         """Format a value for printing."""
-        if isinstance(value, dict):
-            return str(
-                {key: self._formater(key, value) for key, value in value.items()}
-            )
-        elif isinstance(value, list):
-            if len(value) > 2:
-                return f"[{value[0]}, ..., {value[-1]}]"
-            return str(value)
-        elif isinstance(value, BaseEnum):
-            return value.name
-        elif isinstance(value, datetime):
-            return (
-                value.replace(tzinfo=timezone.utc)
-                .astimezone(LOCAL_TIMEZONE)
-                .strftime("%Y-%m-%d %H:%M:%S")
-            )
-        elif value is None:
-            return ""
-        return str(value)
+        return format_value(key, value)
@@ -0,0 +1,67 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+import lzma
+import zlib
+from typing import Literal, Optional
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+CompressionFormat = Literal["zlib", "lzma"]
+
+# Prefix of the compressed logs, raw logs are text and never start with a NUL byte
+_FORMAT_MARKERS: dict[CompressionFormat, bytes] = {
+    "zlib": b"\x00zlib\x00",
+    "lzma": b"\x00lzma\x00",
+}
+
+
+def is_compressed(data: bytes) -> bool:
+    """Whether some logs are compressed."""
+    return any(data.startswith(marker) for marker in _FORMAT_MARKERS.values())
+
+
+def compress_logs(data: bytes, format: CompressionFormat = "zlib") -> bytes:
+    """Compress logs, prefixed with the marker of the compression format."""
+    if format == "zlib":
+        compressed = zlib.compress(data)
+    elif format == "lzma":
+        compressed = lzma.compress(data)
+    else:
+        raise ValueError(f"Unknown compression format: {format}")
+    return _FORMAT_MARKERS[format] + compressed
+
+
+def decompress_logs(data: bytes) -> bytes:
+    """Decompress logs according to their format marker, raw logs are returned as is."""
+    for format, marker in _FORMAT_MARKERS.items():
+        if data.startswith(marker):
+            compressed = data[len(marker) :]
+            if format == "zlib":
+                return zlib.decompress(compressed)
+            return lzma.decompress(compressed)
+    return data
+
+
+class CompressedLogs(TypeDecorator):
+    """Binary column compressed on write and decompressed on read."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(
+        self, length: Optional[int] = None, format: CompressionFormat = "zlib"
+    ):
+        super().__init__(length)
+        self.format = format
+
+    def process_bind_param(self, value: Optional[bytes], dialect) -> Optional[bytes]:
+        if value is None or is_compressed(value):
+            return value
+        return compress_logs(value, self.format)
+
+    def process_result_value(self, value: Optional[bytes], dialect) -> Optional[bytes]:
+        if value is None:
+            return value
+        return decompress_logs(value)
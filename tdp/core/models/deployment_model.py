@@ -6,14 +6,19 @@ from __future__ import annotations
 import logging
 from collections.abc import Iterable
 from datetime import datetime
+from itertools import groupby
 from typing import TYPE_CHECKING, Literal, NamedTuple, Optional
 
 from exceptiongroup import ExceptionGroup
-from sqlalchemy import JSON
+from sqlalchemy import JSON, Float, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from tabulate import tabulate
 
-from tdp.core.constants import OPERATION_SLEEP_NAME, OPERATION_SLEEP_VARIABLE
+from tdp.core.constants import (
+    OPERATION_NAME_MAX_LENGTH,
+    OPERATION_SLEEP_NAME,
+    OPERATION_SLEEP_VARIABLE,
+)
 from tdp.core.dag import Dag
 from tdp.core.entities.operation import (
     NotPlaybookOperationError,
@@ -51,9 +56,11 @@ class NothingToReconfigureError(Exception):
 class NothingToResumeError(Exception):
     pass
 
+
 class NothingToDeployError(Exception):
     pass
 
+
 class NothingToFixError(Exception):
     pass
 
@@ -82,6 +89,152 @@ class _OperationHost(NamedTuple):
     host: Optional[str]
 
 
+class _PlannedOperation(NamedTuple):
+    operation: str
+    host: Optional[str]
+    extra_vars: Optional[list[str]]
+    # Index of the rolling batch of hosts of the operation, see `_plan_rolling_batches`
+    batch: Optional[int] = None
+
+
+def get_rolling_batch_size(rolling_batch: str, host_count: int) -> int:
+    """Get the number of hosts restarted at once by a rolling restart.
+
+    Args:
+        rolling_batch: Number of hosts (e.g. "20") or percentage of the hosts (e.g.
+          "10%") of a batch.
+        host_count: Number of hosts to restart.
+
+    Returns:
+        Size of the batches, at least 1.
+
+    Raises:
+        ValueError: If the rolling batch is not a positive number or a percentage.
+    """
+    is_percentage = rolling_batch.endswith("%")
+    value = int(rolling_batch[:-1] if is_percentage else rolling_batch)
+    if value < 1 or (is_percentage and value > 100):
+        raise ValueError(
+            f"Rolling batch must be a positive number of hosts or a percentage, "
+            f"got '{rolling_batch}'."
+        )
+    if is_percentage:
+        value = host_count * value // 100
+    return max(value, 1)
+
+
+def _can_restart_by_batch(operation: Operation) -> bool:
+    return (
+        isinstance(operation, PlaybookOperation)
+        and operation.name.action == "restart"
+        and len(operation.playbook.hosts) > 0
+        and operation.playbook.meta.can_limit
+    )
+
+
+def _plan_rolling_batches(
+    operation_hosts: Iterable[_OperationHost],
+    rolling_batch: str,
+    rolling_interval: Optional[int],
+    extra_vars: Optional[list[str]] = None,
+) -> list[_PlannedOperation]:
+    """Plan the restarts of each operation by batches of hosts.
+
+    The consecutive occurrences of a restart operation (or its occurrence on all
+    hosts) are replaced by an occurrence on each host, batch after batch. If set, a
+    sleep operation of `rolling_interval` seconds is inserted between two batches.
+    The occurrences of a batch are consecutive and hold the index of their batch, so
+    that they are run at once (see `get_rolling_batches`).
+
+    Args:
+        operation_hosts: Operations to plan, with the host they are limited to.
+        rolling_batch: Size of the batches, see `get_rolling_batch_size`.
+        rolling_interval: Time (in seconds) to wait between two batches.
+        extra_vars: Extra vars of the operations.
+    """
+    planned_operations: list[_PlannedOperation] = []
+    batch = 0
+    for operation, group in groupby(operation_hosts, key=lambda x: x.operation):
+        hosts = [operation_host.host for operation_host in group]
+        if not _can_restart_by_batch(operation):
+            planned_operations.extend(
+                _PlannedOperation(operation.name.name, host, extra_vars)
+                for host in hosts
+            )
+            continue
+        if None in hosts and isinstance(operation, PlaybookOperation):
+            hosts = sorted(operation.playbook.hosts)
+        batch_size = get_rolling_batch_size(rolling_batch, len(hosts))
+        for start in range(0, len(hosts), batch_size):
+            if start > 0 and rolling_interval is not None:
+                planned_operations.append(
+                    _PlannedOperation(
+                        OPERATION_SLEEP_NAME,
+                        None,
+                        [f"{OPERATION_SLEEP_VARIABLE}={rolling_interval}"],
+                    )
+                )
+            planned_operations.extend(
+                _PlannedOperation(operation.name.name, host, extra_vars, batch)
+                for host in hosts[start : start + batch_size]
+            )
+            batch += 1
+    return planned_operations
+
+
+def get_rolling_batches(deployment: DeploymentModel) -> dict[int, int]:
+    """Get the rolling batch of the operations of a deployment.
+
+    The batches are recorded in the `rolling_batches` option of the deployment, as
+    the first and last operation orders of each batch of more than one host.
+
+    Returns:
+        Index of the batch of the operations planned by batches of hosts, by
+        operation order.
+    """
+    return {
+        operation_order: batch
+        for batch, (first, last) in enumerate(
+            (deployment.options or {}).get("rolling_batches", [])
+        )
+        for operation_order in range(first, last + 1)
+    }
+
+
+def _append_planned_operations(
+    deployment: DeploymentModel, planned_operations: Iterable[_PlannedOperation]
+) -> None:
+    """Append planned operations to a deployment, and record their rolling batches
+    (see `get_rolling_batches`)."""
+    batches: dict[int, list[int]] = {}
+    for operation_order, planned_operation in enumerate(planned_operations, start=1):
+        deployment.operations.append(
+            OperationModel(
+                operation=planned_operation.operation,
+                operation_order=operation_order,
+                host=planned_operation.host,
+                extra_vars=planned_operation.extra_vars,
+                state=OperationStateEnum.PLANNED,
+            )
+        )
+        if planned_operation.batch is not None:
+            batches.setdefault(planned_operation.batch, []).append(operation_order)
+    _set_rolling_batches(deployment, batches.values())
+
+
+def _set_rolling_batches(
+    deployment: DeploymentModel, batches: Iterable[list[int]]
+) -> None:
+    """Record the batches of consecutive operation orders in the deployment options,
+    batches of a single operation are left out."""
+    rolling_batches = [[batch[0], batch[-1]] for batch in batches if len(batch) > 1]
+    if rolling_batches:
+        deployment.options = {
+            **(deployment.options or {}),
+            "rolling_batches": rolling_batches,
+        }
+
+
 class DeploymentModel(BaseModel):
     """Deployment model.
 
@@ -89,6 +242,7 @@ class DeploymentModel(BaseModel):
     """
 
     __tablename__ = "deployment"
+    __table_args__ = (Index("ix_deployment_state", "state"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, doc="deployment id.")
     options: Mapped[Optional[dict]] = mapped_column(
@@ -100,6 +254,21 @@ class DeploymentModel(BaseModel):
     deployment_type: Mapped[Optional[DeploymentTypeEnum]] = mapped_column(
         doc="Deployment type."
     )
+    # Summary of the operations, maintained as they end to list the deployments
+    # without loading them
+    operation_count: Mapped[Optional[int]] = mapped_column(doc="Number of operations.")
+    failed_operation_count: Mapped[Optional[int]] = mapped_column(
+        doc="Number of failed operations."
+    )
+    host_count: Mapped[Optional[int]] = mapped_column(
+        doc="Number of distinct hosts the operations are limited to."
+    )
+    total_duration: Mapped[Optional[float]] = mapped_column(
+        Float, doc="Total duration of the ended operations, in seconds."
+    )
+    last_operation: Mapped[Optional[str]] = mapped_column(
+        String(OPERATION_NAME_MAX_LENGTH), doc="Name of the last ended operation."
+    )
 
     operations: Mapped[list[OperationModel]] = relationship(
         back_populates="deployment",
@@ -131,11 +300,15 @@ class DeploymentModel(BaseModel):
         stop: bool = False,
         rolling_interval: Optional[int] = None,
         host_names: Optional[Iterable[str]] = None,
+        rolling_batch: Optional[str] = None,
     ) -> DeploymentModel:
         """Generate a deployment plan from a DAG.
 
         Log if an operation can't be limited on the provided host (if specified).
 
+        With a rolling batch, restart operations are run by batches of hosts, with
+        `rolling_interval` seconds between two batches (see `_plan_rolling_batches`).
+
         Raises:
             NoOperationMatchError: if no operation match the provided parameters.
         """
@@ -203,11 +376,18 @@ class DeploymentModel(BaseModel):
                         "restart": restart,
                         "stop": stop,
                         "reverse": reverse,
+                        "rolling_batch": rolling_batch,
                     }
                 ),
             },
             state=DeploymentStateEnum.PLANNED,
         )
+        if rolling_batch is not None:
+            _append_planned_operations(
+                deployment,
+                _plan_rolling_batches(operation_hosts, rolling_batch, rolling_interval),
+            )
+            return deployment
         operation_order = 1
         for operation, host in operation_hosts:
             can_perform_rolling_restart = (
@@ -246,9 +426,13 @@ class DeploymentModel(BaseModel):
         host_names: Optional[Iterable[str]] = None,
         extra_vars: Optional[Iterable[str]] = None,
         rolling_interval: Optional[int] = None,
+        rolling_batch: Optional[str] = None,
     ) -> DeploymentModel:
         """Generate a deployment plan from a list of operations.
 
+        With a rolling batch, restart operations are run by batches of hosts, with
+        `rolling_interval` seconds between two batches (see `_plan_rolling_batches`).
+
         Raises:
             ExceptionGroup: With the list of operations that are missing from the collections or invalid.
         """
@@ -261,6 +445,7 @@ class DeploymentModel(BaseModel):
                         "hosts": host_names,
                         "extra_vars": extra_vars,
                         "rolling_interval": rolling_interval,
+                        "rolling_batch": rolling_batch,
                     }
                 ),
             },
@@ -268,6 +453,7 @@ class DeploymentModel(BaseModel):
         )
 
         exceptions = []
+        operation_hosts: list[_OperationHost] = []
         operation_order = 1
         for operation_name in operation_names:
             # Check if operation is valid.
@@ -282,6 +468,13 @@ class DeploymentModel(BaseModel):
             if len(exceptions) > 0:
                 continue
 
+            if rolling_batch is not None:
+                operation_hosts.extend(
+                    _OperationHost(operation, host_name)
+                    for host_name in host_names or [None]
+                )
+                continue
+
             can_perform_rolling_restart = (
                 rolling_interval is not None
                 and isinstance(operation, PlaybookOperation)
@@ -291,7 +484,7 @@ class DeploymentModel(BaseModel):
             for host_name in host_names or (
                 # if restart operation with rolling and no host is specified,
                 # run on all hosts
-                operation.playbook.hosts  # type: ignore : operation is a PlaybookOperation
+                operation.playbook.hosts  # type: ignore
                 if can_perform_rolling_restart
                 else [None]
             ):
@@ -323,6 +516,16 @@ class DeploymentModel(BaseModel):
         if len(exceptions):
             raise ExceptionGroup("At least one operation is invalid.", exceptions)
 
+        if rolling_batch is not None:
+            _append_planned_operations(
+                deployment,
+                _plan_rolling_batches(
+                    operation_hosts,
+                    rolling_batch,
+                    rolling_interval,
+                    list(extra_vars) if extra_vars else None,
+                ),
+            )
         return deployment
 
     @staticmethod
@@ -374,11 +577,15 @@ class DeploymentModel(BaseModel):
         collections: Collections,
         stale_hosted_entity_statuses: list[HostedEntityStatus],
         rolling_interval: Optional[int] = None,
+        rolling_batch: Optional[str] = None,
     ) -> DeploymentModel:
         """Generate a deployment plan for stale components.
 
         Log a warning if an operation is missing from the collections.
 
+        With a rolling batch, restart operations are run by batches of hosts, with
+        `rolling_interval` seconds between two batches (see `_plan_rolling_batches`).
+
         Raises:
             NothingToReconfigureError: If no component needs to be reconfigured.
         """
@@ -438,11 +645,20 @@ class DeploymentModel(BaseModel):
                 **_filter_falsy_options(
                     {
                         "rolling_interval": rolling_interval,
+                        "rolling_batch": rolling_batch,
                     }
                 ),
             },
             state=DeploymentStateEnum.PLANNED,
         )
+        if rolling_batch is not None:
+            _append_planned_operations(
+                deployment,
+                _plan_rolling_batches(
+                    reconfigure_operations_sorted, rolling_batch, rolling_interval
+                ),
+            )
+            return deployment
         operation_order = 1
         for operation, host in reconfigure_operations_sorted:
             deployment.operations.append(
@@ -507,6 +723,9 @@ class DeploymentModel(BaseModel):
             },
             state=DeploymentStateEnum.PLANNED,
         )
+        failed_batches = get_rolling_batches(failed_deployment)
+        # Batches of hosts are still restarted at once
+        batches: dict[int, list[int]] = {}
         for operation_order, failed_operation in enumerate(
             failed_deployment.operations[failed_operation_index:], 1
         ):
@@ -537,8 +756,33 @@ class DeploymentModel(BaseModel):
                     state=OperationStateEnum.PLANNED,
                 )
             )
+            if (
+                batch := failed_batches.get(failed_operation.operation_order)
+            ) is not None:
+                batches.setdefault(batch, []).append(operation_order)
+        _set_rolling_batches(deployment, batches.values())
         return deployment
 
+    def summarize_operations(self) -> None:
+        """Initialize the summary columns from the planned operations."""
+        self.operation_count = len(self.operations)
+        self.host_count = len(
+            {operation.host for operation in self.operations if operation.host}
+        )
+        self.failed_operation_count = 0
+        self.total_duration = 0.0
+        self.last_operation = None
+
+    def end_operation(self, operation: OperationModel) -> None:
+        """Report an ended operation to the summary columns."""
+        if operation.state == OperationStateEnum.FAILURE:
+            self.failed_operation_count = (self.failed_operation_count or 0) + 1
+        if operation.start_time and operation.end_time:
+            self.total_duration = (self.total_duration or 0.0) + (
+                operation.end_time - operation.start_time
+            ).total_seconds()
+        self.last_operation = operation.operation
+
     def start_running(self) -> None:
         if self.state != DeploymentStateEnum.PLANNED:
             raise NothingToDeployError()
@@ -546,6 +790,7 @@ class DeploymentModel(BaseModel):
         for operation in self.operations:
             operation.state = OperationStateEnum.PENDING
         self.start_time = datetime.utcnow()
+        self.summarize_operations()
 
     def fix_running(self):
         # Only RUNNING deployment can be fixed
@@ -562,6 +807,7 @@ class DeploymentModel(BaseModel):
             # If an operation is RUNNING, set it to FAILURE
             if operation.state == OperationStateEnum.RUNNING:
                 operation.state = OperationStateEnum.FAILURE
+                self.end_operation(operation)
                 held = True
             # If an operation is PENDING, set it to HELD
             elif operation.state == OperationStateEnum.PENDING:
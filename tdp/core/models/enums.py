@@ -47,3 +47,16 @@ class SCHStatusLogSourceEnum(BaseEnum):
     FORCED = "Forced"
     STALE = "Stale"
     MANUAL = "Manual"
+    SNAPSHOT = "Snapshot"
+
+
+class FailurePolicyEnum(BaseEnum):
+    """Behavior of a concurrent deployment after a failed operation.
+
+    - FAIL_FAST: no other operation is started, the pending ones are HELD.
+    - CONTINUE: the operations which don't depend on a failed operation are still
+      run, the other ones are HELD.
+    """
+
+    FAIL_FAST = "fail-fast"
+    CONTINUE = "continue"
@@ -6,15 +6,17 @@ from __future__ import annotations
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, Optional
 
-from sqlalchemy import JSON, ForeignKey, LargeBinary, String
+from sqlalchemy import JSON, ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from tdp.core.constants import (
+    FINGERPRINT_LENGTH,
     HOST_NAME_MAX_LENGTH,
     LOGS_MAX_LENGTH,
     OPERATION_NAME_MAX_LENGTH,
 )
 from tdp.core.models.base_model import BaseModel
+from tdp.core.models.compressed_logs import CompressedLogs
 from tdp.core.models.enums import OperationStateEnum
 
 if TYPE_CHECKING:
@@ -28,6 +30,9 @@ class OperationModel(BaseModel):
     """
 
     __tablename__ = "operation"
+    __table_args__ = (
+        Index("ix_operation_deployment_id_operation", "deployment_id", "operation"),
+    )
 
     deployment_id: Mapped[int] = mapped_column(
         ForeignKey("deployment.id"), primary_key=True, doc="deployment id."
@@ -47,8 +52,13 @@ class OperationModel(BaseModel):
     start_time: Mapped[Optional[datetime]] = mapped_column(doc="Operation start time.")
     end_time: Mapped[Optional[datetime]] = mapped_column(doc="Operation end time.")
     state: Mapped[OperationStateEnum] = mapped_column(doc="Operation state.")
+    fingerprint: Mapped[Optional[str]] = mapped_column(
+        String(FINGERPRINT_LENGTH),
+        doc="Hash of the inputs of the operation, set when it succeeds.",
+    )
+    # Logs are only loaded when accessed
     logs: Mapped[Optional[bytes]] = mapped_column(
-        LargeBinary(LOGS_MAX_LENGTH), doc="Operation logs."
+        CompressedLogs(LOGS_MAX_LENGTH), deferred=True, doc="Operation logs."
     )
 
     deployment: Mapped[DeploymentModel] = relationship(
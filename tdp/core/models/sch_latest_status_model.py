@@ -0,0 +1,240 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import (
+    Computed,
+    Connection,
+    Index,
+    Insert,
+    String,
+    case,
+    delete,
+    event,
+    func,
+    insert,
+    select,
+)
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Mapped, mapped_column
+
+from tdp.core.constants import (
+    COMPONENT_NAME_MAX_LENGTH,
+    HOST_NAME_MAX_LENGTH,
+    SERVICE_NAME_MAX_LENGTH,
+    VERSION_MAX_LENGTH,
+)
+from tdp.core.models.base_model import BaseModel
+from tdp.core.models.sch_status_log_model import (
+    SCHStatusLogModel,
+    format_status_value,
+)
+
+# Columns holding the latest non-null value of the status logs
+_STATUS_COLUMNS = ("running_version", "configured_version", "to_config", "to_restart")
+
+
+class SCHLatestStatusModel(BaseModel):
+    """Hold the latest status of each hosted entity.
+
+    Materialization of the `sch_status_log` table, updated in the same transaction as
+    the status logs inserted through the ORM.
+
+    A hosted entity has a single row, enforced by a unique index on the service and
+    the coalesced component and host, see `update_sch_latest_status`.
+    """
+
+    __tablename__ = "sch_latest_status"
+    __table_args__ = (
+        Index(
+            "ix_sch_latest_status_service_component_host",
+            "service",
+            "component_key",
+            "host_key",
+            unique=True,
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(
+        doc="Unique id of the hosted entity status.", primary_key=True
+    )
+    event_time: Mapped[datetime] = mapped_column(
+        doc="Timestamp of the latest status log."
+    )
+    service: Mapped[str] = mapped_column(
+        String(SERVICE_NAME_MAX_LENGTH), doc="Service name."
+    )
+    component: Mapped[Optional[str]] = mapped_column(
+        String(COMPONENT_NAME_MAX_LENGTH),
+        doc="Component name.",
+    )
+    host: Mapped[Optional[str]] = mapped_column(
+        String(HOST_NAME_MAX_LENGTH), doc="Host name."
+    )
+    # Null values are distinct in unique indexes and MariaDB has no functional
+    # indexes, the nullable columns of the key are coalesced by generated columns.
+    # They are not declared NOT NULL, which MariaDB doesn't allow either.
+    component_key: Mapped[str] = mapped_column(
+        String(COMPONENT_NAME_MAX_LENGTH),
+        Computed("coalesce(component, '')", persisted=True),
+        nullable=True,
+        doc="Component name, empty for a service.",
+    )
+    host_key: Mapped[str] = mapped_column(
+        String(HOST_NAME_MAX_LENGTH),
+        Computed("coalesce(host, '')", persisted=True),
+        nullable=True,
+        doc="Host name, empty for a service or component without host.",
+    )
+    running_version: Mapped[Optional[str]] = mapped_column(
+        String(VERSION_MAX_LENGTH), doc="Latest running version of the component."
+    )
+    configured_version: Mapped[Optional[str]] = mapped_column(
+        String(VERSION_MAX_LENGTH), doc="Latest configured version of the component."
+    )
+    to_config: Mapped[Optional[bool]] = mapped_column(
+        doc="True if the component need to be configured."
+    )
+    to_restart: Mapped[Optional[bool]] = mapped_column(
+        doc="True if the component need to be restarted."
+    )
+
+    def _formater(self, key: str, value: Any):
+        """Format a value for printing."""
+        return format_status_value(key, value)
+
+
+def _create_upsert_statement(connection: Connection) -> Insert:
+    """Create a statement inserting the latest status of a hosted entity, or merging
+    it with the existing one.
+
+    Non-null values override the latest ones. Logs older than the latest status only
+    fill the values which are still null.
+    """
+    table = SCHLatestStatusModel.__table__
+    if connection.dialect.name == "mysql":
+        stmt = mysql.insert(table)
+        new = stmt.inserted
+    else:
+        stmt = (
+            postgresql.insert(table)
+            if connection.dialect.name == "postgresql"
+            else sqlite.insert(table)
+        )
+        new = stmt.excluded
+    is_latest = new.event_time >= table.c.event_time
+    values = {
+        column: case(
+            (is_latest, func.coalesce(new[column], table.c[column])),
+            else_=func.coalesce(table.c[column], new[column]),
+        )
+        for column in _STATUS_COLUMNS
+    }
+    # Last, as MySQL assignments see the columns updated by the previous ones
+    values["event_time"] = case((is_latest, new.event_time), else_=table.c.event_time)
+    if isinstance(stmt, mysql.Insert):
+        return stmt.on_duplicate_key_update(list(values.items()))
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.service, table.c.component_key, table.c.host_key],
+        set_=values,
+    )
+
+
+def update_sch_latest_status(
+    connection: Connection, status_logs: Iterable[Mapping[str, Any]]
+) -> None:
+    """Report inserted status logs to the latest status of their hosted entity.
+
+    Non-null values override the latest ones. Logs older than the latest status only
+    fill the values which are still null.
+
+    The logs are merged by the database with upserts, so that concurrent writers
+    can't insert two rows for the same hosted entity. A statement can't update a row
+    twice, the logs of a hosted entity are upserted in successive statements, from
+    the oldest.
+
+    Args:
+        connection: Connection of the transaction inserting the status logs.
+        status_logs: Values of the inserted status logs.
+    """
+    logs_by_entity: dict[tuple, list[dict[str, Any]]] = {}
+    for log in sorted(status_logs, key=lambda log: log["event_time"]):
+        key = (log["service"], log.get("component"), log.get("host"))
+        logs_by_entity.setdefault(key, []).append(
+            {
+                "service": log["service"],
+                "component": log.get("component"),
+                "host": log.get("host"),
+                "event_time": log["event_time"],
+                **{column: log.get(column) for column in _STATUS_COLUMNS},
+            }
+        )
+    if not logs_by_entity:
+        return
+    stmt = _create_upsert_statement(connection)
+    for index in range(max(len(logs) for logs in logs_by_entity.values())):
+        connection.execute(
+            stmt,
+            [logs[index] for logs in logs_by_entity.values() if index < len(logs)],
+        )
+
+
+@event.listens_for(SCHStatusLogModel, "after_insert")
+def _update_sch_latest_status(mapper, connection: Connection, target) -> None:
+    """Report a status log inserted through the ORM to the latest status table."""
+    update_sch_latest_status(
+        connection,
+        [
+            {
+                column: getattr(target, column)
+                for column in ["service", "component", "host", "event_time"]
+                + list(_STATUS_COLUMNS)
+            }
+        ],
+    )
+
+
+def _create_last_value_statement(column, non_null=False):
+    """Create a windowed query that returns last value of a column.
+
+    Args:
+        column: The column to return the last value of.
+        non_null: Whether to return the last non-null value.
+    """
+    order_by = SCHStatusLogModel.event_time.desc()
+    if non_null:
+        order_by = case((column == None, 0), else_=1).desc(), order_by
+    return func.first_value(column).over(
+        partition_by=(
+            SCHStatusLogModel.service,
+            SCHStatusLogModel.component,
+            SCHStatusLogModel.host,
+        ),
+        order_by=order_by,
+    )
+
+
+def rebuild_sch_latest_status(connection: Connection) -> None:
+    """Rebuild the latest status table from the whole status logs table."""
+    latest_statuses = select(
+        SCHStatusLogModel.service,
+        SCHStatusLogModel.component,
+        SCHStatusLogModel.host,
+        _create_last_value_statement(SCHStatusLogModel.event_time),
+        *[
+            _create_last_value_statement(
+                getattr(SCHStatusLogModel, column), non_null=True
+            )
+            for column in _STATUS_COLUMNS
+        ],
+    ).distinct()
+    connection.execute(delete(SCHLatestStatusModel))
+    connection.execute(
+        insert(SCHLatestStatusModel).from_select(
+            ["service", "component", "host", "event_time", *_STATUS_COLUMNS],
+            latest_statuses,
+        )
+    )
@@ -0,0 +1,123 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+import gzip
+import json
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Connection, delete, func, insert, select, type_coerce
+
+from tdp.core.models.enums import SCHStatusLogSourceEnum
+from tdp.core.models.sch_latest_status_model import (
+    _STATUS_COLUMNS,
+    _create_last_value_statement,
+)
+from tdp.core.models.sch_status_log_model import SCHStatusLogModel
+from tdp.core.types import PathLike
+from tdp.core.utils import BaseEnum
+
+
+def _archive_status_logs(
+    connection: Connection, cutoff: datetime, archive: PathLike, batch_size: int
+) -> None:
+    """Write the status logs up to a cutoff to a gzip compressed JSON lines file."""
+    table = SCHStatusLogModel.__table__
+    result = connection.execute(
+        select(table)
+        .where(table.c.event_time <= cutoff)
+        .order_by(table.c.event_time, table.c.id)
+        .execution_options(yield_per=batch_size)
+    )
+    with gzip.open(archive, "wt", encoding="utf-8") as file:
+        for row in result.mappings():
+            values = {
+                column: (
+                    value.isoformat()
+                    if isinstance(value, datetime)
+                    else value.value
+                    if isinstance(value, BaseEnum)
+                    else value
+                )
+                for column, value in row.items()
+            }
+            file.write(json.dumps(values) + "\n")
+
+
+def compact_sch_status_logs(
+    connection: Connection,
+    cutoff: datetime,
+    *,
+    archive: Optional[PathLike] = None,
+    batch_size: int = 1000,
+) -> int:
+    """Fold the status logs up to a cutoff into one snapshot log per hosted entity.
+
+    A snapshot log holds the latest non-null values of the folded logs of its hosted
+    entity, at the time of the latest of them. The latest status computed from the
+    status logs is therefore unchanged.
+
+    Args:
+        connection: Connection to the database.
+        cutoff: Logs whose event time is not after the cutoff are folded.
+        archive: Path of a gzip compressed JSON lines file to write the folded logs
+          to, not archived if None.
+        batch_size: Number of logs loaded at once when archiving.
+
+    Returns:
+        Number of folded logs.
+    """
+    table = SCHStatusLogModel.__table__
+    folded = table.c.event_time <= cutoff
+    count = connection.execute(
+        select(func.count()).select_from(table).where(folded)
+    ).scalar_one()
+    if not count:
+        return 0
+    if archive is not None:
+        _archive_status_logs(connection, cutoff, archive, batch_size)
+
+    partition_by = (
+        SCHStatusLogModel.service,
+        SCHStatusLogModel.component,
+        SCHStatusLogModel.host,
+    )
+    snapshots_query = (
+        select(
+            *partition_by,
+            # Window functions are not typed from their column
+            type_coerce(
+                _create_last_value_statement(SCHStatusLogModel.event_time),
+                SCHStatusLogModel.event_time.type,
+            ),
+            *[
+                type_coerce(
+                    _create_last_value_statement(
+                        getattr(SCHStatusLogModel, column), non_null=True
+                    ),
+                    getattr(SCHStatusLogModel, column).type,
+                )
+                for column in _STATUS_COLUMNS
+            ],
+            func.count().over(partition_by=partition_by),
+        )
+        .where(SCHStatusLogModel.event_time <= cutoff)
+        .distinct()
+    )
+    snapshots = [
+        {
+            "service": service,
+            "component": component,
+            "host": host,
+            "event_time": event_time,
+            **dict(zip(_STATUS_COLUMNS, values)),
+            "source": SCHStatusLogSourceEnum.SNAPSHOT,
+            "message": f"Snapshot of {logs_count} status logs.",
+        }
+        for service, component, host, event_time, *values, logs_count in (
+            connection.execute(snapshots_query)
+        )
+    ]
+    connection.execute(delete(table).where(folded))
+    connection.execute(insert(table), snapshots)
+    return count
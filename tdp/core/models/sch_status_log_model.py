@@ -4,7 +4,7 @@
 from datetime import datetime
 from typing import Any, Optional
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from tdp.core.constants import (
@@ -14,14 +14,31 @@ from tdp.core.constants import (
     SERVICE_NAME_MAX_LENGTH,
     VERSION_MAX_LENGTH,
 )
-from tdp.core.models.base_model import BaseModel
+from tdp.core.models.base_model import BaseModel, format_value
 from tdp.core.models.enums import SCHStatusLogSourceEnum
 
 
+def format_status_value(key: str, value: Optional[Any]) -> str:
+    """Format a value of a hosted entity status for printing, the versions are
+    shortened."""
+    if key in ["running_version", "configured_version"] and value:
+        return str(value[:7])
+    return format_value(key, value)
+
+
 class SCHStatusLogModel(BaseModel):
     """Hold what component version are deployed."""
 
     __tablename__ = "sch_status_log"
+    __table_args__ = (
+        Index(
+            "ix_sch_status_log_service_component_host_event_time",
+            "service",
+            "component",
+            "host",
+            "event_time",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(
         doc="Unique id of the cluster status log.", primary_key=True
@@ -66,6 +83,4 @@ class SCHStatusLogModel(BaseModel):
 
     def _formater(self, key: str, value: Any):
         """Format a value for printing."""
-        if key in ["running_version", "configured_version"] and value:
-            return str(value[:7])
-        return super()._formater(key, value)
+        return format_status_value(key, value)
@@ -0,0 +1,86 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from threading import Lock, RLock
+from weakref import WeakValueDictionary
+
+from git import BadName, GitDB, InvalidGitRepositoryError, NoSuchPathError, Repo
+
+from tdp.core.repository.git_repository import GitRepository, with_repo_path
+from tdp.core.repository.repository import NotARepository, NoVersionYet
+from tdp.core.types import PathLike
+
+logger = logging.getLogger(__name__)
+
+
+class _SharedRepo:
+    """Git repository and lock shared by the directories of a repository."""
+
+    def __init__(self, repo: Repo):
+        self.repo = repo
+        self.lock = RLock()
+
+
+_shared_repos: WeakValueDictionary[Path, _SharedRepo] = WeakValueDictionary()
+_shared_repos_lock = Lock()
+
+
+class GitMonoRepository(GitRepository):
+    """Directory of a Git repository shared with other directories.
+
+    The Git repository is the parent directory (i.e. `tdp_vars`), each of its
+    directories being a repository (i.e. a service). The underlying Git repository is
+    opened once for all its directories.
+
+    The version of a repository is the hash of its directory tree. Hence, it only
+    changes when the files of the directory change.
+    """
+
+    @property
+    def _scope(self) -> str:
+        return self.path.name
+
+    def _open_repo(self) -> Repo:
+        root = self.path.parent
+        with _shared_repos_lock:
+            shared_repo = _shared_repos.get(root.resolve())
+            if shared_repo is None:
+                try:
+                    repo = Repo(root, odbt=GitDB)
+                except (InvalidGitRepositoryError, NoSuchPathError) as e:
+                    raise NotARepository(f"{root} is not a valid repository") from e
+                shared_repo = _shared_repos[root.resolve()] = _SharedRepo(repo)
+        # Keep a reference to the shared repository and serialize operations on its
+        # index
+        self._shared_repo = shared_repo
+        self._lock = shared_repo.lock
+        return shared_repo.repo
+
+    @staticmethod
+    def init(path: PathLike) -> GitMonoRepository:
+        """Initialize a new directory, and the Git repository in its parent directory
+        if needed."""
+        path = Path(path)
+        try:
+            with Repo(path.parent):
+                pass
+        except (InvalidGitRepositoryError, NoSuchPathError):
+            with Repo.init(path.parent, mkdir=True):
+                logger.info(f"Git repository initialized at {path.parent}")
+        path.mkdir(parents=True, exist_ok=True)
+        return GitMonoRepository(path)
+
+    @with_repo_path
+    def current_version(self) -> str:
+        with self._lock:
+            try:
+                tree = self._get_tree("HEAD")
+            except (BadName, ValueError) as e:
+                raise NoVersionYet from e
+            if tree is None:
+                raise NoVersionYet
+            return tree.hexsha
@@ -4,12 +4,27 @@
 from __future__ import annotations
 
 import functools
+import hashlib
 import logging
+import os
+import stat
 from collections.abc import Generator, Iterable
 from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
 
-from git import BadName, InvalidGitRepositoryError, NoSuchPathError, Repo
+from git import (
+    BadName,
+    GitDB,
+    IndexFile,
+    InvalidGitRepositoryError,
+    NoSuchPathError,
+    Repo,
+)
+from git.index.typ import IndexEntry
+from git.objects import Tree
 
+from tdp.core.constants import YML_EXTENSION
 from tdp.core.repository.repository import (
     EmptyCommit,
     NotARepository,
@@ -20,6 +35,79 @@ from tdp.core.types import PathLike
 
 logger = logging.getLogger(__name__)
 
+# Hash of the empty tree, known by git without being stored in the object database
+EMPTY_TREE_SHA = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+
+# Stat values are truncated to 32 bits in the git index
+_INDEX_STAT_MASK = 0xFFFFFFFF
+
+# Attributes for which git converts the files content when adding them to the index
+_CONVERSION_ATTRIBUTES = {
+    "crlf",
+    "eol",
+    "filter",
+    "ident",
+    "text",
+    "working-tree-encoding",
+}
+
+
+def _hash_blob(data: bytes) -> bytes:
+    """Compute the git blob hash of some content."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).digest()
+
+
+def _read_worktree_file(path: Path, st: os.stat_result) -> bytes:
+    """Read a working tree file the way git stores it."""
+    if stat.S_ISLNK(st.st_mode):
+        return os.fsencode(os.readlink(path))
+    return path.read_bytes()
+
+
+def _index_mode(st: os.stat_result) -> int:
+    """Get the index mode of a working tree file."""
+    if stat.S_ISLNK(st.st_mode):
+        return stat.S_IFLNK
+    return stat.S_IFREG | (0o755 if st.st_mode & stat.S_IXUSR else 0o644)
+
+
+def _stat_matches(entry: IndexEntry, st: os.stat_result, index_mtime_ns: int) -> bool:
+    """Whether the stat data of a working tree file matches its index entry.
+
+    Entries modified after the index was written are "racily clean" and their content
+    must be checked.
+    """
+    mtime_ns = entry.mtime[0] * 1_000_000_000 + entry.mtime[1]
+    return (
+        mtime_ns < index_mtime_ns
+        and entry.mtime[0] == int(st.st_mtime) & _INDEX_STAT_MASK
+        and entry.mtime[1] == st.st_mtime_ns % 1_000_000_000
+        and entry.size == st.st_size & _INDEX_STAT_MASK
+        and entry.inode == st.st_ino & _INDEX_STAT_MASK
+    )
+
+
+def _tree_sha(tree: Optional[Tree]) -> str:
+    """Get the hash of a tree, None being the empty tree."""
+    return tree.hexsha if tree is not None else EMPTY_TREE_SHA
+
+
+def _has_conversion_attributes(attributes_path: Path) -> bool:
+    """Whether a gitattributes file sets attributes converting the content of the
+    files between the working tree and the index (e.g. end of lines or filters)."""
+    try:
+        lines = attributes_path.read_text(errors="replace").splitlines()
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+    for line in lines:
+        fields = line.split()
+        if not fields or fields[0].startswith("#"):
+            continue
+        for attribute in fields[1:]:
+            if attribute.lstrip("-!").split("=")[0] in _CONVERSION_ATTRIBUTES:
+                return True
+    return False
+
 
 def with_repo_path(func):
     """Decorator to annotate exceptions with the repository path."""
@@ -39,8 +127,25 @@ class GitRepository(Repository):
 
     def __init__(self, path: PathLike):
         super().__init__(path)
+        self._repo = self._open_repo()
+        # Root level YAML blobs by tree hash, trees are immutable
+        self._yml_blobs_cache: dict[str, dict[str, str]] = {}
+
+    @property
+    def _scope(self) -> str:
+        """Path of the repository files inside the git working tree."""
+        return ""
+
+    def _open_repo(self) -> Repo:
+        """Open the underlying git repository.
+
+        Raises:
+            NotARepository: If the path is not a valid repository.
+        """
         try:
-            self._repo = Repo(self.path)
+            # GitDB reads objects in-process instead of through a `git cat-file`
+            # subprocess
+            return Repo(self.path, odbt=GitDB)
         except (InvalidGitRepositoryError, NoSuchPathError) as e:
             raise NotARepository(f"{self.path} is not a valid repository") from e
 
@@ -64,23 +169,30 @@ class GitRepository(Repository):
         with self._lock:
             yield self
             try:
-                if len(self._repo.index.diff("HEAD")) == 0:
-                    raise EmptyCommit(
-                        "validating these changes would produce no difference"
-                    )
-            except BadName as e:
+                head_tree = self._get_tree("HEAD")
+            except (BadName, ValueError) as e:
                 logger.debug(
                     f"error during diff: {e}. Probably because the repo is still empty."
                 )
+            else:
+                index_tree = self._scope_tree(self._repo.index.write_tree())
+                if _tree_sha(index_tree) == _tree_sha(head_tree):
+                    raise EmptyCommit(
+                        "validating these changes would produce no difference"
+                    )
             commit = self._repo.index.commit(msg)
             logger.info(f"commit on {self.path} [{commit.hexsha}]")
 
+    def _to_repo_path(self, path: PathLike) -> str:
+        """Get the path of a repository file relative to the git working tree."""
+        path = Path(path)
+        return str(path if path.is_absolute() else Path(self._scope, path))
+
     @with_repo_path
     def add_for_validation(self, paths: Iterable[PathLike]) -> None:
-        logger.debug(paths)
-        logger.debug(list(paths))
+        paths = list(paths)
         with self._lock:
-            self._repo.index.add(list(paths))
+            self._repo.index.add([self._to_repo_path(path) for path in paths])
             logger.debug(f"{', '.join([str(p) for p in paths])} staged")
 
     @with_repo_path
@@ -92,17 +204,165 @@ class GitRepository(Repository):
 
     @with_repo_path
     def is_clean(self) -> bool:
-        return not self._repo.is_dirty(untracked_files=True)
+        with self._lock:
+            is_clean = self._is_clean_from_stats()
+            if is_clean is None:
+                logger.debug(f"{self.path}: falling back to a full status check")
+                return not self._repo.is_dirty(
+                    untracked_files=True, path=self._scope or None
+                )
+            return is_clean
+
+    def _is_clean_from_stats(self) -> Optional[bool]:
+        """Check the repository cleanliness without running git.
+
+        The working tree files are compared against the index using their stat data
+        (mtime, size and inode), only files whose stat data differ have their content
+        hashed. Unlike `git status`, the stat data is not refreshed in the index so
+        that the check never writes to the repository.
+
+        Returns:
+            Whether the repository is clean, None if it can't be determined (e.g.
+            untracked files which may be ignored, or content converted by git).
+        """
+        work_tree = Path(self._repo.working_tree_dir)
+        index_path = Path(self._repo.git_dir, "index")
+        try:
+            index_mtime_ns = index_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            index_mtime_ns = 0
+        index = IndexFile(self._repo)
+        # Working tree files can't be hashed as is
+        if self._converts_content(index):
+            return None
+
+        # Staged changes: compare the index with HEAD
+        try:
+            head_tree = self._get_tree("HEAD")
+        except (BadName, ValueError):
+            head_tree = None
+        head_entries = {
+            item.path: (item.binsha, item.mode)
+            for item in (head_tree.traverse() if head_tree else [])
+            if item.type == "blob"
+        }
+        scope_prefix = self._scope + "/" if self._scope else ""
+        scoped_entries = {
+            key: entry
+            for key, entry in index.entries.items()
+            if entry.path.startswith(scope_prefix)
+        }
+        index_entries = {}
+        for (path, stage), entry in scoped_entries.items():
+            # Unmerged entries
+            if stage != 0:
+                return False
+            # Submodules
+            if stat.S_IFMT(entry.mode) == 0o160000:
+                return None
+            index_entries[path] = (entry.binsha, entry.mode)
+        if index_entries != head_entries:
+            return False
+
+        # Unstaged changes: compare the working tree with the index
+        for entry in scoped_entries.values():
+            file_path = work_tree / entry.path
+            try:
+                st = os.lstat(file_path)
+            except FileNotFoundError:
+                return False
+            if _stat_matches(entry, st, index_mtime_ns):
+                continue
+            if _index_mode(st) != entry.mode:
+                # May be ignored depending on the git configuration (core.filemode)
+                return None
+            if _hash_blob(_read_worktree_file(file_path, st)) != entry.binsha:
+                return False
+
+        # Untracked files
+        for root, dirs, files in os.walk(work_tree / self._scope):
+            if Path(root) == work_tree and ".git" in dirs:
+                dirs.remove(".git")
+            for file_name in files:
+                path = Path(root, file_name).relative_to(work_tree).as_posix()
+                if path != ".git" and path not in index_entries:
+                    return None
+        return True
+
+    def _converts_content(self, index: IndexFile) -> bool:
+        """Whether git may convert the content of the files between the working tree
+        and the index, because of `core.autocrlf` or of gitattributes."""
+        config = self._repo.config_reader()
+        if config.get_value("core", "autocrlf", False) not in (False, "false"):
+            return True
+        attributes_paths = [
+            Path(self._repo.git_dir, "info", "attributes"),
+            Path(self._repo.working_tree_dir, ".gitattributes"),
+            *(
+                Path(self._repo.working_tree_dir, path)
+                for path, _ in index.entries
+                if Path(path).name == ".gitattributes"
+            ),
+        ]
+        if attributes_file := config.get_value("core", "attributesFile", ""):
+            attributes_paths.append(Path(attributes_file).expanduser())
+        else:
+            config_home = os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config"
+            attributes_paths.append(Path(config_home, "git", "attributes"))
+        return any(_has_conversion_attributes(path) for path in attributes_paths)
+
+    def _scope_tree(self, tree: Tree) -> Optional[Tree]:
+        """Get the subtree holding the repository files, None if it doesn't exist."""
+        if not self._scope:
+            return tree
+        try:
+            return tree[self._scope]
+        except KeyError:
+            return None
+
+    def _get_tree(self, rev: str) -> Optional[Tree]:
+        """Get the tree of a revision, None for the empty tree."""
+        if rev == EMPTY_TREE_SHA:
+            return None
+        obj = self._repo.rev_parse(rev)
+        while obj.type == "tag":
+            obj = obj.object
+        if isinstance(obj, Tree):
+            # Trees resolved from their hash have no path
+            return Tree(self._repo, obj.binsha, Tree.tree_id << 12, "")
+        return self._scope_tree(obj.tree)
+
+    def _get_yml_blobs(self, tree: Optional[Tree]) -> dict[str, str]:
+        """Get the hashes of the YAML files at the root of a tree."""
+        if tree is None:
+            return {}
+        if (blobs := self._yml_blobs_cache.get(tree.hexsha)) is None:
+            blobs = self._yml_blobs_cache[tree.hexsha] = {
+                blob.name: blob.hexsha
+                for blob in tree.blobs
+                if blob.name.endswith(YML_EXTENSION)
+            }
+        return blobs
+
+    def _get_blob_sha(self, tree: Optional[Tree], path: str) -> Optional[str]:
+        """Get the hash of a file in a tree, None if the file does not exist."""
+        if "/" not in path and path.endswith(YML_EXTENSION):
+            return self._get_yml_blobs(tree).get(path)
+        if tree is None:
+            return None
+        try:
+            return tree[path].hexsha
+        except KeyError:
+            return None
 
     @with_repo_path
     def is_file_modified(self, commit: str, path: PathLike) -> bool:
         with self._lock:
-            diff_index = self._repo.head.commit.diff(commit)
-            for diff in diff_index:
-                if diff.a_path == path or diff.b_path == path:
-                    return True
-            return False
+            path = Path(path).as_posix()
+            return self._get_blob_sha(
+                self._get_tree("HEAD"), path
+            ) != self._get_blob_sha(self._get_tree(commit), path)
 
     @with_repo_path
     def restore_file(self, file_names: str) -> None:
-        self._repo.index.checkout(paths=[file_names], force=True)
+        self._repo.index.checkout(paths=[self._to_repo_path(file_names)], force=True)
@@ -58,6 +58,10 @@ class Repository(ABC):
     def __exit__(self, exc_type, exc_val, exc_tb):
         self._lock.release()
 
+    def close(self) -> None:
+        """Release the resources held by the repository."""
+        pass
+
     @classmethod
     @abstractmethod
     def init(cls, path: PathLike) -> Repository:
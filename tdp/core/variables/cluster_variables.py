@@ -5,18 +5,23 @@ from __future__ import annotations
 
 import logging
 import os
+from collections import OrderedDict
 from collections.abc import Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from threading import RLock
 from typing import TYPE_CHECKING, Optional
 
 from tdp.core.constants import (
     DEFAULT_VALIDATION_MESSAGE,
+    MAX_OPEN_REPOSITORIES,
     VALIDATION_MESSAGE_FILE,
 )
 from tdp.core.exceptions import (
     ServiceVariablesNotInitializedError,
     ServiceVariablesNotInitializedErrorList,
 )
+from tdp.core.repository.git_mono_repository import GitMonoRepository
 from tdp.core.repository.git_repository import GitRepository
 from tdp.core.repository.repository import EmptyCommit, NoVersionYet, Repository
 from tdp.core.types import PathLike
@@ -29,29 +34,120 @@ from tdp.core.variables.service_variables import ServiceVariables
 
 if TYPE_CHECKING:
     from tdp.core.collections.collections import Collections
-    from tdp.core.repository.repository import Repository
+
 logger = logging.getLogger(__name__)
 
 
+def _detect_repository_class(tdp_vars: Path) -> type[Repository]:
+    """Get the repository class used by an existing tdp_vars directory.
+
+    A tdp_vars directory which is itself a Git repository holds the services of a
+    single repository, otherwise each service has its own repository.
+    """
+    if (tdp_vars / ".git").exists():
+        return GitMonoRepository
+    return GitRepository
+
+
+def _list_service_paths(tdp_vars: Path) -> dict[str, Path]:
+    """List the service directories of a tdp_vars directory."""
+    return {
+        path.name: path
+        for path in tdp_vars.iterdir()
+        if path.is_dir() and not path.name.startswith(".")
+    }
+
+
 class ClusterVariables(Mapping[str, ServiceVariables]):
-    """Mapping of service names to their ServiceVariables instances."""
+    """Mapping of service names to their ServiceVariables instances.
+
+    Service repositories given as paths are only opened on first access. At most
+    `max_open_repositories` repositories are kept open, the least recently used one
+    is closed when the limit is reached.
+    """
 
     def __init__(
         self,
         service_variables_dict: dict[str, ServiceVariables],
         collections: Collections,
+        *,
+        service_paths: Optional[dict[str, Path]] = None,
+        repository_class: type[Repository] = GitRepository,
+        max_open_repositories: int = MAX_OPEN_REPOSITORIES,
     ):
-        self._service_variables_dict = service_variables_dict
+        """Initialize a ClusterVariables object.
+
+        Args:
+            service_variables_dict: Already opened ServiceVariables by service name.
+            collections: Collections instance.
+            service_paths: Paths of the service repositories to open on first access.
+            repository_class: Repository class used to open the service repositories.
+            max_open_repositories: Maximum number of repositories kept open.
+        """
         self._collections = collections
+        self._repository_class = repository_class
+        self._max_open_repositories = max(max_open_repositories, 1)
+        self._service_paths = dict(service_paths or {})
+        self._service_paths.update(
+            {name: variables.path for name, variables in service_variables_dict.items()}
+        )
+        # Opened services, from the least to the most recently used
+        self._open_services: OrderedDict[str, ServiceVariables] = OrderedDict(
+            service_variables_dict
+        )
+        self._lock = RLock()
+        self._close_least_recently_used()
 
     def __getitem__(self, key):
-        return self._service_variables_dict.__getitem__(key)
+        with self._lock:
+            if (service_variables := self._open_services.get(key)) is not None:
+                self._open_services.move_to_end(key)
+                return service_variables
+            path = self._service_paths[key]
+            service_variables = ServiceVariables(
+                self._repository_class(path), self._collections.schemas.get(key)
+            )
+            self._open_services[key] = service_variables
+            self._close_least_recently_used()
+            return service_variables
+
+    def __contains__(self, key) -> bool:
+        return key in self._service_paths
 
     def __len__(self) -> int:
-        return self._service_variables_dict.__len__()
+        return self._service_paths.__len__()
 
     def __iter__(self):
-        return self._service_variables_dict.__iter__()
+        return self._service_paths.__iter__()
+
+    def _close_least_recently_used(self) -> None:
+        """Close repositories until the open repositories limit is respected."""
+        while len(self._open_services) > self._max_open_repositories:
+            _, service_variables = self._open_services.popitem(last=False)
+            service_variables.repository.close()
+
+    def close(self) -> None:
+        """Close all open service repositories."""
+        with self._lock:
+            while self._open_services:
+                _, service_variables = self._open_services.popitem(last=False)
+                service_variables.repository.close()
+
+    def get_unclean_services(self, max_workers: Optional[int] = None) -> list[str]:
+        """Get the name of the services whose repository is not clean.
+
+        Repositories are checked concurrently.
+
+        Args:
+            max_workers: Maximum number of repositories checked at once.
+
+        Returns:
+            Names of the unclean services, sorted.
+        """
+        names = list(self)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            cleanliness = executor.map(lambda name: self[name].clean, names)
+            return sorted(name for name, clean in zip(names, cleanliness) if not clean)
 
     @classmethod
     def initialize_cluster_variables(
@@ -60,10 +156,16 @@ class ClusterVariables(Mapping[str, ServiceVariables]):
         tdp_vars: PathLike,
         override_folders: Optional[Iterable[PathLike]] = None,
         validate: bool = False,
+        repository_class: Optional[type[Repository]] = None,
     ) -> ClusterVariables:
         """Initializes ClusterVariables at vars using the base vars from the collections and optional overrides.
 
         If a service already exists in the vars directory, it will not be re-initialized.
+
+        The repository class defaults to the one already used in the vars directory.
+
+        Raises:
+            ValueError: If the vars directory already uses another repository class.
         """
         tdp_vars = Path(tdp_vars)
         if not tdp_vars.exists():
@@ -74,7 +176,19 @@ class ClusterVariables(Mapping[str, ServiceVariables]):
             raise PermissionError(f"{tdp_vars} is not writable.")
         override_folders = override_folders or []
 
-        current = cls.get_cluster_variables(collections, tdp_vars)
+        current_repository_class = _detect_repository_class(tdp_vars)
+        if repository_class is None:
+            repository_class = current_repository_class
+        elif repository_class is not current_repository_class and _list_service_paths(
+            tdp_vars
+        ):
+            raise ValueError(
+                f"{tdp_vars} is already initialized with "
+                f"{current_repository_class.__name__}."
+            )
+        current = cls.get_cluster_variables(
+            collections, tdp_vars, repository_class=current_repository_class
+        )
         new_variables: dict[str, ServiceVariables] = {}
 
         validation_builder = ValidationMessageBuilder(collections)
@@ -99,6 +213,7 @@ class ClusterVariables(Mapping[str, ServiceVariables]):
                 service_name,
                 ServiceVariables.from_path(
                     tdp_vars / service_name,
+                    repository_class=repository_class,
                     schema=collections.schemas.get(service_name),
                 ),
             )
@@ -114,7 +229,7 @@ class ClusterVariables(Mapping[str, ServiceVariables]):
                 logger.info(f"No change detected for {service_name}.")
                 pass
 
-        result = cls(new_variables, collections)
+        result = cls(new_variables, collections, repository_class=repository_class)
         if validate:
             result._validate_services_schemas()
         return result
@@ -123,20 +238,21 @@ class ClusterVariables(Mapping[str, ServiceVariables]):
     def get_cluster_variables(
         collections: Collections,
         tdp_vars: PathLike,
-        repository_class: type[Repository] = GitRepository,
+        repository_class: Optional[type[Repository]] = None,
         validate=False,
     ):
-        """Load all existing ServiceVariables from the given tdp_vars directory."""
-        cluster_variables = {}
+        """Load all existing ServiceVariables from the given tdp_vars directory.
 
+        Service repositories are opened on first access. The repository class
+        defaults to the one used in the tdp_vars directory.
+        """
         tdp_vars = Path(tdp_vars)
-        for path in tdp_vars.iterdir():
-            if path.is_dir():
-                repo = repository_class(tdp_vars / path.name)
-                schemas = collections.schemas.get(path.stem)
-                cluster_variables[path.name] = ServiceVariables(repo, schemas)
-
-        cluster_variables = ClusterVariables(cluster_variables, collections=collections)
+        cluster_variables = ClusterVariables(
+            {},
+            collections=collections,
+            service_paths=_list_service_paths(tdp_vars),
+            repository_class=repository_class or _detect_repository_class(tdp_vars),
+        )
 
         if validate:
             cluster_variables._validate_services_schemas()
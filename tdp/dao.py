@@ -1,38 +1,59 @@
 # Copyright 2022 TOSIT.IO
 # SPDX-License-Identifier: Apache-2.0
 
-from typing import Iterable, NamedTuple, Optional
-
-from sqlalchemy import Engine, Select, and_, case, desc, func, or_, select
-from sqlalchemy.orm import aliased, sessionmaker
+import base64
+import json
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Any, Iterable, NamedTuple, Optional
+
+from sqlalchemy import (
+    Engine,
+    Row,
+    Select,
+    and_,
+    bindparam,
+    delete,
+    desc,
+    func,
+    insert,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.orm import load_only, raiseload, sessionmaker
 
 from tdp.core.cluster_status import ClusterStatus
 from tdp.core.entities.entity_name import create_entity_name
 from tdp.core.entities.hosted_entity import create_hosted_entity
 from tdp.core.entities.hosted_entity_status import HostedEntityStatus
+from tdp.core.models.base_model import BaseModel
 from tdp.core.models.deployment_model import DeploymentModel
+from tdp.core.models.enums import OperationStateEnum, SCHStatusLogSourceEnum
 from tdp.core.models.operation_model import OperationModel
+from tdp.core.models.sch_latest_status_model import (
+    SCHLatestStatusModel,
+    rebuild_sch_latest_status,
+    update_sch_latest_status,
+)
+from tdp.core.models.sch_status_log_compaction import compact_sch_status_logs
 from tdp.core.models.sch_status_log_model import SCHStatusLogModel
-
-
-def _create_last_value_statement(column, non_null=False):
-    """Create a windowed query that returns last value of a column.
-
-    Args:
-        column: The column to return the last value of.
-        non_null: Whether to return the last non-null value.
-    """
-    order_by = SCHStatusLogModel.event_time.desc()
-    if non_null:
-        order_by = case((column == None, 0), else_=1).desc(), order_by
-    return func.first_value(column).over(
-        partition_by=(
-            SCHStatusLogModel.service,
-            SCHStatusLogModel.component,
-            SCHStatusLogModel.host,
-        ),
-        order_by=order_by,
-    )
+from tdp.core.types import PathLike
+
+# Columns of the deployments loaded to list them
+DEPLOYMENT_SUMMARY_COLUMNS = (
+    "id",
+    "state",
+    "deployment_type",
+    "start_time",
+    "end_time",
+    "operation_count",
+    "failed_operation_count",
+    "host_count",
+    "total_duration",
+    "last_operation",
+)
 
 
 class SCHLatestStatus(NamedTuple):
@@ -45,13 +66,59 @@ class SCHLatestStatus(NamedTuple):
     latest_to_restart: Optional[bool]
 
 
+class SCHStatusLogRow(NamedTuple):
+    """Read-only status log."""
+
+    id: int
+    event_time: datetime
+    service: str
+    component: Optional[str]
+    host: Optional[str]
+    running_version: Optional[str]
+    configured_version: Optional[str]
+    to_config: Optional[bool]
+    to_restart: Optional[bool]
+    source: SCHStatusLogSourceEnum
+    deployment_id: Optional[int]
+    message: Optional[str]
+
+    @property
+    def cursor(self) -> str:
+        """Cursor to get the status logs following this one in the history."""
+        return encode_history_cursor(self.event_time, self.id)
+
+
+def encode_history_cursor(event_time: datetime, id: int) -> str:
+    """Encode the position of a status log in the history as a cursor token."""
+    return (
+        base64.urlsafe_b64encode(json.dumps([event_time.isoformat(), id]).encode())
+        .decode()
+        .rstrip("=")
+    )
+
+
+def decode_history_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor token into the event time and id of a status log.
+
+    Raises:
+        ValueError: If the cursor is not valid.
+    """
+    try:
+        event_time, id = json.loads(
+            base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        )
+        return datetime.fromisoformat(event_time), int(id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid history cursor: {cursor}") from e
+
+
 def _create_get_sch_latest_status_statement(
     service_to_filter: Optional[str] = None,
     component_to_filter: Optional[str] = None,
     hosts_to_filter: Optional[Iterable[str]] = None,
     filter_stale: Optional[bool] = None,
 ) -> Select[SCHLatestStatus]:
-    """Create a query to get the cluster status.
+    """Create a query to get the cluster status from the latest status table.
 
     Args:
         service_to_filter: The service to filter.
@@ -60,54 +127,246 @@ def _create_get_sch_latest_status_statement(
         filter_stale: Whether to filter stale status.
           True for stale, False for not stale, None for all.
     """
-    subquery_filter = []
+    query_filter = []
     if service_to_filter:
-        subquery_filter.append(SCHStatusLogModel.service == service_to_filter)
+        query_filter.append(SCHLatestStatusModel.service == service_to_filter)
     if component_to_filter:
-        subquery_filter.append(SCHStatusLogModel.component == component_to_filter)
+        query_filter.append(SCHLatestStatusModel.component == component_to_filter)
     if hosts_to_filter:
-        subquery_filter.append(SCHStatusLogModel.host.in_(hosts_to_filter))
+        query_filter.append(SCHLatestStatusModel.host.in_(hosts_to_filter))
 
-    subq = (
-        select(
-            SCHStatusLogModel.service,
-            SCHStatusLogModel.component,
-            SCHStatusLogModel.host,
-            _create_last_value_statement(
-                SCHStatusLogModel.running_version, non_null=True
-            ).label("latest_running_version"),
-            _create_last_value_statement(
-                SCHStatusLogModel.configured_version, non_null=True
-            ).label("latest_configured_version"),
-            _create_last_value_statement(
-                SCHStatusLogModel.to_config, non_null=True
-            ).label("latest_to_config"),
-            _create_last_value_statement(
-                SCHStatusLogModel.to_restart, non_null=True
-            ).label("latest_to_restart"),
+    if filter_stale is True:
+        query_filter.append(
+            or_(
+                SCHLatestStatusModel.to_config.is_(True),
+                SCHLatestStatusModel.to_restart.is_(True),
+            )
+        )
+    elif filter_stale is False:
+        query_filter.append(
+            and_(
+                SCHLatestStatusModel.to_config.is_not(True),
+                SCHLatestStatusModel.to_restart.is_not(True),
+            )
         )
-        .filter(*subquery_filter)
-        .distinct()
-        .subquery()
-    )
 
+    return select(
+        SCHLatestStatusModel.service,
+        SCHLatestStatusModel.component,
+        SCHLatestStatusModel.host,
+        SCHLatestStatusModel.running_version.label("latest_running_version"),
+        SCHLatestStatusModel.configured_version.label("latest_configured_version"),
+        SCHLatestStatusModel.to_config.label("latest_to_config"),
+        SCHLatestStatusModel.to_restart.label("latest_to_restart"),
+    ).filter(*query_filter)
+
+
+def _create_get_sch_status_log_history_statement(
+    limit: Optional[int] = None,
+    service_to_filter: Optional[str] = None,
+    component_to_filter: Optional[str] = None,
+    hosts_to_filter: Optional[Iterable[str]] = None,
+    filter_stale: Optional[bool] = None,
+    cursor: Optional[str] = None,
+) -> Select:
+    """Create a query to get the status logs, from the most recent.
+
+    Args:
+        limit: Maximum number of logs to return, all if None.
+        service_to_filter: The service to filter.
+        component_to_filter: The component to filter.
+        hosts_to_filter: The hosts to filter.
+        filter_stale: Whether to filter stale status.
+          True for stale, False for not stale, None for all.
+        cursor: Cursor of the log preceding the logs to return.
+
+    Raises:
+        ValueError: If the cursor is not valid.
+    """
     query_filter = []
+    if service_to_filter:
+        query_filter.append(SCHStatusLogModel.service == service_to_filter)
+    if component_to_filter:
+        query_filter.append(SCHStatusLogModel.component == component_to_filter)
+    if hosts_to_filter:
+        query_filter.append(SCHStatusLogModel.host.in_(hosts_to_filter))
+
     if filter_stale is True:
         query_filter.append(
             or_(
-                subq.c.latest_to_config.is_(True),
-                subq.c.latest_to_restart.is_(True),
+                SCHStatusLogModel.to_config.is_(True),
+                SCHStatusLogModel.to_restart.is_(True),
             )
         )
     elif filter_stale is False:
         query_filter.append(
             and_(
-                subq.c.latest_to_config.is_not(True),
-                subq.c.latest_to_restart.is_not(True),
+                SCHStatusLogModel.to_config.is_not(True),
+                SCHStatusLogModel.to_restart.is_not(True),
+            )
+        )
+
+    if cursor:
+        query_filter.append(
+            tuple_(SCHStatusLogModel.event_time, SCHStatusLogModel.id)
+            < decode_history_cursor(cursor)
+        )
+
+    return (
+        select(
+            *[getattr(SCHStatusLogModel, field) for field in SCHStatusLogRow._fields]
+        )
+        .filter(*query_filter)
+        .order_by(desc(SCHStatusLogModel.event_time), desc(SCHStatusLogModel.id))
+        .limit(limit)
+    )
+
+
+def _create_get_operations_by_name_statement(
+    deployment_id: int, operation_name: str
+) -> Select[tuple[OperationModel]]:
+    """Create a query to get the operations of a deployment from their name."""
+    return select(OperationModel).filter_by(
+        deployment_id=deployment_id, operation=operation_name
+    )
+
+
+def _create_get_operation_statement(
+    deployment_id: int, operation_order: int
+) -> Select[tuple[OperationModel]]:
+    """Create a query to get an operation from its deployment and order."""
+    return select(OperationModel).filter_by(
+        deployment_id=deployment_id, operation_order=operation_order
+    )
+
+
+def _create_get_last_operation_runs_statement(
+    operation_names: Iterable[str],
+) -> Select[tuple[str, Optional[str], OperationStateEnum, Optional[str]]]:
+    """Create a query to get the last ended run of each operation and host."""
+    ended_runs = (
+        select(
+            OperationModel.operation,
+            OperationModel.host,
+            OperationModel.state,
+            OperationModel.fingerprint,
+            func.row_number()
+            .over(
+                partition_by=(OperationModel.operation, OperationModel.host),
+                order_by=(
+                    OperationModel.deployment_id.desc(),
+                    OperationModel.operation_order.desc(),
+                ),
             )
+            .label("run_rank"),
+        )
+        .where(
+            OperationModel.operation.in_(list(operation_names)),
+            OperationModel.state.in_(
+                [OperationStateEnum.SUCCESS, OperationStateEnum.FAILURE]
+            ),
+        )
+        .subquery()
+    )
+    return select(
+        ended_runs.c.operation,
+        ended_runs.c.host,
+        ended_runs.c.state,
+        ended_runs.c.fingerprint,
+    ).where(ended_runs.c.run_rank == 1)
+
+
+def _create_get_planned_deployment_statement() -> Select[tuple[DeploymentModel]]:
+    """Create a query to get the planned deployment."""
+    return select(DeploymentModel).filter_by(state="PLANNED")
+
+
+def _create_get_last_deployment_statement() -> Select[tuple[DeploymentModel]]:
+    """Create a query to get the last deployment."""
+    return select(DeploymentModel).order_by(desc(DeploymentModel.id)).limit(1)
+
+
+def _create_get_last_deployments_statement(
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
+    columns: Optional[Iterable[str]] = None,
+) -> Select[tuple[DeploymentModel]]:
+    """Create a query to get the last deployments in ascending order.
+
+    Args:
+        limit: The maximum number of deployments to return.
+        offset: The number of deployments to skip.
+        columns: The only columns to load, accessing the other columns or the
+          relationships raises. All the columns if None.
+    """
+    # Get the last deployments (in descending order).
+    reversed_deployments_query = select(DeploymentModel.id).order_by(
+        desc(DeploymentModel.id)
+    )
+    # Apply limit and offset.
+    if limit is not None:
+        reversed_deployments_query = reversed_deployments_query.limit(limit)
+    if offset is not None:
+        reversed_deployments_query = reversed_deployments_query.offset(offset)
+    reversed_deployments = reversed_deployments_query.subquery()
+    # Return the deployments in ascending order, joined rather than aliased to the
+    # subquery so that their columns are loaded along with them.
+    stmt = (
+        select(DeploymentModel)
+        .join(reversed_deployments, DeploymentModel.id == reversed_deployments.c.id)
+        .order_by(DeploymentModel.id)
+    )
+    if columns is not None:
+        stmt = stmt.options(
+            load_only(
+                *[getattr(DeploymentModel, column) for column in columns],
+                raiseload=True,
+            ),
+            raiseload("*"),
         )
+    return stmt
+
+
+def _create_hosted_entity_status(status: Row) -> HostedEntityStatus:
+    """Create a hosted entity status from a row of the latest status query."""
+    return HostedEntityStatus(
+        entity=create_hosted_entity(
+            name=create_entity_name(
+                service_name=status.service, component_name=status.component
+            ),
+            host=status.host,
+        ),
+        running_version=status.latest_running_version,
+        configured_version=status.latest_configured_version,
+        to_config=(
+            bool(status.latest_to_config)
+            if status.latest_to_config is not None
+            else None
+        ),
+        to_restart=(
+            bool(status.latest_to_restart)
+            if status.latest_to_restart is not None
+            else None
+        ),
+    )
+
+
+def _get_column_values(model: BaseModel, exclude: Iterable[str] = ()) -> dict[str, Any]:
+    """Get the column values of a model instance, for a Core statement."""
+    return {
+        column.key: getattr(model, column.key)
+        for column in model.__table__.columns
+        if column.key not in exclude
+    }
 
-    return select(subq).filter(*query_filter)
+
+def get_status_log_values(status_log: SCHStatusLogModel) -> dict[str, Any]:
+    """Get the column values of a status log to insert, the event time defaults to
+    now."""
+    values = _get_column_values(status_log, exclude=["id"])
+    if values["event_time"] is None:
+        values["event_time"] = datetime.utcnow()
+    return values
 
 
 class Dao:
@@ -161,76 +420,246 @@ class Dao:
             filter_stale=filter_stale,
         )
         return [
-            HostedEntityStatus(
-                entity=create_hosted_entity(
-                    name=create_entity_name(
-                        service_name=status.service, component_name=status.component
-                    ),
-                    host=status.host,
-                ),
-                running_version=status.latest_running_version,
-                configured_version=status.latest_configured_version,
-                to_config=(
-                    bool(status.latest_to_config)
-                    if status.latest_to_config is not None
-                    else None
-                ),
-                to_restart=(
-                    bool(status.latest_to_restart)
-                    if status.latest_to_restart is not None
-                    else None
-                ),
-            )
+            _create_hosted_entity_status(status)
             for status in self.session.execute(stmt).all()
         ]
 
+    def add_status_logs(self, status_logs: Iterable[SCHStatusLogModel]) -> None:
+        """Insert status logs in bulk.
+
+        Bypasses the ORM unit of work: the status logs are inserted with a single
+        executemany statement and the latest statuses are updated in the same
+        transaction.
+
+        Args:
+            status_logs: Status logs to insert, not added to the session.
+        """
+        self._check_session()
+        self._insert_status_logs(
+            [get_status_log_values(status_log) for status_log in status_logs]
+        )
+
+    def _insert_status_logs(self, values: list[dict[str, Any]]) -> None:
+        """Insert status logs from their column values."""
+        if not values:
+            return
+        connection = self.session.connection()
+        connection.execute(insert(SCHStatusLogModel.__table__), values)
+        update_sch_latest_status(connection, values)
+
+    def update_deployment_progress(
+        self,
+        deployment_id: int,
+        deployment_values: Optional[dict[str, Any]] = None,
+        operations_values: Iterable[dict[str, Any]] = (),
+        status_logs_values: Iterable[dict[str, Any]] = (),
+    ) -> None:
+        """Write the progress of a running deployment in bulk.
+
+        Args:
+            deployment_id: Deployment id.
+            deployment_values: Column values of the deployment to update.
+            operations_values: Column values of the operations to update, including
+              their `operation_order`.
+            status_logs_values: Column values of the status logs to insert.
+        """
+        self._check_session()
+        connection = self.session.connection()
+        if deployment_values:
+            connection.execute(
+                update(DeploymentModel.__table__)
+                .where(DeploymentModel.__table__.c.id == deployment_id)
+                .values(deployment_values)
+            )
+        # Operations are updated by groups of operations with the same columns
+        operations_by_columns: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        for values in operations_values:
+            columns = tuple(column for column in values if column != "operation_order")
+            operations_by_columns.setdefault(columns, []).append(values)
+        operation_table = OperationModel.__table__
+        for columns, values_group in operations_by_columns.items():
+            connection.execute(
+                update(operation_table)
+                .where(
+                    operation_table.c.deployment_id == deployment_id,
+                    operation_table.c.operation_order == bindparam("order"),
+                )
+                .values({column: bindparam(f"new_{column}") for column in columns}),
+                [
+                    {
+                        "order": values["operation_order"],
+                        **{f"new_{column}": values[column] for column in columns},
+                    }
+                    for values in values_group
+                ],
+            )
+        self._insert_status_logs(list(status_logs_values))
+
+    def add_deployment(self, deployment: DeploymentModel) -> None:
+        """Insert a deployment and its operations in bulk.
+
+        If the deployment id is the one of an existing deployment (e.g. a planned
+        deployment being replaced), the existing deployment and its operations are
+        replaced.
+
+        Args:
+            deployment: Deployment to insert, not added to the session. Its id is set
+              once inserted.
+        """
+        self._check_session()
+        connection = self.session.connection()
+        deployment_table = DeploymentModel.__table__
+        operation_table = OperationModel.__table__
+        deployment.summarize_operations()
+        values = _get_column_values(deployment, exclude=["id"])
+        if (
+            deployment.id is not None
+            and connection.execute(
+                select(deployment_table.c.id).where(
+                    deployment_table.c.id == deployment.id
+                )
+            ).first()
+            is not None
+        ):
+            connection.execute(
+                delete(operation_table).where(
+                    operation_table.c.deployment_id == deployment.id
+                )
+            )
+            connection.execute(
+                update(deployment_table)
+                .where(deployment_table.c.id == deployment.id)
+                .values(values)
+            )
+        else:
+            if deployment.id is not None:
+                values["id"] = deployment.id
+            result = connection.execute(insert(deployment_table).values(values))
+            deployment.id = result.inserted_primary_key[0]
+        operations_values = [
+            {
+                **_get_column_values(operation, exclude=["deployment_id"]),
+                "deployment_id": deployment.id,
+            }
+            for operation in deployment.operations
+        ]
+        if operations_values:
+            connection.execute(insert(operation_table), operations_values)
+
+    def rebuild_hosted_entity_statuses(self) -> None:
+        """Rebuild the latest status of the hosted entities from the status logs.
+
+        Only needed if status logs were written without going through tdp-lib.
+        """
+        self._check_session()
+        rebuild_sch_latest_status(self.session.connection())
+
+    def compact_status_logs(
+        self,
+        *,
+        before: Optional[datetime] = None,
+        deployment_id: Optional[int] = None,
+        archive: Optional[PathLike] = None,
+    ) -> int:
+        """Fold the old status logs into one snapshot log per hosted entity.
+
+        Snapshot logs keep the latest non-null values of the folded logs, the latest
+        status of the hosted entities is unchanged.
+
+        Args:
+            before: Logs whose event time is not after this date are folded.
+            deployment_id: Logs up to the end of this deployment are folded.
+            archive: Path of a gzip compressed JSON lines file to write the folded
+              logs to, not archived if None.
+
+        Returns:
+            Number of folded logs.
+
+        Raises:
+            ValueError: If not exactly one of `before` and `deployment_id` is given,
+              or if the deployment is not found or not ended.
+        """
+        self._check_session()
+        if (before is None) == (deployment_id is None):
+            raise ValueError("Either a date or a deployment id must be given.")
+        if deployment_id is not None:
+            deployment = self.get_deployment(deployment_id)
+            if deployment is None:
+                raise ValueError(f"Deployment {deployment_id} does not exist.")
+            if deployment.end_time is None:
+                raise ValueError(f"Deployment {deployment_id} is not ended.")
+            before = deployment.end_time
+        return compact_sch_status_logs(
+            self.session.connection(), before, archive=archive
+        )
+
     def get_hosted_entity_statuses_history(
         self,
-        limit,
+        limit: Optional[int] = None,
         service: Optional[str] = None,
         component: Optional[str] = None,
         hosts: Optional[Iterable[str]] = None,
         filter_stale: Optional[bool] = None,
-    ) -> list[SCHStatusLogModel]:
-        """Get the status of the hosted entities.
+        *,
+        cursor: Optional[str] = None,
+    ) -> list[SCHStatusLogRow]:
+        """Get the status logs of the hosted entities, from the most recent.
+
+        Logs are ordered by event time and id, the `cursor` of the last log of a
+        page gives the next page. See `iter_hosted_entity_statuses_history` to
+        stream them.
 
         Args:
-            limit: limits the rows to display
+            limit: Maximum number of logs to return, all if None.
             service: Service to filter.
             component: Component to filter.
             hosts: Hosts to filter.
             filter_stale: Whether to filter stale statuses.
+            cursor: Cursor of the log preceding the logs to return.
+
+        Raises:
+            ValueError: If the cursor is not valid.
         """
-        self._check_session()
-        query_filter = []
-        if service:
-            query_filter.append(SCHStatusLogModel.service == service)
-        if component:
-            query_filter.append(SCHStatusLogModel.component == component)
-        if hosts:
-            query_filter.append(SCHStatusLogModel.host.in_(hosts))
-
-        if filter_stale is True:
-            query_filter.append(
-                or_(
-                    SCHStatusLogModel.to_config.is_(True),
-                    SCHStatusLogModel.to_restart.is_(True),
-                )
+        return list(
+            self.iter_hosted_entity_statuses_history(
+                limit, service, component, hosts, filter_stale, cursor=cursor
             )
-        elif filter_stale is False:
-            query_filter.append(
-                and_(
-                    SCHStatusLogModel.to_config.is_not(True),
-                    SCHStatusLogModel.to_restart.is_not(True),
-                )
-            )
-        return (
-            self.session.query(SCHStatusLogModel)
-            .filter(*query_filter)
-            .limit(limit)
-            .all()
         )
 
+    def iter_hosted_entity_statuses_history(
+        self,
+        limit: Optional[int] = None,
+        service: Optional[str] = None,
+        component: Optional[str] = None,
+        hosts: Optional[Iterable[str]] = None,
+        filter_stale: Optional[bool] = None,
+        *,
+        cursor: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[SCHStatusLogRow]:
+        """Stream the status logs of the hosted entities, from the most recent.
+
+        Same as `get_hosted_entity_statuses_history`, the logs are fetched from
+        the database by batches while iterating, which must be done before the
+        session is closed.
+
+        Args:
+            batch_size: Number of logs fetched at once.
+
+        Raises:
+            ValueError: If the cursor is not valid.
+        """
+        self._check_session()
+        stmt = _create_get_sch_status_log_history_statement(
+            limit=limit,
+            service_to_filter=service,
+            component_to_filter=component,
+            hosts_to_filter=hosts,
+            filter_stale=filter_stale,
+            cursor=cursor,
+        ).execution_options(yield_per=batch_size)
+        return (SCHStatusLogRow(*row) for row in self.session.execute(stmt))
+
     def get_deployment(self, id: int) -> Optional[DeploymentModel]:
         """Get a deployment by ID.
 
@@ -249,10 +678,11 @@ class Dao:
             deployment_id: The deployment ID.
             operation_name: The operation name.
         """
-        return (
-            self.session.query(OperationModel)
-            .filter_by(deployment_id=deployment_id, operation=operation_name)
-            .all()
+        self._check_session()
+        return list(
+            self.session.scalars(
+                _create_get_operations_by_name_statement(deployment_id, operation_name)
+            )
         )
 
     def get_operation(
@@ -264,26 +694,43 @@ class Dao:
             deployment_id: The deployment ID.
             operation_order: The operation order.
         """
-        return (
-            self.session.query(OperationModel)
-            .filter_by(deployment_id=deployment_id, operation_order=operation_order)
-            .one_or_none()
-        )
+        self._check_session()
+        return self.session.scalars(
+            _create_get_operation_statement(deployment_id, operation_order)
+        ).one_or_none()
+
+    def get_last_operation_fingerprints(
+        self, operation_names: Iterable[str]
+    ) -> dict[tuple[str, Optional[str]], Optional[str]]:
+        """Get the fingerprint of the last run of operations.
+
+        Args:
+            operation_names: Names of the operations.
+
+        Returns:
+            Fingerprint of the last run of each operation and host (None for runs
+            on all the hosts), None if the last run failed or has no fingerprint.
+        """
+        self._check_session()
+        return {
+            (operation, host): (
+                fingerprint if state == OperationStateEnum.SUCCESS else None
+            )
+            for operation, host, state, fingerprint in self.session.execute(
+                _create_get_last_operation_runs_statement(operation_names)
+            )
+        }
 
     def get_planned_deployment(self) -> Optional[DeploymentModel]:
         self._check_session()
-        return (
-            self.session.query(DeploymentModel).filter_by(state="PLANNED").one_or_none()
-        )
+        return self.session.scalars(
+            _create_get_planned_deployment_statement()
+        ).one_or_none()
 
     def get_last_deployment(self) -> Optional[DeploymentModel]:
         """Get the last deployment."""
         self._check_session()
-        return (
-            self.session.query(DeploymentModel)
-            .order_by(desc(DeploymentModel.id))
-            .first()
-        )
+        return self.session.scalars(_create_get_last_deployment_statement()).first()
 
     def get_last_deployments(
         self, limit: Optional[int] = None, offset: Optional[int] = None
@@ -304,22 +751,27 @@ class Dao:
         """
         self._check_session()
 
-        # Get the last deployments (in descending order).
-        reversed_deployments_query = self.session.query(DeploymentModel.id).order_by(
-            desc(DeploymentModel.id)
-        )
-        # Apply limit and offset.
-        if limit is not None:
-            reversed_deployments_query = reversed_deployments_query.limit(limit)
-        if offset is not None:
-            reversed_deployments_query = reversed_deployments_query.offset(offset)
-        # Alias the subquery for convenience.
-        reversed_deployments = aliased(
-            DeploymentModel, reversed_deployments_query.subquery()
+        return list(
+            self.session.scalars(_create_get_last_deployments_statement(limit, offset))
         )
-        # Return the deployments in ascending order.
-        return (
-            self.session.query(reversed_deployments)
-            .order_by(reversed_deployments.id)
-            .all()
+
+    def get_last_deployment_summaries(
+        self, limit: Optional[int] = None, offset: Optional[int] = None
+    ) -> list[DeploymentModel]:
+        """Get the summary of the last deployments in ascending order.
+
+        Only the `DEPLOYMENT_SUMMARY_COLUMNS` are loaded, neither the options nor the
+        operations of the deployments.
+
+        Args:
+            limit: The maximum number of deployments to return.
+            offset: The number of deployments to skip.
+        """
+        self._check_session()
+        return list(
+            self.session.scalars(
+                _create_get_last_deployments_statement(
+                    limit, offset, columns=DEPLOYMENT_SUMMARY_COLUMNS
+                )
+            )
         )
@@ -1,15 +1,20 @@
 # Copyright 2022 TOSIT.IO
 # SPDX-License-Identifier: Apache-2.0
 
+import pytest
 from click.testing import CliRunner
+from sqlalchemy import create_engine
 
 from tdp.cli.commands.deploy import deploy
 from tdp.cli.commands.plan.dag import dag
+from tdp.dao import Dao
 from tests.e2e.conftest import TDPInitArgs
 
 
+@pytest.mark.parametrize("parallel", ["1", "4"])
 def test_tdp_deploy_mock(
     tdp_init: TDPInitArgs,
+    parallel: str,
 ):
     runner = CliRunner()
     result = runner.invoke(
@@ -32,6 +37,35 @@ def test_tdp_deploy_mock(
             "--vars",
             str(tdp_init.vars),
             "--mock-deploy",
+            "--parallel",
+            parallel,
         ],
     )
     assert result.exit_code == 0, result.output
+
+
+def test_tdp_deploy_skip_unchanged(tdp_init: TDPInitArgs):
+    runner = CliRunner()
+    base_args = [
+        "--collection-path",
+        str(tdp_init.collection_path),
+        "--database-dsn",
+        tdp_init.db_dsn,
+    ]
+    deploy_args = [*base_args, "--vars", str(tdp_init.vars), "--mock-deploy"]
+    for args in ([], ["--skip-unchanged"]):
+        result = runner.invoke(dag, base_args)
+        assert result.exit_code == 0, result.output
+        result = runner.invoke(deploy, [*deploy_args, *args])
+        assert result.exit_code == 0, result.output
+
+    engine = create_engine(tdp_init.db_dsn)
+    with Dao(engine) as dao:
+        operations = dao.get_last_deployment().operations
+        skipped = [
+            operation.operation
+            for operation in operations
+            if operation.logs and operation.logs.startswith(b"Skipped")
+        ]
+    engine.dispose()
+    assert skipped == ["service_install", "service_config"]
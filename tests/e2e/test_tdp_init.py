@@ -23,3 +23,27 @@ def test_tdp_init_db_is_created(collection_path: Path, vars: Path, tmp_path: Pat
     result = runner.invoke(init, args)
     assert os.path.exists(db_path) == True
     assert result.exit_code == 0, result.output
+
+
+def test_tdp_init_single_vars_repository(
+    collection_path: Path, vars: Path, tmp_path: Path
+):
+    args = [
+        "--collection-path",
+        str(collection_path),
+        "--database-dsn",
+        "sqlite:///" + str(tmp_path / "sqlite.db"),
+        "--vars",
+        str(vars),
+        "--vars-repository",
+        "single",
+    ]
+    runner = CliRunner()
+    result = runner.invoke(init, args)
+    assert result.exit_code == 0, result.output
+    assert (vars / ".git").is_dir()
+    # Initializing again detects the existing repository
+    result = runner.invoke(init, args[:-2])
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(init, args[:-1] + ["per-service"])
+    assert result.exit_code != 0
@@ -0,0 +1,28 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+
+from click.testing import CliRunner
+
+from tdp.cli.commands.status.compact import compact
+from tests.e2e.conftest import TDPInitArgs
+
+
+def test_tdp_status_compact(tdp_init: TDPInitArgs, tmp_path):
+    runner = CliRunner()
+    args = ["--database-dsn", tdp_init.db_dsn]
+    result = runner.invoke(compact, args)
+    assert result.exit_code == 2, result.output
+    result = runner.invoke(
+        compact,
+        [
+            *args,
+            "--before",
+            "2100-01-01",
+            "--archive",
+            str(tmp_path / "archive.jsonl.gz"),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(compact, [*args, "--deployment-id", "42"])
+    assert result.exit_code == 1, result.output
@@ -24,3 +24,22 @@ def test_tdp_status_edit(
         ],
     )
     assert result.exit_code == 0, result.output
+
+
+def test_tdp_status_show_history(
+    tdp_init: TDPInitArgs,
+):
+    runner = CliRunner()
+    args = [
+        "--collection-path",
+        str(tdp_init.collection_path),
+        "--database-dsn",
+        tdp_init.db_dsn,
+        "--vars",
+        str(tdp_init.vars),
+        "--history",
+    ]
+    result = runner.invoke(show, args)
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(show, [*args, "--cursor", "invalid"])
+    assert result.exit_code == 2, result.output
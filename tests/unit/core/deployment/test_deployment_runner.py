@@ -3,27 +3,33 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 from typing import TYPE_CHECKING, Optional
 
 import pytest
 
-from tdp.core.deployment.deployment_runner import DeploymentRunner
+from tdp.core.cluster_status import ClusterStatus
+from tdp.core.collections import Collections
+from tdp.core.deployment.deployment_runner import (
+    DeploymentRunner,
+    get_collection_hash,
+)
 from tdp.core.deployment.executor import Executor
 from tdp.core.models import (
     DeploymentModel,
+    OperationModel,
 )
 from tdp.core.models.enums import (
     DeploymentStateEnum,
     DeploymentTypeEnum,
     OperationStateEnum,
 )
+from tdp.core.variables import ClusterVariables
+from tests.conftest import generate_collection_at_path
 
 if TYPE_CHECKING:
-    from tdp.core.cluster_status import ClusterStatus
-    from tdp.core.collections import Collections
     from tdp.core.dag import Dag
-    from tdp.core.variables import ClusterVariables
+    from tdp.core.inventory_reader import InventoryReader
 
 
 class MockExecutor(Executor):
@@ -56,6 +62,17 @@ class FailingExecutor(MockExecutor):
         return super().execute(playbook, host, extra_vars)
 
 
+class CountingExecutor(MockExecutor):
+    """Mock executor recording the executed playbooks."""
+
+    def __init__(self):
+        self.playbooks = []
+
+    def execute(self, playbook, host=None, extra_vars=None):
+        self.playbooks.append(playbook.stem)
+        return super().execute(playbook, host, extra_vars)
+
+
 @pytest.fixture
 def mock_deployment_runner(
     mock_collections: Collections,
@@ -151,6 +168,11 @@ def test_failed_operation_stops(
             process_operation_fn()
     assert deployment_iterator.deployment.state == DeploymentStateEnum.FAILURE
     assert len(deployment_iterator.deployment.operations) == 8
+    # Summary of the operations
+    assert deployment.operation_count == 8
+    assert deployment.failed_operation_count == 1
+    assert deployment.last_operation == deployment.operations[1].operation
+    assert deployment.total_duration >= 0
 
 
 def test_service_log_is_emitted(
@@ -347,3 +369,382 @@ def test_deployment_reconfigure_is_resumed(
     # ) - deployment_iterator.deployment_log.operations.index(failed_operation) == len(
     #     resume_deployment_iterator.deployment_log.operations
     # )
+
+
+def test_service_versions_are_snapshotted(
+    mock_dag: Dag,
+    mock_deployment_runner: DeploymentRunner,
+    mock_cluster_variables: ClusterVariables,
+    mock_cluster_status: ClusterStatus,
+):
+    """Status updates use the versions captured when the deployment starts."""
+    version = mock_cluster_variables["serv"].version
+    deployment = DeploymentModel.from_dag(mock_dag, targets=["serv_init"])
+    deployment_iterator = mock_deployment_runner.run(deployment)
+
+    assert deployment.options["service_versions"] == {"serv": version}
+
+    # Changes made during the deployment are not taken into account
+    with mock_cluster_variables["serv"].open_files(
+        ["serv.yml"], validation_message="update during deployment"
+    ) as files:
+        files["serv.yml"].merge({"key": "updated"})
+    assert mock_cluster_variables["serv"].version != version
+
+    for op, process_operation_fn in deployment_iterator:
+        if process_operation_fn:
+            process_operation_fn()
+
+    assert deployment_iterator.deployment.state == DeploymentStateEnum.SUCCESS
+    assert {status.configured_version for status in mock_cluster_status.values()} == {
+        version
+    }
+
+
+class CoalescingExecutor(MockExecutor):
+    """Mock executor recording the hosts of each execution."""
+
+    def __init__(self):
+        self.executions: list[tuple[str, list[Optional[str]]]] = []
+
+    def execute(
+        self,
+        playbook: str,
+        host: Optional[str] = None,
+        extra_vars: Optional[Iterable[str]] = None,
+    ):
+        self.executions.append((playbook.stem, [host]))
+        return super().execute(playbook, host, extra_vars)
+
+    def execute_hosts(
+        self,
+        playbook: str,
+        hosts: Sequence[str],
+        extra_vars: Optional[Iterable[str]] = None,
+    ):
+        self.executions.append((playbook.stem, list(hosts)))
+        return {host: OperationStateEnum.SUCCESS for host in hosts}, b"LOG"
+
+
+@pytest.mark.parametrize("parallel", [1, 2])
+def test_coalesce_hosts(
+    mock_collections: Collections,
+    mock_cluster_status: ClusterStatus,
+    mock_cluster_variables: ClusterVariables,
+    parallel: int,
+):
+    executor = CoalescingExecutor()
+    deployment = DeploymentModel(
+        state=DeploymentStateEnum.PLANNED,
+        operations=[
+            OperationModel(
+                operation=operation,
+                operation_order=operation_order,
+                host=host,
+                state=OperationStateEnum.PLANNED,
+            )
+            for operation_order, (operation, host) in enumerate(
+                [
+                    ("serv_comp_install", "localhost"),
+                    # Not a host of the playbook
+                    ("serv_comp_install", "unknown"),
+                    ("serv_comp_config", "localhost"),
+                ],
+                start=1,
+            )
+        ],
+    )
+    deployment_iterator = DeploymentRunner(
+        executor=executor,
+        collections=mock_collections,
+        cluster_variables=mock_cluster_variables,
+        cluster_status=mock_cluster_status,
+    ).run(deployment, coalesce_hosts=True, parallel=parallel)
+
+    yielded = []
+    for operation, process_operation_fn in deployment_iterator:
+        yielded.append((operation.operation, operation.host))
+        if process_operation_fn:
+            process_operation_fn()
+
+    assert executor.executions == [("serv_comp_install", ["localhost"])]
+    assert yielded == [
+        ("serv_comp_install", "localhost"),
+        ("serv_comp_install", "unknown"),
+        ("serv_comp_config", "localhost"),
+    ]
+    assert [operation.state for operation in deployment.operations] == [
+        OperationStateEnum.SUCCESS,
+        OperationStateEnum.FAILURE,
+        OperationStateEnum.HELD,
+    ]
+    assert deployment.operations[0].logs == b"LOG"
+    assert deployment.state == DeploymentStateEnum.FAILURE
+
+
+@pytest.mark.parametrize("parallel", [1, 2])
+def test_rolling_batch_is_coalesced(
+    tmp_path_factory: pytest.TempPathFactory,
+    mock_inventory_reader: InventoryReader,
+    parallel: int,
+):
+    collection_path = tmp_path_factory.mktemp("rolling_batch_collection")
+    generate_collection_at_path(
+        collection_path,
+        {
+            "serv": [
+                {"name": "serv_comp_config"},
+                {"name": "serv_comp_start", "depends_on": ["serv_comp_config"]},
+            ]
+        },
+        {"serv": {"serv.yml": {}}},
+    )
+    mock_inventory_reader.get_hosts_from_playbook.return_value = {  # type: ignore
+        "host1",
+        "host2",
+        "host3",
+    }
+    collections = Collections.from_collection_paths(
+        [collection_path], mock_inventory_reader
+    )
+    deployment = DeploymentModel.from_operations(
+        collections, ["serv_comp_restart"], rolling_batch="2"
+    )
+    executor = CoalescingExecutor()
+    deployment_iterator = DeploymentRunner(
+        executor=executor,
+        collections=collections,
+        cluster_variables=ClusterVariables.initialize_cluster_variables(
+            collections, tmp_path_factory.mktemp("tdp_vars")
+        ),
+        cluster_status=ClusterStatus([]),
+    ).run(deployment, parallel=parallel)
+
+    for _, process_operation_fn in deployment_iterator:
+        if process_operation_fn:
+            process_operation_fn()
+
+    assert executor.executions == [
+        ("serv_comp_restart", ["host1", "host2"]),
+        ("serv_comp_restart", ["host3"]),
+    ]
+    assert deployment.state == DeploymentStateEnum.SUCCESS
+
+
+@pytest.mark.parametrize("parallel", [1, 2])
+@pytest.mark.parametrize("coalesce_hosts", [False, True])
+def test_rolling_batch_only_is_coalesced(
+    tmp_path_factory: pytest.TempPathFactory,
+    mock_inventory_reader: InventoryReader,
+    coalesce_hosts: bool,
+    parallel: int,
+):
+    collection_path = tmp_path_factory.mktemp("rolling_batch_collection")
+    generate_collection_at_path(
+        collection_path,
+        {
+            "serv": [
+                {"name": "serv_comp_config"},
+                {"name": "serv_comp_start", "depends_on": ["serv_comp_config"]},
+            ]
+        },
+        {"serv": {"serv.yml": {}}},
+    )
+    mock_inventory_reader.get_hosts_from_playbook.return_value = {  # type: ignore
+        "host1",
+        "host2",
+    }
+    collections = Collections.from_collection_paths(
+        [collection_path], mock_inventory_reader
+    )
+    executor = CoalescingExecutor()
+    deployment = DeploymentModel(
+        state=DeploymentStateEnum.PLANNED,
+        options={"rolling_batches": [[3, 4]]},
+        operations=[
+            OperationModel(
+                operation=operation,
+                operation_order=operation_order,
+                host=host,
+                state=OperationStateEnum.PLANNED,
+            )
+            for operation_order, (operation, host) in enumerate(
+                [
+                    ("serv_comp_config", "host1"),
+                    ("serv_comp_config", "host2"),
+                    ("serv_comp_restart", "host1"),
+                    ("serv_comp_restart", "host2"),
+                ],
+                start=1,
+            )
+        ],
+    )
+    deployment_iterator = DeploymentRunner(
+        executor=executor,
+        collections=collections,
+        cluster_variables=ClusterVariables.initialize_cluster_variables(
+            collections, tmp_path_factory.mktemp("tdp_vars")
+        ),
+        cluster_status=ClusterStatus([]),
+    ).run(deployment, coalesce_hosts=coalesce_hosts, parallel=parallel)
+
+    for _, process_operation_fn in deployment_iterator:
+        if process_operation_fn:
+            process_operation_fn()
+
+    config_executions = (
+        [("serv_comp_config", ["host1", "host2"])]
+        if coalesce_hosts
+        else [
+            ("serv_comp_config", ["host1"]),
+            ("serv_comp_config", ["host2"]),
+        ]
+    )
+    assert executor.executions == [
+        *config_executions,
+        ("serv_comp_restart", ["host1", "host2"]),
+    ]
+    assert deployment.state == DeploymentStateEnum.SUCCESS
+
+
+class StreamingExecutor(MockExecutor):
+    """Mock executor reporting its logs while running."""
+
+    def execute(
+        self,
+        playbook: str,
+        host: Optional[str] = None,
+        extra_vars: Optional[Iterable[str]] = None,
+        on_logs=None,
+    ):
+        on_logs(b"partial")
+        return super().execute(playbook, host, extra_vars)
+
+
+def test_operation_logs_are_reported_while_running(
+    mock_collections: Collections,
+    mock_cluster_status: ClusterStatus,
+    mock_cluster_variables: ClusterVariables,
+):
+    reported = []
+    deployment = DeploymentModel.from_operations(
+        mock_collections, ["serv_comp_install"]
+    )
+    deployment_iterator = DeploymentRunner(
+        executor=StreamingExecutor(),
+        collections=mock_collections,
+        cluster_variables=mock_cluster_variables,
+        cluster_status=mock_cluster_status,
+        on_operation_logs=lambda operation: reported.append(
+            (operation.operation, operation.state, operation.logs)
+        ),
+    ).run(deployment)
+
+    for _, process_operation_fn in deployment_iterator:
+        if process_operation_fn:
+            process_operation_fn()
+
+    assert reported == [("serv_comp_install", OperationStateEnum.RUNNING, b"partial")]
+    assert deployment.operations[0].state == OperationStateEnum.SUCCESS
+    assert deployment.operations[0].logs != b"partial"
+
+
+def test_unchanged_operations_are_skipped(
+    mock_collections: Collections,
+    mock_cluster_status: ClusterStatus,
+    mock_cluster_variables: ClusterVariables,
+):
+    executor = CountingExecutor()
+    runner = DeploymentRunner(
+        executor=executor,
+        collections=mock_collections,
+        cluster_variables=mock_cluster_variables,
+        cluster_status=mock_cluster_status,
+    )
+
+    def run(**kwargs) -> DeploymentModel:
+        deployment = DeploymentModel.from_operations(
+            mock_collections, ["serv_comp_install", "serv_comp_start"]
+        )
+        for _, process_operation_fn in runner.run(deployment, **kwargs):
+            if process_operation_fn:
+                process_operation_fn()
+        return deployment
+
+    first = run()
+    fingerprints = [operation.fingerprint for operation in first.operations]
+    assert all(fingerprints)
+    assert executor.playbooks == ["serv_comp_install", "serv_comp_start"]
+
+    # Only the idempotent operations are skipped
+    last_fingerprints = {
+        (operation.operation, operation.host): operation.fingerprint
+        for operation in first.operations
+    }
+    second = run(last_fingerprints=last_fingerprints)
+    assert second.state == DeploymentStateEnum.SUCCESS
+    assert [operation.fingerprint for operation in second.operations] == fingerprints
+    assert second.operations[0].logs.startswith(b"Skipped")
+    assert executor.playbooks[2:] == ["serv_comp_start"]
+
+    # Other extra vars change the fingerprint
+    third = DeploymentModel.from_operations(
+        mock_collections, ["serv_comp_install"], extra_vars=["key=value"]
+    )
+    for _, process_operation_fn in runner.run(
+        third, last_fingerprints=last_fingerprints
+    ):
+        if process_operation_fn:
+            process_operation_fn()
+    assert third.operations[0].fingerprint not in fingerprints
+    assert executor.playbooks[3:] == ["serv_comp_install"]
+
+
+def test_operations_after_a_run_ancestor_are_not_skipped(
+    mock_collections: Collections,
+    mock_cluster_status: ClusterStatus,
+    mock_cluster_variables: ClusterVariables,
+):
+    executor = CountingExecutor()
+    runner = DeploymentRunner(
+        executor=executor,
+        collections=mock_collections,
+        cluster_variables=mock_cluster_variables,
+        cluster_status=mock_cluster_status,
+    )
+
+    def run(**kwargs) -> DeploymentModel:
+        deployment = DeploymentModel.from_operations(
+            mock_collections, ["serv_comp_install", "serv_comp_config"]
+        )
+        for _, process_operation_fn in runner.run(deployment, **kwargs):
+            if process_operation_fn:
+                process_operation_fn()
+        return deployment
+
+    first = run()
+    last_fingerprints = {
+        (operation.operation, operation.host): operation.fingerprint
+        for operation in first.operations
+    }
+
+    # The install operation ran, the config operation depending on it is run too
+    run(last_fingerprints={**last_fingerprints, ("serv_comp_install", None): None})
+    assert executor.playbooks[2:] == ["serv_comp_install", "serv_comp_config"]
+
+    run(last_fingerprints=last_fingerprints)
+    assert executor.playbooks[4:] == []
+
+
+def test_get_collection_hash(tmp_path):
+    (tmp_path / "roles" / "serv" / "tasks").mkdir(parents=True)
+    (task := tmp_path / "roles" / "serv" / "tasks" / "main.yml").write_text("a")
+    collection_hash = get_collection_hash(tmp_path)
+
+    # Hidden files are ignored
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "HEAD").write_text("ref")
+    assert get_collection_hash(tmp_path) == collection_hash
+
+    task.write_text("b")
+    assert get_collection_hash(tmp_path) != collection_hash
@@ -0,0 +1,428 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+import yaml
+
+from tdp.core.deployment.async_executor import AsyncExecutor
+from tdp.core.deployment.executor import (
+    CALLBACK_PLUGINS_DIR,
+    Executor,
+    _get_host_states,
+    read_ansible_config,
+)
+from tdp.core.models.enums import OperationStateEnum
+from tdp.utils import ExecutableNotFoundError, resolve_executable
+
+
+def test_get_host_states():
+    host_results = {
+        "host1": {"ok": 2, "failures": 0, "unreachable": 0},
+        "host2": {"ok": 1, "failures": 1, "unreachable": 0},
+        "host3": {"ok": 0, "failures": 0, "unreachable": 1},
+    }
+
+    assert _get_host_states(
+        host_results,
+        ["host1", "host2", "host3", "host4"],
+        OperationStateEnum.FAILURE,
+    ) == {
+        "host1": OperationStateEnum.SUCCESS,
+        "host2": OperationStateEnum.FAILURE,
+        "host3": OperationStateEnum.FAILURE,
+        "host4": OperationStateEnum.FAILURE,
+    }
+
+
+def test_execute_hosts_dry():
+    assert Executor(dry=True).execute_hosts(Path("playbook.yml"), ["a", "b"]) == (
+        {"a": OperationStateEnum.SUCCESS, "b": OperationStateEnum.SUCCESS},
+        b"",
+    )
+
+
+def test_execute_hosts(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    try:
+        resolve_executable("ansible-playbook")
+    except ExecutableNotFoundError:
+        pytest.skip("ansible-playbook is not available")
+    (tmp_path / "inventory").write_text(
+        "\n".join(f"{host} ansible_connection=local" for host in ["a", "b", "c"])
+    )
+    (playbook := tmp_path / "playbook.yml").write_text(
+        yaml.dump(
+            [
+                {
+                    "hosts": "all",
+                    "gather_facts": False,
+                    "tasks": [{"fail": None, "when": "inventory_hostname == 'b'"}],
+                }
+            ]
+        )
+    )
+    monkeypatch.setenv("ANSIBLE_INVENTORY", str(tmp_path / "inventory"))
+
+    host_states, logs = Executor(run_directory=tmp_path).execute_hosts(
+        playbook, ["a", "b", "c"]
+    )
+
+    assert host_states == {
+        "a": OperationStateEnum.SUCCESS,
+        "b": OperationStateEnum.FAILURE,
+        "c": OperationStateEnum.SUCCESS,
+    }
+    assert b"PLAY RECAP" in logs
+
+
+def test_ansible_api_executor_isolates_runs(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    pytest.importorskip("ansible")
+    from tdp.core.deployment.ansible_api_executor import AnsibleApiExecutor
+
+    (tmp_path / "inventory").write_text(
+        "\n".join(f"{host} ansible_connection=local" for host in ["a", "b"])
+    )
+    (add_host := tmp_path / "add_host.yml").write_text(
+        yaml.dump(
+            [
+                {
+                    "hosts": "all",
+                    "gather_facts": False,
+                    "tasks": [
+                        {"set_fact": {"fact": True}},
+                        {
+                            "add_host": {"name": "c", "ansible_connection": "local"},
+                            "run_once": True,
+                        },
+                    ],
+                }
+            ]
+        )
+    )
+    (check := tmp_path / "check.yml").write_text(
+        yaml.dump(
+            [
+                {
+                    "hosts": "all",
+                    "gather_facts": False,
+                    "tasks": [
+                        {"assert": {"that": ["fact is not defined"]}},
+                        {
+                            "debug": {
+                                "msg": "HOSTS {{ ansible_play_hosts | join(',') }} "
+                                "VAR {{ var }}"
+                            }
+                        },
+                    ],
+                }
+            ]
+        )
+    )
+    monkeypatch.setenv("ANSIBLE_INVENTORY", str(tmp_path / "inventory"))
+
+    with AnsibleApiExecutor(run_directory=tmp_path) as executor:
+        assert executor.execute(add_host)[0] == OperationStateEnum.SUCCESS
+        state, logs = executor.execute(check, host="a", extra_vars=["var=1"])
+        assert state == OperationStateEnum.SUCCESS
+        assert b"HOSTS a VAR 1" in logs
+        state, logs = executor.execute(check, extra_vars=["var=2"])
+        assert state == OperationStateEnum.SUCCESS
+        assert b"HOSTS a,b VAR 2" in logs
+        assert executor.execute_hosts(check, ["a", "b"])[0] == {
+            "a": OperationStateEnum.FAILURE,
+            "b": OperationStateEnum.FAILURE,
+        }
+
+
+def test_ansible_api_executor_deployment_scopes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    pytest.importorskip("ansible")
+    from tdp.core.deployment.ansible_api_executor import AnsibleApiExecutor
+
+    (tmp_path / "inventory").write_text("a ansible_connection=local")
+    (playbook := tmp_path / "playbook.yml").write_text(
+        yaml.dump(
+            [
+                {
+                    "hosts": "all",
+                    "gather_facts": False,
+                    "tasks": [
+                        {
+                            "debug": {
+                                "msg": "CACHE "
+                                "{{ lookup('config', 'CACHE_PLUGIN_CONNECTION') }}"
+                            }
+                        }
+                    ],
+                }
+            ]
+        )
+    )
+    monkeypatch.setenv("ANSIBLE_INVENTORY", str(tmp_path / "inventory"))
+
+    # Ansible reads its settings once, each scope gets its own workers
+    with AnsibleApiExecutor(run_directory=tmp_path) as executor:
+        for deployment_id in (1, 2):
+            with executor.deployment_scope(deployment_id):
+                fact_cache_dir = executor._env["ANSIBLE_CACHE_PLUGIN_CONNECTION"]
+                state, logs = executor.execute(playbook)
+                assert state == OperationStateEnum.SUCCESS
+                assert f"CACHE {fact_cache_dir}".encode() in logs
+            assert not executor._workers
+
+
+def test_execute_ansible_command_streams_output(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("tdp.core.deployment.log_buffer.LOGS_FLUSH_INTERVAL", 0)
+    reported = []
+    state, logs = Executor(dry=True)._execute_ansible_command(
+        [
+            sys.executable,
+            "-c",
+            "import sys, time\n"
+            "for i in range(3):\n"
+            "    print(i, flush=True)\n"
+            "    time.sleep(0.1)\n"
+            "sys.exit(1)",
+        ],
+        on_logs=reported.append,
+    )
+
+    assert state == OperationStateEnum.FAILURE
+    assert logs == b"0\n1\n2\n"
+    assert reported and all(logs.startswith(value) for value in reported)
+
+
+def test_async_executor_drains_streams_concurrently():
+    # Larger than the pipe buffers, would block if the streams were read in turn
+    state, logs = AsyncExecutor(dry=True)._execute_ansible_command(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "sys.stderr.write('e' * 200000)\n"
+            "sys.stdout.write('o' * 200000)",
+        ]
+    )
+
+    assert state == OperationStateEnum.SUCCESS
+    assert logs.count(b"e") == logs.count(b"o") == 200000
+
+
+def test_async_executor_kills_timed_out_command():
+    executor = AsyncExecutor(dry=True, operation_timeout=0.5, kill_timeout=0.5)
+    start = time.monotonic()
+    state, logs = executor._execute_ansible_command(
+        [
+            sys.executable,
+            "-c",
+            "import signal, time\n"
+            "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+            "print('started', flush=True)\n"
+            "time.sleep(30)",
+        ]
+    )
+
+    assert state == OperationStateEnum.FAILURE
+    assert logs.startswith(b"started\n")
+    assert b"Timed out" in logs
+    assert time.monotonic() - start < 10
+
+
+def test_async_executor_deployment_timeout():
+    executor = AsyncExecutor(dry=True, deployment_timeout=0.5)
+    command = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+    assert executor._execute_ansible_command(command)[0] == OperationStateEnum.FAILURE
+    state, logs = executor._execute_ansible_command(command)
+    assert state == OperationStateEnum.FAILURE
+    assert b"Deployment timeout reached" in logs
+
+
+def test_async_executor_deployment_timeout_starts_with_scope():
+    executor = AsyncExecutor(dry=True, deployment_timeout=0.2)
+    command = [sys.executable, "-c", "pass"]
+
+    with executor.deployment_scope(1):
+        time.sleep(0.3)
+        state, logs = executor._execute_ansible_command(command)
+    assert state == OperationStateEnum.FAILURE
+    assert b"Deployment timeout reached" in logs
+
+    # A new scope has its own deadline
+    with executor.deployment_scope(2):
+        state, _ = executor._execute_ansible_command(command)
+    assert state == OperationStateEnum.SUCCESS
+
+
+def test_deployment_scope_sets_up_fact_cache():
+    executor = Executor(dry=True)
+    assert executor._get_env() is None
+
+    with executor.deployment_scope(1):
+        env = executor._get_env()
+        assert env is not None
+        assert env["ANSIBLE_GATHERING"] == "smart"
+        assert env["ANSIBLE_CACHE_PLUGIN"] == "jsonfile"
+        fact_cache_dir = Path(env["ANSIBLE_CACHE_PLUGIN_CONNECTION"])
+        assert fact_cache_dir.is_dir()
+        assert "tdp_deployment_1_" in str(fact_cache_dir)
+
+    assert not fact_cache_dir.exists()
+    assert executor._get_env() is None
+
+
+def test_deployment_scope_reuses_facts(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    try:
+        resolve_executable("ansible-playbook")
+    except ExecutableNotFoundError:
+        pytest.skip("ansible-playbook is not available")
+    (tmp_path / "inventory").write_text("a ansible_connection=local")
+    (playbook := tmp_path / "playbook.yml").write_text(
+        yaml.dump(
+            [
+                {
+                    "hosts": "all",
+                    "gather_facts": True,
+                    "tasks": [{"debug": {"var": "ansible_facts.hostname"}}],
+                }
+            ]
+        )
+    )
+    monkeypatch.setenv("ANSIBLE_INVENTORY", str(tmp_path / "inventory"))
+    executor = Executor(run_directory=tmp_path)
+
+    with executor.deployment_scope(1):
+        first_state, first_logs = executor.execute(playbook)
+        second_state, second_logs = executor.execute(playbook)
+
+    assert first_state == second_state == OperationStateEnum.SUCCESS
+    assert b"Gathering Facts" in first_logs
+    assert b"Gathering Facts" not in second_logs
+    assert b"VARIABLE IS NOT DEFINED" not in second_logs
+
+
+# Stand-in for ssh running the commands locally, a connection is opened when there
+# is no master connection for the control path
+FAKE_SSH = """\
+import os, subprocess, sys
+
+args, options, positional = sys.argv[1:], {}, []
+while args:
+    arg = args.pop(0)
+    if positional or not arg.startswith("-"):
+        positional.append(arg)
+    elif arg in ("-o", "-O", "-l", "-p", "-i", "-F"):
+        key, _, value = args.pop(0).partition("=")
+        options[arg if arg != "-o" else key] = value.strip('"') or key
+control_path = options.get("ControlPath")
+with open(os.environ["FAKE_SSH_LOG"], "a") as log:
+    if "-O" in options:
+        log.write("exit\\n")
+        os.remove(control_path)
+        sys.exit(0)
+    if not (control_path and os.path.exists(control_path)):
+        log.write("connect\\n")
+        if control_path and options.get("ControlMaster") == "auto":
+            open(control_path, "w").close()
+    log.write("command " + " ".join(positional[1:]) + "\\n")
+sys.exit(subprocess.call(["/bin/sh", "-c", " ".join(positional[1:])]))
+"""
+
+
+def test_deployment_scope_reuses_ssh_connections(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    try:
+        resolve_executable("ansible-playbook")
+    except ExecutableNotFoundError:
+        pytest.skip("ansible-playbook is not available")
+    (ssh := tmp_path / "ssh").write_text(f"#!{sys.executable}\n{FAKE_SSH}")
+    ssh.chmod(0o755)
+    (tmp_path / "inventory").write_text(
+        "a ansible_host=127.0.0.1\n"
+        "b ansible_host=127.0.0.2\n"
+        f"[all:vars]\nansible_python_interpreter={sys.executable}\n"
+    )
+    (playbook := tmp_path / "playbook.yml").write_text(
+        yaml.dump([{"hosts": "all", "gather_facts": False, "tasks": [{"ping": None}]}])
+    )
+    monkeypatch.setenv("ANSIBLE_INVENTORY", str(tmp_path / "inventory"))
+    monkeypatch.setenv("ANSIBLE_SSH_EXECUTABLE", str(ssh))
+    monkeypatch.setenv("ANSIBLE_SSH_TRANSFER_METHOD", "piped")
+    monkeypatch.setenv("ANSIBLE_HOST_KEY_CHECKING", "False")
+    monkeypatch.setenv("FAKE_SSH_LOG", str(log := tmp_path / "ssh.log"))
+    executor = Executor(run_directory=tmp_path)
+
+    with executor.deployment_scope(1):
+        control_path_dir = Path(executor._get_env()["ANSIBLE_SSH_CONTROL_PATH_DIR"])
+        for _ in range(3):
+            assert executor.execute(playbook)[0] == OperationStateEnum.SUCCESS
+        assert len(list(control_path_dir.iterdir())) == 2
+
+    lines = log.read_text().splitlines()
+    # A connection per host, closed at the end of the deployment
+    assert lines.count("connect") == 2
+    assert lines.count("exit") == 2
+    # Modules are piped, not transferred
+    assert not any(line.startswith("command dd ") for line in lines)
+    assert not control_path_dir.exists()
+
+
+ANSIBLE_CFG = """\
+[defaults]
+callback_plugins = /opt/callback
+[ssh_connection]
+ssh_args = -o ProxyJump=bastion
+pipelining = False
+"""
+
+
+def test_read_ansible_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    try:
+        resolve_executable("ansible-config")
+    except ExecutableNotFoundError:
+        pytest.skip("ansible-config is not available")
+    monkeypatch.delenv("ANSIBLE_CONFIG", raising=False)
+    (tmp_path / "ansible.cfg").write_text(ANSIBLE_CFG)
+
+    settings = read_ansible_config(tmp_path)
+
+    assert settings["DEFAULT_CALLBACK_PLUGIN_PATH"] == ["/opt/callback"]
+    assert settings["connection.ssh.ssh_args"] == "-o ProxyJump=bastion"
+    assert settings["connection.ssh.pipelining"] is False
+    assert "DEFAULT_GATHERING" not in settings
+
+
+def test_deployment_scope_keeps_ansible_config(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    try:
+        resolve_executable("ansible-playbook")
+    except ExecutableNotFoundError:
+        pytest.skip("ansible-playbook is not available")
+    monkeypatch.setattr(
+        "tdp.core.deployment.executor.read_ansible_config",
+        lambda run_directory: {
+            "DEFAULT_CALLBACK_PLUGIN_PATH": ["/opt/callback"],
+            "connection.ssh.ssh_args": "-o ProxyJump=bastion",
+            "connection.ssh.pipelining": False,
+        },
+    )
+    executor = Executor(run_directory=tmp_path)
+
+    assert executor._get_callback_plugins() == f"{CALLBACK_PLUGINS_DIR}:/opt/callback"
+    with executor.deployment_scope(1):
+        # Appended, the configured options take precedence
+        assert executor._env["ANSIBLE_SSH_ARGS"] == (
+            "-o ProxyJump=bastion -o ControlMaster=auto -o ControlPersist=30m"
+        )
+        assert "ANSIBLE_PIPELINING" not in executor._env
+    with executor.deployment_scope(2, reuse_ssh_connections=False):
+        assert "ANSIBLE_SSH_ARGS" not in executor._env
+        assert "ANSIBLE_SSH_CONTROL_PATH_DIR" not in executor._env
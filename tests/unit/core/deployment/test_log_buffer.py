@@ -0,0 +1,41 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+import io
+
+from tdp.core.deployment.log_buffer import LogBuffer
+
+
+def test_log_buffer_keeps_short_output():
+    passthrough = io.BytesIO()
+    logs = LogBuffer(100, passthrough=passthrough)
+    logs.write(b"first\n")
+    logs.write(b"second\n")
+
+    assert logs.getvalue() == b"first\nsecond\n"
+    assert passthrough.getvalue() == b"first\nsecond\n"
+
+
+def test_log_buffer_keeps_head_and_tail():
+    passthrough = io.BytesIO()
+    logs = LogBuffer(100, passthrough=passthrough)
+    for i in range(1000):
+        logs.write(b"%04d\n" % i)
+
+    value = logs.getvalue()
+    assert len(value) <= 100
+    assert value.startswith(b"0000\n0001\n")
+    assert value.endswith(b"0998\n0999\n")
+    assert b"bytes truncated" in value
+    # The whole output is passed through
+    assert len(passthrough.getvalue()) == 5000
+
+
+def test_log_buffer_reports_logs_periodically():
+    reported = []
+    logs = LogBuffer(100, on_logs=reported.append, flush_interval=0)
+    logs.write(b"first\n")
+    logs.write(b"second\n")
+    logs.flush()
+
+    assert reported == [b"first\n", b"first\nsecond\n"]
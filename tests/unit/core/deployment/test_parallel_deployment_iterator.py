@@ -0,0 +1,474 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import pytest
+
+from tdp.core.deployment.deployment_runner import DeploymentRunner
+from tdp.core.deployment.executor import Executor
+from tdp.core.deployment.parallel_deployment_iterator import (
+    ParallelDeploymentIterator,
+    get_operation_dependencies,
+)
+from tdp.core.models import DeploymentModel, OperationModel
+from tdp.core.models.enums import (
+    DeploymentStateEnum,
+    FailurePolicyEnum,
+    OperationStateEnum,
+)
+
+if TYPE_CHECKING:
+    from tdp.core.cluster_status import ClusterStatus
+    from tdp.core.collections import Collections
+    from tdp.core.dag import Dag
+    from tdp.core.variables import ClusterVariables
+
+
+class RecordingExecutor(Executor):
+    """Mock executor recording the start and end of the playbooks."""
+
+    def __init__(
+        self,
+        failing_playbook: Optional[str] = None,
+        failing_host: Optional[str] = None,
+    ):
+        self.events: list[tuple[str, str]] = []
+        self.running = 0
+        self.max_running = 0
+        self._failing_playbook = failing_playbook
+        self._failing_host = failing_host
+        self._lock = threading.Lock()
+
+    def execute(
+        self,
+        playbook: str,
+        host: Optional[str] = None,
+        extra_vars: Optional[Iterable[str]] = None,
+    ):
+        name = f"{playbook.stem}_{host}" if host else playbook.stem
+        with self._lock:
+            self.events.append(("start", name))
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        with self._lock:
+            self.events.append(("end", name))
+            self.running -= 1
+        if playbook.stem == self._failing_playbook and self._failing_host in (
+            None,
+            host,
+        ):
+            return OperationStateEnum.FAILURE, b""
+        return OperationStateEnum.SUCCESS, b""
+
+
+def _runner(
+    executor: Executor,
+    collections: Collections,
+    cluster_status: ClusterStatus,
+    cluster_variables: ClusterVariables,
+) -> DeploymentRunner:
+    return DeploymentRunner(
+        executor=executor,
+        collections=collections,
+        cluster_variables=cluster_variables,
+        cluster_status=cluster_status,
+    )
+
+
+def test_get_operation_dependencies(mock_dag: Dag, mock_collections: Collections):
+    deployment = DeploymentModel.from_operations(
+        mock_collections,
+        ["serv_comp_install", "serv_install", "serv_comp_config", "serv_config"],
+    )
+
+    assert get_operation_dependencies(mock_dag, deployment.operations) == [
+        set(),
+        {0},
+        {0},
+        {0, 1, 2},
+    ]
+
+
+def _create_iterator(
+    executor: Executor,
+    deployment: DeploymentModel,
+    collections: Collections,
+    cluster_status: ClusterStatus,
+    cluster_variables: ClusterVariables,
+    **kwargs,
+) -> ParallelDeploymentIterator:
+    """Create an iterator running the operations on any host, which the runner
+    doesn't allow with the mock collections."""
+
+    def run_method(operation_rec: OperationModel) -> None:
+        operation_rec.state, operation_rec.logs = executor.execute(
+            Path(operation_rec.operation), host=operation_rec.host
+        )
+
+    return ParallelDeploymentIterator(
+        deployment,
+        collections=collections,
+        run_method=run_method,
+        cluster_variables=cluster_variables,
+        cluster_status=cluster_status,
+        force_stale_update=False,
+        **kwargs,
+    )
+
+
+def _create_deployment(operation_hosts: list[tuple[str, Optional[str]]]):
+    return DeploymentModel(
+        state=DeploymentStateEnum.PLANNED,
+        operations=[
+            OperationModel(
+                operation=operation,
+                operation_order=operation_order,
+                host=host,
+                state=OperationStateEnum.PLANNED,
+            )
+            for operation_order, (operation, host) in enumerate(
+                operation_hosts, start=1
+            )
+        ],
+    )
+
+
+def test_get_operation_dependencies_host_fan_out(mock_dag: Dag):
+    deployment = _create_deployment(
+        [
+            ("serv_comp_install", "host1"),
+            ("serv_comp_install", "host2"),
+            ("serv_comp_install", "host1"),
+            ("serv_comp_config", "host1"),
+            ("serv_comp_config", "host2"),
+            ("serv_comp_config", None),
+        ]
+    )
+
+    assert get_operation_dependencies(mock_dag, deployment.operations) == [
+        set(),
+        set(),
+        {0},
+        {0, 1, 2},
+        {0, 1, 2},
+        {0, 1, 2, 3, 4},
+    ]
+
+
+def test_parallel_deployment_respects_dependencies(
+    mock_dag: Dag,
+    mock_collections: Collections,
+    mock_cluster_status: ClusterStatus,
+    mock_cluster_variables: ClusterVariables,
+):
+    executor = RecordingExecutor()
+    deployment = DeploymentModel.from_dag(mock_dag, targets=["serv_init"])
+    deployment.operations = [
+        operation
+        for operation in deployment.operations
+        if operation.operation.startswith("serv_comp")
+    ]
+    deployment_iterator = _runner(
+        executor, mock_collections, mock_cluster_status, mock_cluster_variables
+    ).run(deployment, parallel=4)
+    assert isinstance(deployment_iterator, ParallelDeploymentIterator)
+
+    for _, process_operation_fn in deployment_iterator:
+        if process_operation_fn:
+            process_operation_fn()
+
+    assert deployment.state == DeploymentStateEnum.SUCCESS
+    assert all(
+        operation.state == OperationStateEnum.SUCCESS
+        for operation in deployment.operations
+    )
+    # Operations of the same component depend on each other
+    assert executor.max_running == 1
+    assert [name for event, name in executor.events if event == "start"] == [
+        "serv_comp_install",
+        "serv_comp_config",
+        "serv_comp_start",
+        "serv_comp_init",
+    ]
+
+
+def test_parallel_deployment_runs_same_operation_in_order(
+    mock_collections: Collections,
+    mock_cluster_status: ClusterStatus,
+    mock_cluster_variables: ClusterVariables,
+):
+    executor = RecordingExecutor()
+    deployment = DeploymentModel.from_operations_hosts_vars(
+        mock_collections,
+        [
+            ("serv_comp_install", "localhost", None),
+            ("serv_comp_install", "localhost", None),
+        ],
+    )
+    deployment_iterator = _runner(
+        executor, mock_collections, mock_cluster_status, mock_cluster_variables
+    ).run(deployment, parallel=2)
+
+    for _, process_operation_fn in deployment_iterator:
+        if process_operation_fn:
+            process_operation_fn()
+
+    assert deployment.state == DeploymentStateEnum.SUCCESS
+    # Occurrences of the same operation run in order
+    assert executor.max_running == 1
+
+
+def test_parallel_deployment_holds_operations_after_failure(
+    mock_dag: Dag,
+    mock_collections: Collections,
+    mock_cluster_status: ClusterStatus,
+    mock_cluster_variables: ClusterVariables,
+):
+    executor = RecordingExecutor(failing_playbook="serv_comp_config")
+    deployment = DeploymentModel.from_dag(mock_dag, targets=["serv_init"])
+    deployment_iterator = _runner(
+        executor, mock_collections, mock_cluster_status, mock_cluster_variables
+    ).run(deployment, parallel=4)
+
+    yielded = []
+    for operation, process_operation_fn in deployment_iterator:
+        yielded.append(operation.operation)
+        if process_operation_fn:
+            process_operation_fn()
+
+    assert sorted(yielded) == sorted(
+        operation.operation for operation in deployment.operations
+    )
+    assert deployment.state == DeploymentStateEnum.FAILURE
+    states = {
+        operation.operation: operation.state for operation in deployment.operations
+    }
+    assert states["serv_comp_install"] == OperationStateEnum.SUCCESS
+    assert states["serv_comp_config"] == OperationStateEnum.FAILURE
+    assert states["serv_comp_start"] == OperationStateEnum.HELD
+    assert states["serv_init"] == OperationStateEnum.HELD
+    assert deployment.failed_operation_count == 1
+
+
+def test_parallel_deployment_status_logs(
+    mock_dag: Dag,
+    mock_collections: Collections,
+    mock_cluster_variables: ClusterVariables,
+):
+    """Status logs are the same as the ones of a sequential deployment."""
+    from tdp.core.cluster_status import ClusterStatus
+
+    def run(parallel: int) -> list[tuple]:
+        deployment = DeploymentModel.from_dag(mock_dag, targets=["serv_init"])
+        deployment_iterator = _runner(
+            RecordingExecutor(),
+            mock_collections,
+            ClusterStatus([]),
+            mock_cluster_variables,
+        ).run(deployment, parallel=parallel)
+        status_logs = []
+        for _, process_operation_fn in deployment_iterator:
+            if process_operation_fn:
+                status_logs.extend(process_operation_fn() or [])
+        assert deployment.state == DeploymentStateEnum.SUCCESS
+        return sorted(
+            (
+                (
+                    log.service,
+                    log.component,
+                    log.host,
+                    log.running_version,
+                    log.configured_version,
+                    log.to_config,
+                    log.to_restart,
+                )
+                for log in status_logs
+            ),
+            key=str,
+        )
+
+    status_logs = run(parallel=1)
+    assert status_logs
+    assert run(parallel=4) == status_logs
+
+
+def test_parallel_deployment_fans_out_hosts(
+    mock_collections: Collections,
+    mock_cluster_variables: ClusterVariables,
+):
+    from tdp.core.cluster_status import ClusterStatus
+
+    executor = RecordingExecutor()
+    hosts = ["host1", "host2", "host3", "host4"]
+    deployment = _create_deployment(
+        [("serv_comp_install", host) for host in hosts]
+        + [("serv_comp_config", host) for host in hosts]
+    )
+    deployment_iterator = _create_iterator(
+        executor,
+        deployment,
+        mock_collections,
+        ClusterStatus([]),
+        mock_cluster_variables,
+        operation_fan_out={"serv_comp_install": 2},
+        fan_out=3,
+    )
+
+    status_logs = []
+    for _, process_operation_fn in deployment_iterator:
+        if process_operation_fn:
+            status_logs.extend(process_operation_fn() or [])
+
+    assert deployment.state == DeploymentStateEnum.SUCCESS
+    assert executor.max_running == 3
+    started = [name for event, name in executor.events if event == "start"]
+    # Hosts are started in order, the config waits for all the installs
+    assert started == [f"serv_comp_install_{host}" for host in hosts] + [
+        f"serv_comp_config_{host}" for host in hosts
+    ]
+    assert sorted(log.host for log in status_logs if log.configured_version) == hosts
+
+
+@pytest.mark.parametrize(
+    "failure_policy, expected_states",
+    [
+        (
+            FailurePolicyEnum.FAIL_FAST,
+            [
+                OperationStateEnum.SUCCESS,
+                OperationStateEnum.FAILURE,
+                OperationStateEnum.HELD,
+                OperationStateEnum.HELD,
+            ],
+        ),
+        (
+            FailurePolicyEnum.CONTINUE,
+            [
+                OperationStateEnum.SUCCESS,
+                OperationStateEnum.FAILURE,
+                OperationStateEnum.SUCCESS,
+                OperationStateEnum.HELD,
+            ],
+        ),
+    ],
+)
+def test_parallel_deployment_failure_policy(
+    mock_collections: Collections,
+    mock_cluster_status: ClusterStatus,
+    mock_cluster_variables: ClusterVariables,
+    failure_policy: FailurePolicyEnum,
+    expected_states: list[OperationStateEnum],
+):
+    executor = RecordingExecutor(
+        failing_playbook="serv_comp_install", failing_host="host2"
+    )
+    deployment = _create_deployment(
+        [
+            ("serv_comp_install", "host1"),
+            ("serv_comp_install", "host2"),
+            ("serv_comp_install", "host3"),
+            ("serv_comp_config", "host1"),
+        ]
+    )
+    deployment_iterator = _create_iterator(
+        executor,
+        deployment,
+        mock_collections,
+        mock_cluster_status,
+        mock_cluster_variables,
+        failure_policy=failure_policy,
+    )
+
+    for _, process_operation_fn in deployment_iterator:
+        if process_operation_fn:
+            process_operation_fn()
+
+    assert deployment.state == DeploymentStateEnum.FAILURE
+    assert [operation.state for operation in deployment.operations] == expected_states
+
+
+def test_parallel_deployment_coalesces_hosts(
+    mock_collections: Collections,
+    mock_cluster_variables: ClusterVariables,
+):
+    from tdp.core.cluster_status import ClusterStatus
+
+    executor = RecordingExecutor()
+    executions: list[list[str]] = []
+
+    def run_hosts_method(operation_recs: list[OperationModel]) -> None:
+        executions.append([operation_rec.host for operation_rec in operation_recs])
+        for operation_rec in operation_recs:
+            operation_rec.state = OperationStateEnum.SUCCESS
+
+    hosts = ["host1", "host2", "host3"]
+    deployment = _create_deployment(
+        [("serv_comp_install", host) for host in hosts]
+        + [("serv_comp_config", host) for host in hosts[:2]]
+    )
+    deployment_iterator = _create_iterator(
+        executor,
+        deployment,
+        mock_collections,
+        ClusterStatus([]),
+        mock_cluster_variables,
+        parallel=2,
+        run_hosts_method=run_hosts_method,
+    )
+
+    status_logs = []
+    for _, process_operation_fn in deployment_iterator:
+        if process_operation_fn:
+            status_logs.extend(process_operation_fn() or [])
+
+    assert deployment.state == DeploymentStateEnum.SUCCESS
+    assert executions == [hosts, hosts[:2]]
+    assert not executor.events
+    assert (
+        sorted(log.host for log in status_logs if log.configured_version) == hosts[:2]
+    )
+
+
+def test_parallel_deployment_close(
+    mock_collections: Collections,
+    mock_cluster_status: ClusterStatus,
+    mock_cluster_variables: ClusterVariables,
+):
+    executor = RecordingExecutor()
+    hosts = ["host1", "host2", "host3", "host4"]
+    deployment = _create_deployment([("serv_comp_install", host) for host in hosts])
+    deployment_iterator = _create_iterator(
+        executor,
+        deployment,
+        mock_collections,
+        mock_cluster_status,
+        mock_cluster_variables,
+        fan_out=2,
+    )
+
+    # Stop iterating after the first operation
+    _, process_operation_fn = next(deployment_iterator)
+    assert process_operation_fn
+    process_operation_fn()
+    deployment_iterator.close()
+
+    workers = [
+        thread
+        for thread in threading.enumerate()
+        if thread.name.startswith(f"deployment-{deployment.id}_")
+    ]
+    for worker in workers:
+        worker.join(timeout=1)
+    assert not any(worker.is_alive() for worker in workers)
+    # The running operation is not interrupted, the pending ones are not started
+    started = [name for event, name in executor.events if event == "start"]
+    assert started == ["serv_comp_install_host1", "serv_comp_install_host2"]
+    assert ("end", "serv_comp_install_host2") in executor.events
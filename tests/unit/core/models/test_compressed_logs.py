@@ -0,0 +1,63 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from tdp.core.models import DeploymentModel, OperationModel
+from tdp.core.models.compressed_logs import (
+    compress_logs,
+    decompress_logs,
+    is_compressed,
+)
+from tdp.core.models.enums import DeploymentStateEnum, OperationStateEnum
+from tests.conftest import create_session
+
+LOGS = b"TASK [hdfs_namenode : Start] ok: [master-01]\n" * 100
+
+
+@pytest.mark.parametrize("format", ["zlib", "lzma"])
+def test_compress_logs(format):
+    compressed = compress_logs(LOGS, format)
+
+    assert is_compressed(compressed)
+    assert len(compressed) < len(LOGS)
+    assert decompress_logs(compressed) == LOGS
+
+
+def test_decompress_raw_logs():
+    assert not is_compressed(LOGS)
+    assert decompress_logs(LOGS) == LOGS
+
+
+def _add_operation(engine: Engine, logs: bytes) -> None:
+    with create_session(engine) as session:
+        session.add(DeploymentModel(id=1, state=DeploymentStateEnum.SUCCESS))
+        session.add(
+            OperationModel(
+                deployment_id=1,
+                operation_order=1,
+                operation="hdfs_namenode_start",
+                state=OperationStateEnum.SUCCESS,
+                logs=logs,
+            )
+        )
+        session.commit()
+
+
+def _raw_logs(engine: Engine) -> bytes:
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT logs FROM operation")).scalar_one()
+
+
+@pytest.mark.parametrize("db_engine", [True], indirect=True)
+def test_operation_logs_are_compressed_and_deferred(db_engine: Engine):
+    _add_operation(db_engine, LOGS)
+
+    assert is_compressed(_raw_logs(db_engine))
+    with create_session(db_engine) as session:
+        operation = session.get(OperationModel, (1, 1))
+        assert operation is not None
+        assert "logs" in inspect(operation).unloaded
+        assert operation.logs == LOGS
@@ -12,11 +12,14 @@ from sqlalchemy import Engine
 from tdp.core.collections import (
     Collections,
 )
+from tdp.core.constants import OPERATION_SLEEP_NAME, OPERATION_SLEEP_VARIABLE
 from tdp.core.inventory_reader import InventoryReader
 from tdp.core.models.deployment_model import (
     DeploymentModel,
     DeploymentTypeEnum,
     NothingToResumeError,
+    get_rolling_batch_size,
+    get_rolling_batches,
 )
 from tdp.core.models.enums import DeploymentStateEnum, OperationStateEnum
 from tdp.core.models.operation_model import OperationModel
@@ -184,6 +187,76 @@ class TestFromOperations:
         }
         assert deployment.state == DeploymentStateEnum.PLANNED
 
+    def test_rolling_batch(
+        self,
+        tmp_path_factory: pytest.TempPathFactory,
+        mock_inventory_reader: InventoryReader,
+    ):
+        operations_names = ["serv_comp_config", "serv_comp_restart"]
+        hosts = ["host2", "host5", "host3", "host1", "host4"]
+        collection_path = tmp_path_factory.mktemp("rolling_batch_collection")
+        dag_service_operations = {
+            "mock": [
+                {"name": "serv_comp_config"},
+                {"name": "serv_comp_start", "depends_on": ["serv_comp_config"]},
+            ]
+        }
+        generate_collection_at_path(collection_path, dag_service_operations, {})
+        mock_inventory_reader.get_hosts_from_playbook.return_value = set(hosts)  # type: ignore
+        collections = Collections.from_collection_paths(
+            [collection_path], mock_inventory_reader
+        )
+
+        deployment = DeploymentModel.from_operations(
+            collections, operations_names, rolling_interval=30, rolling_batch="40%"
+        )
+
+        sleep = (OPERATION_SLEEP_NAME, None, [f"{OPERATION_SLEEP_VARIABLE}=30"])
+        assert [
+            (operation.operation, operation.host, operation.extra_vars)
+            for operation in deployment.operations
+        ] == [
+            ("serv_comp_config", None, None),
+            ("serv_comp_restart", "host1", None),
+            ("serv_comp_restart", "host2", None),
+            sleep,
+            ("serv_comp_restart", "host3", None),
+            ("serv_comp_restart", "host4", None),
+            sleep,
+            ("serv_comp_restart", "host5", None),
+        ]
+        assert [operation.operation_order for operation in deployment.operations] == [
+            *range(1, 9)
+        ]
+        assert deployment.options == {
+            "operations": operations_names,
+            "rolling_interval": 30,
+            "rolling_batch": "40%",
+            "rolling_batches": [[2, 3], [5, 6]],
+        }
+        assert get_rolling_batches(deployment) == {2: 0, 3: 0, 5: 1, 6: 1}
+
+        deployment = DeploymentModel.from_operations(
+            collections, operations_names, rolling_batch="40%"
+        )
+
+        assert [
+            (operation.operation, operation.host, operation.extra_vars)
+            for operation in deployment.operations
+        ] == [
+            ("serv_comp_config", None, None),
+            ("serv_comp_restart", "host1", None),
+            ("serv_comp_restart", "host2", None),
+            ("serv_comp_restart", "host3", None),
+            ("serv_comp_restart", "host4", None),
+            ("serv_comp_restart", "host5", None),
+        ]
+        assert deployment.options == {
+            "operations": operations_names,
+            "rolling_batch": "40%",
+            "rolling_batches": [[2, 3], [4, 5]],
+        }
+
     def test_extra_vars(self, mock_collections: Collections):
         operations_names = ["serv_comp_config", "serv_comp_start"]
         extra_vars = ["foo1=bar1", "foo2=bar2"]
@@ -331,6 +404,56 @@ class TestFromFailedDeployment:
         for operation_rec in resume_deployment.operations:
             assert operation_rec.extra_vars == extra_vars
 
+    def test_deployment_plan_resume_rolling_batch(
+        self,
+        tmp_path_factory: pytest.TempPathFactory,
+        mock_inventory_reader: InventoryReader,
+    ):
+        collection_path = tmp_path_factory.mktemp("rolling_batch_collection")
+        generate_collection_at_path(
+            collection_path,
+            {
+                "mock": [
+                    {"name": "serv_comp_config"},
+                    {"name": "serv_comp_start", "depends_on": ["serv_comp_config"]},
+                ]
+            },
+            {},
+        )
+        mock_inventory_reader.get_hosts_from_playbook.return_value = {  # type: ignore
+            "host1",
+            "host2",
+            "host3",
+            "host4",
+        }
+        collections = Collections.from_collection_paths(
+            [collection_path], mock_inventory_reader
+        )
+        deployment = DeploymentModel.from_operations(
+            collections,
+            operation_names=["serv_comp_config", "serv_comp_restart"],
+            rolling_batch="2",
+        )
+        assert get_rolling_batches(deployment) == {2: 0, 3: 0, 4: 1, 5: 1}
+        deployment = fail_deployment(deployment, 3)
+
+        resume_deployment = DeploymentModel.from_failed_deployment(
+            collections, deployment
+        )
+        assert [
+            (operation.operation, operation.host)
+            for operation in resume_deployment.operations
+        ] == [
+            ("serv_comp_restart", "host2"),
+            ("serv_comp_restart", "host3"),
+            ("serv_comp_restart", "host4"),
+        ]
+        # The first batch is left with a single operation
+        assert resume_deployment.options == {
+            "from": deployment.id,
+            "rolling_batches": [[2, 3]],
+        }
+
 
 @pytest.mark.parametrize("db_engine", [True], indirect=True)
 class Test_multiple_db:
@@ -471,3 +594,17 @@ class TestFromStaleComponents:
     #     assert deployment_log.operations[8].extra_vars == [
     #         f"{OPERATION_SLEEP_VARIABLE}={rolling_interval}"
     #     ]
+
+
+@pytest.mark.parametrize(
+    "rolling_batch, host_count, size",
+    [("20", 400, 20), ("10%", 400, 40), ("10%", 5, 1), ("100%", 5, 5), ("3", 2, 3)],
+)
+def test_get_rolling_batch_size(rolling_batch: str, host_count: int, size: int):
+    assert get_rolling_batch_size(rolling_batch, host_count) == size
+
+
+@pytest.mark.parametrize("rolling_batch", ["0", "-1", "0%", "101%", "a", "%"])
+def test_get_rolling_batch_size_invalid(rolling_batch: str):
+    with pytest.raises(ValueError):
+        get_rolling_batch_size(rolling_batch, 10)
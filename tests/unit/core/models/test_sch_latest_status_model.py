@@ -0,0 +1,129 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+from tdp.core.models import SCHLatestStatusModel, SCHStatusLogModel
+from tdp.core.models.enums import SCHStatusLogSourceEnum
+from tdp.core.models.sch_latest_status_model import (
+    rebuild_sch_latest_status,
+    update_sch_latest_status,
+)
+from tests.conftest import create_session
+
+_START_TIME = datetime(2025, 1, 1)
+
+
+def _log(minutes: int, component=None, host=None, **values) -> SCHStatusLogModel:
+    return SCHStatusLogModel(
+        event_time=_START_TIME + timedelta(minutes=minutes),
+        service="serv",
+        component=component,
+        host=host,
+        source=SCHStatusLogSourceEnum.STALE,
+        **values,
+    )
+
+
+def _latest_statuses(engine: Engine) -> set[tuple]:
+    with create_session(engine) as session:
+        return {
+            (
+                status.service,
+                status.component,
+                status.host,
+                status.running_version,
+                status.configured_version,
+                status.to_config,
+                status.to_restart,
+            )
+            for status in session.scalars(select(SCHLatestStatusModel))
+        }
+
+
+@pytest.mark.parametrize("db_engine", [True], indirect=True)
+def test_latest_status_is_updated_on_insert(db_engine: Engine):
+    with create_session(db_engine) as session:
+        session.add_all(
+            [
+                _log(0, "comp", "host1", running_version="v1", to_config=True),
+                _log(1, "comp", "host1", configured_version="v2", to_restart=True),
+                _log(2, "comp", "host2", running_version="v1"),
+                _log(3, running_version="v1", to_config=True),
+            ]
+        )
+        session.commit()
+        session.add_all(
+            [
+                _log(4, "comp", "host1", running_version="v2", to_config=False),
+                # Older logs only fill null values
+                _log(-1, "comp", "host2", running_version="v0", to_config=True),
+            ]
+        )
+        session.commit()
+
+    assert _latest_statuses(db_engine) == {
+        ("serv", "comp", "host1", "v2", "v2", False, True),
+        ("serv", "comp", "host2", "v1", None, True, None),
+        ("serv", None, None, "v1", None, True, None),
+    }
+
+
+@pytest.mark.parametrize("db_engine", [True], indirect=True)
+def test_latest_status_is_unique_per_hosted_entity(db_engine: Engine):
+    with db_engine.begin() as connection:
+        update_sch_latest_status(
+            connection,
+            [
+                {"service": "serv", "event_time": _START_TIME, "to_config": True},
+                {
+                    "service": "serv",
+                    "event_time": _START_TIME + timedelta(minutes=1),
+                    "running_version": "v1",
+                },
+            ],
+        )
+        # Hosted entities with a null component or host are not distinct
+        with pytest.raises(IntegrityError):
+            with connection.begin_nested():
+                connection.execute(
+                    insert(SCHLatestStatusModel.__table__),
+                    {"service": "serv", "event_time": _START_TIME},
+                )
+
+    assert _latest_statuses(db_engine) == {("serv", None, None, "v1", None, True, None)}
+
+
+@pytest.mark.parametrize("db_engine", [True], indirect=True)
+def test_latest_status_is_not_updated_on_rollback(db_engine: Engine):
+    with create_session(db_engine) as session:
+        session.add(_log(0, "comp", "host1", running_version="v1"))
+        session.flush()
+        session.rollback()
+
+    assert _latest_statuses(db_engine) == set()
+
+
+@pytest.mark.parametrize("db_engine", [True], indirect=True)
+def test_rebuild_latest_status(db_engine: Engine):
+    with create_session(db_engine) as session:
+        session.add_all(
+            [
+                _log(0, "comp", "host1", running_version="v1", to_config=True),
+                _log(1, "comp", "host1", configured_version="v2", to_restart=True),
+                _log(2, "comp", "host1", to_config=False),
+                _log(3, "comp", "host2", running_version="v1"),
+            ]
+        )
+        session.commit()
+    expected = _latest_statuses(db_engine)
+    with db_engine.begin() as connection:
+        connection.execute(SCHLatestStatusModel.__table__.delete())
+        rebuild_sch_latest_status(connection)
+
+    assert _latest_statuses(db_engine) == expected
@@ -0,0 +1,105 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+
+from tdp.core.models import SCHStatusLogModel, compact_sch_status_logs
+from tdp.core.models.enums import SCHStatusLogSourceEnum
+from tdp.core.models.sch_latest_status_model import rebuild_sch_latest_status
+from tdp.dao import Dao
+from tests.conftest import create_session
+
+_START_TIME = datetime(2025, 1, 1)
+
+
+def _log(minutes: int, component=None, host=None, **values) -> SCHStatusLogModel:
+    return SCHStatusLogModel(
+        event_time=_START_TIME + timedelta(minutes=minutes),
+        service="serv",
+        component=component,
+        host=host,
+        source=SCHStatusLogSourceEnum.STALE,
+        **values,
+    )
+
+
+@pytest.fixture
+def status_logs(db_engine: Engine) -> Engine:
+    with create_session(db_engine) as session:
+        session.add_all(
+            [
+                _log(0, "comp", "host1", running_version="v1", to_config=True),
+                _log(1, "comp", "host1", configured_version="v2", to_restart=True),
+                _log(2, "comp", "host1", running_version="v2", to_config=False),
+                _log(3, "comp", "host2", running_version="v1"),
+                _log(4, running_version="v1", to_config=True),
+                # Not folded
+                _log(10, "comp", "host1", configured_version="v3"),
+                _log(11, "comp", "host2", to_restart=True),
+            ]
+        )
+        session.commit()
+    return db_engine
+
+
+def _statuses(engine: Engine) -> list:
+    with Dao(engine) as dao:
+        return sorted(dao.get_hosted_entity_statuses(), key=str)
+
+
+@pytest.mark.parametrize("db_engine", [True], indirect=True)
+def test_compact_sch_status_logs(status_logs: Engine, tmp_path):
+    statuses = _statuses(status_logs)
+    archive = tmp_path / "archive.jsonl.gz"
+
+    with status_logs.begin() as connection:
+        count = compact_sch_status_logs(
+            connection, _START_TIME + timedelta(minutes=5), archive=archive
+        )
+        # The latest status computed from the logs is unchanged
+        rebuild_sch_latest_status(connection)
+
+    assert count == 5
+    assert _statuses(status_logs) == statuses
+    with create_session(status_logs) as session:
+        logs = session.scalars(
+            select(SCHStatusLogModel).order_by(SCHStatusLogModel.event_time)
+        ).all()
+    assert [
+        (log.component, log.host, log.running_version, log.configured_version)
+        for log in logs
+        if log.source == SCHStatusLogSourceEnum.SNAPSHOT
+    ] == [
+        ("comp", "host1", "v2", "v2"),
+        ("comp", "host2", "v1", None),
+        (None, None, "v1", None),
+    ]
+    assert len(logs) == 5
+    with gzip.open(archive, "rt") as file:
+        archived_logs = [json.loads(line) for line in file]
+    assert [log["event_time"] for log in archived_logs] == [
+        (_START_TIME + timedelta(minutes=minutes)).isoformat() for minutes in range(5)
+    ]
+
+
+@pytest.mark.parametrize("db_engine", [True], indirect=True)
+def test_compact_sch_status_logs_nothing_to_fold(status_logs: Engine):
+    with status_logs.begin() as connection:
+        assert (
+            compact_sch_status_logs(connection, _START_TIME - timedelta(minutes=1)) == 0
+        )
+
+
+@pytest.mark.parametrize("db_engine", [True], indirect=True)
+def test_dao_compact_status_logs_requires_a_cutoff(status_logs: Engine):
+    with Dao(status_logs) as dao:
+        with pytest.raises(ValueError):
+            dao.compact_status_logs()
+        with pytest.raises(ValueError):
+            dao.compact_status_logs(deployment_id=1)
@@ -0,0 +1,79 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+from pathlib import Path
+
+import pytest
+from git import Repo
+
+from tdp.core.repository.git_mono_repository import GitMonoRepository
+from tdp.core.repository.repository import EmptyCommit, NoVersionYet
+
+
+def _commit_file(repository: GitMonoRepository, file_name: str, content: str) -> str:
+    with repository.validate(f"update {file_name}") as repo:
+        (repo.path / file_name).write_text(content)
+        repo.add_for_validation([file_name])
+    return repository.current_version()
+
+
+def test_git_mono_repository_init_creates_a_single_repository(tmp_path: Path):
+    hdfs = GitMonoRepository.init(tmp_path / "hdfs")
+    yarn = GitMonoRepository.init(tmp_path / "yarn")
+
+    assert (tmp_path / ".git").is_dir()
+    assert not (hdfs.path / ".git").exists()
+    assert not (yarn.path / ".git").exists()
+    with pytest.raises(NoVersionYet):
+        hdfs.current_version()
+
+
+def test_git_mono_repository_versions_are_scoped_to_the_service(tmp_path: Path):
+    hdfs = GitMonoRepository.init(tmp_path / "hdfs")
+    yarn = GitMonoRepository.init(tmp_path / "yarn")
+
+    hdfs_version = _commit_file(hdfs, "hdfs.yml", "a: 1")
+    yarn_version = _commit_file(yarn, "yarn.yml", "b: 1")
+
+    # A commit on another service does not change the version
+    assert hdfs.current_version() == hdfs_version
+    with Repo(tmp_path) as repo:
+        assert len(list(repo.iter_commits())) == 2
+        assert repo.head.commit.tree["yarn"].hexsha == yarn_version
+
+    new_hdfs_version = _commit_file(hdfs, "hdfs.yml", "a: 2")
+    assert new_hdfs_version != hdfs_version
+    assert hdfs.is_file_modified(hdfs_version, "hdfs.yml")
+    assert not yarn.is_file_modified(yarn_version, "yarn.yml")
+
+
+def test_git_mono_repository_empty_commit(tmp_path: Path):
+    hdfs = GitMonoRepository.init(tmp_path / "hdfs")
+    yarn = GitMonoRepository.init(tmp_path / "yarn")
+    _commit_file(hdfs, "hdfs.yml", "a: 1")
+    _commit_file(yarn, "yarn.yml", "b: 1")
+
+    with pytest.raises(EmptyCommit):
+        _commit_file(hdfs, "hdfs.yml", "a: 1")
+
+
+def test_git_mono_repository_cleanliness_is_scoped_to_the_service(tmp_path: Path):
+    hdfs = GitMonoRepository.init(tmp_path / "hdfs")
+    yarn = GitMonoRepository.init(tmp_path / "yarn")
+    _commit_file(hdfs, "hdfs.yml", "a: 1")
+    _commit_file(yarn, "yarn.yml", "b: 1")
+
+    (yarn.path / "yarn.yml").write_text("b: 2")
+
+    assert hdfs.is_clean()
+    assert not yarn.is_clean()
+    yarn.restore_file("yarn.yml")
+    assert yarn.is_clean()
+
+
+def test_git_mono_repository_shares_the_git_repository(tmp_path: Path):
+    hdfs = GitMonoRepository.init(tmp_path / "hdfs")
+    yarn = GitMonoRepository.init(tmp_path / "yarn")
+
+    assert hdfs._repo is yarn._repo
+    assert hdfs._lock is yarn._lock
@@ -153,3 +153,126 @@ def test_git_repository_no_validation(git_repository: GitRepository):
         assert not repo.is_dirty()
         last_commit = repo.head.commit
         assert last_commit.message == commit_message
+
+
+def test_git_repository_yml_file_modified_between_commits(
+    git_repository: GitRepository,
+):
+    with git_repository.validate("add files") as repository:
+        (repository.path / "hdfs.yml").write_text("a: 1\n")
+        (repository.path / "hdfs_namenode.yml").write_text("b: 1\n")
+        repository.add_for_validation(["hdfs.yml", "hdfs_namenode.yml"])
+    first_version = git_repository.current_version()
+
+    with git_repository.validate("update namenode") as repository:
+        (repository.path / "hdfs_namenode.yml").write_text("b: 2\n")
+        repository.add_for_validation(["hdfs_namenode.yml"])
+
+    assert git_repository.is_file_modified(first_version, "hdfs_namenode.yml")
+    assert not git_repository.is_file_modified(first_version, "hdfs.yml")
+    assert not git_repository.is_file_modified(first_version, "missing.yml")
+
+
+def test_git_repository_nested_file_modified(
+    git_repository: GitRepository, git_commit_empty_tree: str
+):
+    group_vars = git_repository.path / "group_vars"
+    group_vars.mkdir()
+    with git_repository.validate("add nested file") as repository:
+        (group_vars / "hive.yml").write_text("nb_cores: 2")
+        repository.add_for_validation(["group_vars/hive.yml"])
+
+    assert git_repository.is_file_modified(git_commit_empty_tree, "group_vars/hive.yml")
+    assert not git_repository.is_file_modified(
+        git_repository.current_version(), "group_vars/hive.yml"
+    )
+
+
+@pytest.fixture
+def committed_git_repository(git_repository: GitRepository) -> GitRepository:
+    """Return a GitRepository with committed files."""
+    with git_repository.validate("add files") as repository:
+        (repository.path / "hdfs.yml").write_text("a: 1\n")
+        (repository.path / "hdfs_namenode.yml").write_text("b: 1\n")
+        repository.add_for_validation(["hdfs.yml", "hdfs_namenode.yml"])
+    return git_repository
+
+
+def test_git_repository_is_clean(committed_git_repository: GitRepository):
+    assert committed_git_repository.is_clean()
+
+
+def test_git_repository_is_clean_does_not_write_the_index(
+    committed_git_repository: GitRepository,
+):
+    index_path = committed_git_repository.path / ".git" / "index"
+    index_content = index_path.read_bytes()
+    index_mtime_ns = index_path.stat().st_mtime_ns
+    # Same content, different stat data
+    (committed_git_repository.path / "hdfs.yml").write_text("a: 1\n")
+    assert committed_git_repository.is_clean()
+    assert index_path.read_bytes() == index_content
+    assert index_path.stat().st_mtime_ns == index_mtime_ns
+
+
+def test_git_repository_is_clean_with_autocrlf(
+    committed_git_repository: GitRepository,
+):
+    with Repo(committed_git_repository.path).config_writer() as config:
+        config.set_value("core", "autocrlf", "true")
+    # Converted to the committed content when added to the index
+    (committed_git_repository.path / "hdfs.yml").write_bytes(b"a: 1\r\n")
+    assert committed_git_repository.is_clean()
+
+
+def test_git_repository_is_clean_with_text_attribute(
+    committed_git_repository: GitRepository,
+):
+    (committed_git_repository.path / ".git" / "info").mkdir(exist_ok=True)
+    (committed_git_repository.path / ".git" / "info" / "attributes").write_text(
+        "*.yml text\n"
+    )
+    # Converted to the committed content when added to the index
+    (committed_git_repository.path / "hdfs.yml").write_bytes(b"a: 1\r\n")
+    assert committed_git_repository.is_clean()
+
+
+def test_git_repository_is_not_clean_when_file_modified(
+    committed_git_repository: GitRepository,
+):
+    assert committed_git_repository.is_clean()
+    # Same size, different content
+    (committed_git_repository.path / "hdfs.yml").write_text("a: 2\n")
+    assert not committed_git_repository.is_clean()
+
+
+def test_git_repository_is_not_clean_when_file_deleted(
+    committed_git_repository: GitRepository,
+):
+    (committed_git_repository.path / "hdfs.yml").unlink()
+    assert not committed_git_repository.is_clean()
+
+
+def test_git_repository_is_not_clean_when_file_staged(
+    committed_git_repository: GitRepository,
+):
+    (committed_git_repository.path / "hdfs.yml").write_text("a: 3\n")
+    committed_git_repository.add_for_validation(["hdfs.yml"])
+    assert not committed_git_repository.is_clean()
+
+
+def test_git_repository_is_not_clean_with_untracked_file(
+    committed_git_repository: GitRepository,
+):
+    (committed_git_repository.path / "hive.yml").write_text("c: 1\n")
+    assert not committed_git_repository.is_clean()
+
+
+def test_git_repository_is_clean_with_ignored_file(
+    committed_git_repository: GitRepository,
+):
+    with committed_git_repository.validate("ignore swap files") as repository:
+        (repository.path / ".gitignore").write_text("*.swp\n")
+        repository.add_for_validation([".gitignore"])
+    (committed_git_repository.path / "hdfs.yml.swp").write_text("swap")
+    assert committed_git_repository.is_clean()
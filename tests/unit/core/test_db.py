@@ -0,0 +1,52 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+from sqlalchemy import text
+
+from tdp.core.db import SQLITE_MMAP_SIZE, EngineProfileEnum, get_engine
+
+
+def _pragmas(engine) -> dict:
+    with engine.connect() as connection:
+        return {
+            pragma: connection.execute(text(f"PRAGMA {pragma}")).scalar()
+            for pragma in ["journal_mode", "synchronous", "mmap_size", "busy_timeout"]
+        }
+
+
+def test_get_engine_default_profile(tmp_path):
+    engine = get_engine(f"sqlite:///{tmp_path / 'tdp.db'}")
+    assert _pragmas(engine)["journal_mode"] == "delete"
+    engine.dispose()
+
+
+def test_get_engine_performance_profile_sqlite(tmp_path):
+    engine = get_engine(
+        f"sqlite:///{tmp_path / 'tdp.db'}", profile=EngineProfileEnum.PERFORMANCE
+    )
+    pragmas = _pragmas(engine)
+    assert pragmas["journal_mode"] == "wal"
+    # NORMAL
+    assert pragmas["synchronous"] == 1
+    assert pragmas["mmap_size"] == SQLITE_MMAP_SIZE
+    assert pragmas["busy_timeout"] > 0
+    engine.dispose()
+
+
+def test_get_engine_performance_profile_sqlite_memory():
+    engine = get_engine("sqlite://", profile="performance")
+    assert _pragmas(engine)["journal_mode"] == "memory"
+    engine.dispose()
+
+
+def test_get_engine_profile_from_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("TDP_DATABASE_PROFILE", "performance")
+    engine = get_engine(f"sqlite:///{tmp_path / 'tdp.db'}")
+    assert _pragmas(engine)["journal_mode"] == "wal"
+    engine.dispose()
+
+
+def test_get_engine_unknown_profile():
+    with pytest.raises(ValueError):
+        get_engine("sqlite://", profile="unknown")
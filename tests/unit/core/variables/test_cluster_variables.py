@@ -0,0 +1,104 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from tdp.core.repository.repository import Repository
+from tdp.core.variables import ClusterVariables
+
+
+class FakeRepository(Repository):
+    """Repository recording its instantiations and closings."""
+
+    opened: list[str] = []
+    closed: list[str] = []
+
+    def __init__(self, path):
+        super().__init__(path)
+        FakeRepository.opened.append(self.path.name)
+
+    def close(self) -> None:
+        FakeRepository.closed.append(self.path.name)
+
+    @classmethod
+    def init(cls, path):
+        return cls(path)
+
+    def add_for_validation(self, paths):
+        pass
+
+    def validate(self, message):
+        pass
+
+    def current_version(self) -> str:
+        return "version"
+
+    def is_clean(self) -> bool:
+        return True
+
+    def is_file_modified(self, commit, path) -> bool:
+        return False
+
+    def restore_file(self, file_names) -> None:
+        pass
+
+
+@pytest.fixture
+def tdp_vars(tmp_path: Path) -> Path:
+    FakeRepository.opened = []
+    FakeRepository.closed = []
+    for service in ["hdfs", "hive", "yarn", "zookeeper"]:
+        (tmp_path / service).mkdir()
+    return tmp_path
+
+
+def test_cluster_variables_opens_repositories_on_access(tdp_vars: Path):
+    cluster_variables = ClusterVariables.get_cluster_variables(
+        MagicMock(), tdp_vars, repository_class=FakeRepository
+    )
+
+    assert set(cluster_variables) == {"hdfs", "hive", "yarn", "zookeeper"}
+    assert "hdfs" in cluster_variables
+    assert FakeRepository.opened == []
+
+    assert cluster_variables["hdfs"].name == "hdfs"
+    assert cluster_variables["hdfs"] is cluster_variables["hdfs"]
+    assert FakeRepository.opened == ["hdfs"]
+
+
+def test_cluster_variables_closes_least_recently_used(tdp_vars: Path):
+    cluster_variables = ClusterVariables(
+        {},
+        MagicMock(),
+        service_paths={path.name: path for path in tdp_vars.iterdir()},
+        repository_class=FakeRepository,
+        max_open_repositories=2,
+    )
+
+    cluster_variables["hdfs"]
+    cluster_variables["hive"]
+    cluster_variables["hdfs"]
+    cluster_variables["yarn"]
+    assert FakeRepository.closed == ["hive"]
+
+    cluster_variables.close()
+    assert FakeRepository.closed == ["hive", "hdfs", "yarn"]
+
+
+def test_cluster_variables_get_unclean_services(tdp_vars: Path):
+    class DirtyRepository(FakeRepository):
+        def is_clean(self) -> bool:
+            return self.path.name not in ["hive", "yarn"]
+
+    cluster_variables = ClusterVariables(
+        {},
+        MagicMock(),
+        service_paths={path.name: path for path in tdp_vars.iterdir()},
+        repository_class=DirtyRepository,
+        max_open_repositories=2,
+    )
+
+    assert cluster_variables.get_unclean_services(max_workers=4) == ["hive", "yarn"]
@@ -0,0 +1,152 @@
+# Copyright 2025 TOSIT.IO
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("greenlet")
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy import create_engine  # noqa: E402
+
+from tdp.async_dao import AsyncDao  # noqa: E402
+from tdp.core.db import get_async_engine  # noqa: E402
+from tdp.core.models import (  # noqa: E402
+    BaseModel,
+    DeploymentModel,
+    OperationModel,
+    SCHStatusLogModel,
+    SCHStatusLogSourceEnum,
+)
+from tdp.core.models.enums import DeploymentStateEnum, OperationStateEnum  # noqa: E402
+from tdp.dao import Dao  # noqa: E402
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    path = tmp_path / "tdp.db"
+    engine = create_engine(f"sqlite:///{path}")
+    BaseModel.metadata.create_all(engine)
+    event_time = datetime(2024, 1, 1)
+    with Dao(engine, commit_on_exit=True) as dao:
+        for deployment_id, state in enumerate(
+            [DeploymentStateEnum.SUCCESS, DeploymentStateEnum.PLANNED], start=1
+        ):
+            dao.add_deployment(
+                DeploymentModel(
+                    id=deployment_id,
+                    state=state,
+                    operations=[
+                        OperationModel(
+                            operation_order=1,
+                            operation="hdfs_nn_config",
+                            host="master01",
+                            state=OperationStateEnum.PLANNED,
+                            logs=f"logs {deployment_id}".encode(),
+                        )
+                    ],
+                )
+            )
+        dao.add_status_logs(
+            SCHStatusLogModel(
+                event_time=event_time + timedelta(seconds=index),
+                service="hdfs",
+                component="nn",
+                host=f"master0{index % 2}",
+                running_version=f"{index:06d}",
+                to_config=index % 3 == 0,
+                source=SCHStatusLogSourceEnum.STALE,
+            )
+            for index in range(10)
+        )
+    engine.dispose()
+    return path
+
+
+def _run(database_path, query):
+    """Run a query with an AsyncDao."""
+
+    async def _query():
+        engine = get_async_engine(f"sqlite+aiosqlite:///{database_path}")
+        try:
+            async with AsyncDao(engine) as dao:
+                return await query(dao)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(_query())
+
+
+def test_get_hosted_entity_statuses(database_path):
+    engine = create_engine(f"sqlite:///{database_path}")
+    with Dao(engine) as dao:
+        expected = dao.get_hosted_entity_statuses(filter_stale=True)
+
+    async def query(dao):
+        return await dao.get_hosted_entity_statuses(filter_stale=True)
+
+    assert _run(database_path, query) == expected
+    engine.dispose()
+
+
+def test_get_hosted_entity_statuses_history(database_path):
+    async def query(dao):
+        first_page = await dao.get_hosted_entity_statuses_history(limit=4)
+        second_page = [
+            row
+            async for row in await dao.iter_hosted_entity_statuses_history(
+                cursor=first_page[-1].cursor
+            )
+        ]
+        return first_page, second_page
+
+    first_page, second_page = _run(database_path, query)
+    assert [row.running_version for row in first_page + second_page] == [
+        f"{index:06d}" for index in reversed(range(10))
+    ]
+
+
+def test_get_deployments(database_path):
+    async def query(dao):
+        planned_deployment = await dao.get_planned_deployment()
+        last_deployment = await dao.get_last_deployment()
+        last_deployments = await dao.get_last_deployments(limit=1, offset=1)
+        return (
+            planned_deployment.id,
+            # Operations are loaded along with the deployment
+            [operation.operation for operation in last_deployment.operations],
+            [
+                [operation.operation for operation in deployment.operations]
+                for deployment in last_deployments
+            ],
+        )
+
+    assert _run(database_path, query) == (2, ["hdfs_nn_config"], [["hdfs_nn_config"]])
+
+
+def test_get_operations(database_path):
+    async def query(dao):
+        operations = await dao.get_operations_by_name(1, "hdfs_nn_config")
+        operation = await dao.get_operation(2, 1)
+        missing_operation = await dao.get_operation(2, 2)
+        logs = await dao.get_operation_logs(2, 1)
+        return (
+            len(operations),
+            operation.operation,
+            missing_operation,
+            logs,
+            # Loaded on the operation of the session too
+            operation.logs,
+            await dao.get_operation_logs(2, 2),
+        )
+
+    assert _run(database_path, query) == (
+        1,
+        "hdfs_nn_config",
+        None,
+        b"logs 2",
+        b"logs 2",
+        None,
+    )
@@ -4,10 +4,12 @@
 import logging
 import random
 import string
+from datetime import datetime, timedelta
 from typing import List, Optional
 
 import pytest
 from sqlalchemy.engine import Engine
+from sqlalchemy.exc import InvalidRequestError
 
 from tdp.core.models import (
     DeploymentModel,
@@ -281,3 +283,177 @@ def test_operation(db_engine):
                 state=OperationStateEnum.SUCCESS,
             ),
         )
+
+
+@pytest.mark.parametrize("db_engine", [True], indirect=True)
+def test_get_last_operation_fingerprints(db_engine):
+    runs = [
+        # (deployment_id, operation, host, state, fingerprint)
+        (1, "hdfs_config", None, OperationStateEnum.SUCCESS, "a"),
+        (1, "hdfs_config", "host1", OperationStateEnum.SUCCESS, "b"),
+        (1, "yarn_config", None, OperationStateEnum.SUCCESS, "c"),
+        (2, "hdfs_config", None, OperationStateEnum.SUCCESS, "d"),
+        (2, "hdfs_config", "host1", OperationStateEnum.FAILURE, None),
+        (2, "yarn_config", None, OperationStateEnum.HELD, None),
+    ]
+    with create_session(db_engine) as session:
+        for deployment_id in (1, 2):
+            session.add(
+                DeploymentModel(id=deployment_id, state=DeploymentStateEnum.FAILURE)
+            )
+        for order, (deployment_id, operation, host, state, fingerprint) in enumerate(
+            runs
+        ):
+            session.add(
+                OperationModel(
+                    deployment_id=deployment_id,
+                    operation_order=order,
+                    operation=operation,
+                    host=host,
+                    state=state,
+                    fingerprint=fingerprint,
+                )
+            )
+        session.commit()
+
+    with Dao(db_engine) as dao:
+        assert dao.get_last_operation_fingerprints(["hdfs_config", "yarn_config"]) == {
+            ("hdfs_config", None): "d",
+            ("hdfs_config", "host1"): None,
+            ("yarn_config", None): "c",
+        }
+        assert dao.get_last_operation_fingerprints(["yarn_config"]) == {
+            ("yarn_config", None): "c"
+        }
+
+
+@pytest.mark.parametrize("db_engine", [True], indirect=True)
+def test_get_hosted_entity_statuses_history_pagination(db_engine):
+    event_time = datetime(2025, 1, 1)
+    with create_session(db_engine) as session:
+        session.add_all(
+            [
+                SCHStatusLogModel(
+                    # Two logs share each event time
+                    event_time=event_time + timedelta(minutes=i // 2),
+                    service="smock",
+                    component="cmock",
+                    host=f"hmock{i % 3}",
+                    source=SCHStatusLogSourceEnum.STALE,
+                    running_version=str(i),
+                )
+                for i in range(7)
+            ]
+        )
+        session.commit()
+
+    with Dao(db_engine) as dao:
+        pages = []
+        cursor = None
+        while page := dao.get_hosted_entity_statuses_history(limit=3, cursor=cursor):
+            pages.append([status.running_version for status in page])
+            cursor = page[-1].cursor
+        assert pages == [["6", "5", "4"], ["3", "2", "1"], ["0"]]
+
+        assert [
+            status.running_version
+            for status in dao.iter_hosted_entity_statuses_history(
+                hosts=["hmock1"], batch_size=1
+            )
+        ] == ["4", "1"]
+
+        with pytest.raises(ValueError):
+            dao.get_hosted_entity_statuses_history(cursor="invalid")
+
+
+@pytest.mark.parametrize("db_engine", [True], indirect=True)
+def test_add_deployment(db_engine):
+    def plan(*operations: str) -> DeploymentModel:
+        deployment = DeploymentModel(state=DeploymentStateEnum.PLANNED)
+        deployment.operations = [
+            OperationModel(
+                operation_order=i,
+                operation=operation,
+                state=OperationStateEnum.PLANNED,
+            )
+            for i, operation in enumerate(operations, start=1)
+        ]
+        return deployment
+
+    with Dao(db_engine, commit_on_exit=True) as dao:
+        deployment = plan("hdfs_install", "hdfs_config", "hdfs_start")
+        dao.add_deployment(deployment)
+        assert deployment.id == 1
+
+    # Replace the planned deployment
+    with Dao(db_engine, commit_on_exit=True) as dao:
+        deployment = plan("yarn_config", "yarn_start")
+        deployment.id = 1
+        dao.add_deployment(deployment)
+
+    with Dao(db_engine) as dao:
+        planned_deployment = dao.get_planned_deployment()
+        assert planned_deployment is not None
+        assert planned_deployment.id == 1
+        assert [
+            (operation.operation_order, operation.operation)
+            for operation in planned_deployment.operations
+        ] == [(1, "yarn_config"), (2, "yarn_start")]
+
+
+@pytest.mark.parametrize("db_engine", [True], indirect=True)
+def test_get_last_deployment_summaries(db_engine):
+    with Dao(db_engine, commit_on_exit=True) as dao:
+        for hosts in [["host1", "host2", "host1"], [None]]:
+            dao.add_deployment(
+                DeploymentModel(
+                    state=DeploymentStateEnum.PLANNED,
+                    options={"targets": ["hdfs"]},
+                    operations=[
+                        OperationModel(
+                            operation_order=i,
+                            operation="hdfs_config",
+                            host=host,
+                            state=OperationStateEnum.PLANNED,
+                        )
+                        for i, host in enumerate(hosts, start=1)
+                    ],
+                )
+            )
+
+    with Dao(db_engine) as dao:
+        deployments = dao.get_last_deployment_summaries(limit=10)
+        assert [
+            (deployment.id, deployment.operation_count, deployment.host_count)
+            for deployment in deployments
+        ] == [(1, 3, 2), (2, 1, 0)]
+        # Neither the options nor the operations are loaded
+        with pytest.raises(InvalidRequestError):
+            deployments[0].options
+        with pytest.raises(InvalidRequestError):
+            deployments[0].operations
+
+
+@pytest.mark.parametrize("db_engine", [True], indirect=True)
+def test_add_status_logs(db_engine):
+    event_time = datetime(2025, 1, 1)
+    with Dao(db_engine, commit_on_exit=True) as dao:
+        dao.add_status_logs(
+            SCHStatusLogModel(
+                event_time=event_time + timedelta(minutes=i),
+                service="smock",
+                component="cmock",
+                host=host,
+                source=SCHStatusLogSourceEnum.STALE,
+                running_version=str(i) if i < 3 else None,
+                to_config=True if i < 3 else False,
+            )
+            for i, host in enumerate(["hmock1", "hmock2", "hmock1", "hmock1"])
+        )
+
+    with Dao(db_engine) as dao:
+        assert len(dao.get_hosted_entity_statuses_history()) == 4
+        assert {
+            (status.entity.host, status.running_version, status.to_config)
+            for status in dao.get_hosted_entity_statuses()
+        } == {("hmock1", "2", False), ("hmock2", "1", True)}